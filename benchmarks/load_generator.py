@@ -0,0 +1,382 @@
+import os
+import re
+import sys
+import json
+import time
+import random
+import hashlib
+import logging
+import argparse
+import threading
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+from eth_account import Account
+from web3 import Web3, HTTPProvider, EthereumTesterProvider
+
+# 공용 모듈 경로 추가 (저장소 루트의 common)
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCH_DIR)
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from common.compile_cache import compile_contract_cached  # noqa: E402
+from common.fees import FeeStrategy  # noqa: E402
+from common.tx_pipeline import TransactionPipeline  # noqa: E402
+from common.update_codec import decode_ipfs_hash  # noqa: E402
+from common.update_signing import build_register_args  # noqa: E402
+
+# 로깅 설정
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+UPDATE_CONTRACT_PATH = os.path.join(
+    REPO_ROOT, "update_service", "contracts", "SoftwareUpdateContract.sol"
+)
+COMPOSE_PATH = os.path.join(REPO_ROOT, "blockchain-server", "docker-compose.yml")
+DEFAULT_MNEMONIC = "test test test test test test test test test test test junk"
+DEFAULT_OUTPUT = os.path.join(BENCH_DIR, "results", "load-latest.json")
+PRICE = 1000
+# 기기 계정 충전액 계산과 측정 조건이 실행마다 같도록 고정 gasPrice 사용
+GAS_PRICE_GWEI = "50"
+PURCHASE_GAS = 300000
+INSTALL_GAS = 200000
+REFUND_GAS = 200000
+REGISTER_GAS = 500000
+
+
+def read_compose_mnemonic(compose_path=COMPOSE_PATH):
+    """blockchain-server의 ganache 설정에서 --mnemonic 값을 읽음 (없으면 기본 니모닉)"""
+    try:
+        with open(compose_path) as f:
+            match = re.search(r'--mnemonic\s+"([^"]+)"', f.read())
+    except OSError:
+        match = None
+    return match.group(1) if match else DEFAULT_MNEMONIC
+
+
+def derive_accounts(mnemonic, count, start=0):
+    """ganache --deterministic과 같은 경로(m/44'/60'/0'/0/i)로 계정 파생"""
+    Account.enable_unaudited_hdwallet_features()
+    return [
+        Account.from_mnemonic(mnemonic, account_path=f"m/44'/60'/0'/0/{i}")
+        for i in range(start, start + count)
+    ]
+
+
+def percentile(values, pct):
+    """nearest-rank 방식 백분위수 (값이 없으면 None)"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return ordered[int(rank) - 1]
+
+
+def latency_summary(values):
+    if not values:
+        return {"count": 0}
+    return {
+        "count": len(values),
+        "mean": sum(values) / len(values),
+        "p50": percentile(values, 50),
+        "p95": percentile(values, 95),
+        "p99": percentile(values, 99),
+        "max": max(values),
+    }
+
+
+class SerializedTesterProvider(EthereumTesterProvider):
+    """eth-tester는 스레드 안전하지 않으므로 워커 스레드의 요청을 한 번에 하나씩 처리"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._request_lock = threading.Lock()
+
+    def make_request(self, method, params):
+        with self._request_lock:
+            return super().make_request(method, params)
+
+
+def connect(provider_url):
+    """provider_url이 없으면 in-process EVM, 있으면 ganache/anvil에 연결하고 (web3, 백엔드 이름) 반환"""
+    if provider_url:
+        web3 = Web3(HTTPProvider(provider_url))
+        if not web3.is_connected():
+            raise ConnectionError(f"노드에 연결할 수 없습니다: {provider_url}")
+        return web3, provider_url
+    return Web3(SerializedTesterProvider()), "eth-tester/py-evm"
+
+
+def fund_accounts(web3, funder, addresses, amount_wei, sign=True):
+    """잔액이 amount_wei보다 적은 계정만 funder에서 충전 (sign=False면 노드의 잠금 해제 계정 사용)"""
+    gas_price = web3.to_wei(GAS_PRICE_GWEI, "gwei")
+    funder_address = funder.address if sign else funder
+    nonce = web3.eth.get_transaction_count(funder_address, "pending")
+    tx_hashes = []
+    for address in addresses:
+        balance = web3.eth.get_balance(address)
+        if balance >= amount_wei:
+            continue
+        tx = {
+            "from": funder_address,
+            "to": address,
+            "value": amount_wei - balance,
+            "gas": 21000,
+            "gasPrice": gas_price,
+            "nonce": nonce,
+            "chainId": web3.eth.chain_id,
+        }
+        nonce += 1
+        if sign:
+            signed_tx = funder.sign_transaction(tx)
+            tx_hashes.append(web3.eth.send_raw_transaction(signed_tx.raw_transaction))
+        else:
+            tx_hashes.append(web3.eth.send_transaction(tx))
+    for tx_hash in tx_hashes:
+        web3.eth.wait_for_transaction_receipt(tx_hash, poll_latency=0.1)
+    logger.info(f"계정 충전 완료: {len(tx_hashes)}/{len(addresses)}개")
+
+
+def pipeline_for(web3, account):
+    """고정 gasPrice로 보내고 수수료 교체는 하지 않는 파이프라인 (처리량 측정에 노드 외 변수를 두지 않음)"""
+    fees = FeeStrategy(web3, gas_price=web3.to_wei(GAS_PRICE_GWEI, "gwei"))
+    return TransactionPipeline(web3, account.address, account.key, fees=fees, replace_after=0)
+
+
+def deploy_update_contract(web3, manufacturer, abi, bytecode):
+    pipeline = pipeline_for(web3, manufacturer)
+    factory = web3.eth.contract(abi=abi, bytecode=bytecode)
+    pipeline.submit("SoftwareUpdateContract 배포", factory.constructor(), gas=5000000)
+    (result,) = pipeline.wait_all()
+    if result["status"] != 1:
+        raise RuntimeError(f"컨트랙트 배포 실패: {result['error'] or 'reverted'}")
+    return web3.eth.contract(address=result["receipt"].contractAddress, abi=abi)
+
+
+def register_updates(web3, contract, manufacturer, count):
+    """부하 테스트용 업데이트를 count개 연속 등록하고 uid 목록 반환"""
+    run_tag = hashlib.sha256(str(time.time_ns()).encode("utf-8")).hexdigest()[:8]
+    pipeline = pipeline_for(web3, manufacturer)
+    uids = []
+    for i in range(count):
+        uid = f"load-{run_tag}-{i:04d}"
+        payload_digest = hashlib.sha256(uid.encode("utf-8")).digest()
+        args = build_register_args(
+            manufacturer.key,
+            uid,
+            decode_ipfs_hash(payload_digest),
+            b"\x01" * 32,
+            payload_digest.hex(),
+            f"load test update {i}",
+            PRICE,
+            "1.0.0",
+        )
+        pipeline.submit(f"registerUpdate({uid})", contract.functions.registerUpdate(*args), gas=REGISTER_GAS)
+        uids.append(uid)
+    results = pipeline.wait_all()
+    failed = [r["label"] for r in results if r["status"] != 1]
+    if failed:
+        raise RuntimeError(f"업데이트 등록 실패: {failed}")
+    logger.info(f"업데이트 {count}개 등록 완료")
+    return uids
+
+
+def run_device(web3, contract, device, uids, iterations, refund_ratio, seed, offset):
+    """한 기기 계정으로 구매 → 설치 확인(또는 환불) 흐름을 iterations번 순차 실행"""
+    rng = random.Random(seed)
+    pipeline = pipeline_for(web3, device)
+    functions = contract.functions
+    flows = []
+    for i in range(iterations):
+        uid = uids[(offset + i) % len(uids)]
+        kind = "refund" if rng.random() < refund_ratio else "install"
+        # 같은 계정의 트랜잭션은 nonce 순서로 처리되므로 구매 영수증을 기다리지 않고 바로 이어서 전송
+        pipeline.submit("purchaseUpdate", functions.purchaseUpdate(uid), gas=PURCHASE_GAS, value=PRICE)
+        if kind == "install":
+            pipeline.submit(
+                "confirmInstallation",
+                functions.confirmInstallation(uid, f"device-{offset:05d}"),
+                gas=INSTALL_GAS,
+            )
+        else:
+            pipeline.submit("refundOnNotMatch", functions.refundOnNotMatch(uid), gas=REFUND_GAS)
+        results = pipeline.wait_all()
+        txs = [
+            {
+                "label": r["label"],
+                "status": r["status"],
+                "reverted": r["receipt"] is not None and r["status"] != 1,
+                "error": r["error"],
+                "latency": (
+                    r["confirmed_at"] - r["submitted_at"] if r["confirmed_at"] is not None else None
+                ),
+            }
+            for r in results
+        ]
+        confirmed = [r["confirmed_at"] for r in results if r["confirmed_at"] is not None]
+        submitted = [r["submitted_at"] for r in results if r["submitted_at"] is not None]
+        flows.append(
+            {
+                "kind": kind,
+                "ok": all(r["status"] == 1 for r in results),
+                "latency": max(confirmed) - min(submitted) if confirmed and submitted else None,
+                "txs": txs,
+            }
+        )
+    return flows
+
+
+def summarize(flows, elapsed):
+    """흐름 목록을 처리량, 확인 지연 백분위수, revert 비율로 요약"""
+    txs = [tx for flow in flows for tx in flow["txs"]]
+    reverts = sum(1 for tx in txs if tx["reverted"])
+    errors = sum(1 for tx in txs if tx["error"] and not tx["reverted"])
+    by_label = {}
+    for tx in txs:
+        stats = by_label.setdefault(tx["label"], {"count": 0, "reverts": 0, "latencies": []})
+        stats["count"] += 1
+        stats["reverts"] += 1 if tx["reverted"] else 0
+        if tx["latency"] is not None:
+            stats["latencies"].append(tx["latency"])
+    completed = sum(1 for flow in flows if flow["ok"])
+    return {
+        "elapsed": elapsed,
+        "flows": len(flows),
+        "flows_ok": completed,
+        "transactions": len(txs),
+        "throughput_flows_per_s": completed / elapsed if elapsed else 0.0,
+        "throughput_tx_per_s": len(txs) / elapsed if elapsed else 0.0,
+        "reverts": reverts,
+        "errors": errors,
+        "revert_rate": reverts / len(txs) if txs else 0.0,
+        "flow_latency": latency_summary([f["latency"] for f in flows if f["latency"] is not None]),
+        "tx_latency": latency_summary([tx["latency"] for tx in txs if tx["latency"] is not None]),
+        "by_function": {
+            label: {
+                "count": stats["count"],
+                "reverts": stats["reverts"],
+                "latency": latency_summary(stats["latencies"]),
+            }
+            for label, stats in by_label.items()
+        },
+    }
+
+
+def run_load(args):
+    web3, backend = connect(args.provider)
+    mnemonic = args.mnemonic or read_compose_mnemonic()
+    # 0번 계정은 ganache 기본 배포 계정과 같으므로 제조사 겸 충전 계정으로 사용
+    manufacturer, *devices = derive_accounts(mnemonic, args.devices + 1)
+    per_flow = PRICE + (PURCHASE_GAS + max(INSTALL_GAS, REFUND_GAS)) * web3.to_wei(
+        GAS_PRICE_GWEI, "gwei"
+    )
+    device_balance = per_flow * args.iterations * 2
+    if args.provider:
+        fund_accounts(web3, manufacturer, [d.address for d in devices], device_balance)
+    else:
+        # in-process 체인은 니모닉 계정에 잔액이 없으므로 eth-tester 기본 계정에서 충전
+        funder = web3.eth.accounts[0]
+        fund_accounts(web3, funder, [manufacturer.address], Web3.to_wei(1000, "ether"), sign=False)
+        fund_accounts(web3, funder, [d.address for d in devices], device_balance, sign=False)
+
+    abi, bytecode = compile_contract_cached(UPDATE_CONTRACT_PATH)
+    if args.contract_address:
+        contract = web3.eth.contract(address=Web3.to_checksum_address(args.contract_address), abi=abi)
+    else:
+        contract = deploy_update_contract(web3, manufacturer, abi, bytecode)
+    logger.info(f"대상 컨트랙트: {contract.address} ({backend})")
+    uids = register_updates(web3, contract, manufacturer, args.updates)
+
+    logger.info(
+        f"부하 생성 시작: 기기 {len(devices)}대, 워커 {args.workers}개, 기기당 {args.iterations}회"
+    )
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        futures = [
+            executor.submit(
+                run_device,
+                web3,
+                contract,
+                device,
+                uids,
+                args.iterations,
+                args.refund_ratio,
+                args.seed + index,
+                index,
+            )
+            for index, device in enumerate(devices)
+        ]
+        flows = [flow for future in futures for flow in future.result()]
+    elapsed = time.perf_counter() - started
+
+    report = summarize(flows, elapsed)
+    report.update(
+        {
+            "generated_at": datetime.now(timezone.utc).isoformat(),
+            "backend": backend,
+            "contract": contract.address,
+            "devices": len(devices),
+            "workers": args.workers,
+            "iterations": args.iterations,
+            "refund_ratio": args.refund_ratio,
+        }
+    )
+    return report
+
+
+def _ms(value):
+    return f"{value * 1000:>9.1f}" if value is not None else f"{'-':>9}"
+
+
+def print_report(report):
+    print(f"backend: {report['backend']}  devices: {report['devices']}  workers: {report['workers']}")
+    print(
+        f"flows: {report['flows_ok']}/{report['flows']} ok in {report['elapsed']:.2f}s  "
+        f"throughput: {report['throughput_flows_per_s']:.2f} flows/s, "
+        f"{report['throughput_tx_per_s']:.2f} tx/s"
+    )
+    print(
+        f"reverts: {report['reverts']}/{report['transactions']} "
+        f"({report['revert_rate'] * 100:.2f}%)  errors: {report['errors']}"
+    )
+    print(f"{'latency (ms)':<24}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}")
+    rows = [("flow", report["flow_latency"]), ("tx", report["tx_latency"])]
+    rows += [(label, stats["latency"]) for label, stats in sorted(report["by_function"].items())]
+    for name, stats in rows:
+        print(
+            f"{name:<24}{_ms(stats.get('p50'))}{_ms(stats.get('p95'))}"
+            f"{_ms(stats.get('p99'))}{_ms(stats.get('max'))}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="기기 fleet 구매/설치/환불 부하 생성기")
+    parser.add_argument(
+        "--provider",
+        default=os.getenv("WEB3_PROVIDER", ""),
+        help="ganache/anvil RPC 주소 (생략 시 in-process EVM)",
+    )
+    parser.add_argument("--mnemonic", default="", help="기본값: blockchain-server 설정의 니모닉")
+    parser.add_argument("--contract-address", default="", help="이미 배포된 컨트랙트 (0번 계정이 제조사)")
+    parser.add_argument("--devices", type=int, default=20, help="파생할 기기 계정 수")
+    parser.add_argument("--workers", type=int, default=8, help="동시 실행 워커 수")
+    parser.add_argument("--iterations", type=int, default=5, help="기기당 흐름 실행 횟수")
+    parser.add_argument("--updates", type=int, default=10, help="등록할 업데이트 수")
+    parser.add_argument("--refund-ratio", type=float, default=0.1, help="설치 대신 환불하는 흐름 비율")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    args = parser.parse_args()
+    if args.iterations > args.updates:
+        # 같은 업데이트를 다시 구매하면 설치 확인이 "Already installed"로 revert됨
+        parser.error("--iterations는 --updates보다 클 수 없습니다.")
+
+    report = run_load(args)
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+    logger.info(f"부하 테스트 결과가 {args.output}에 저장되었습니다.")
+    print_report(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,299 @@
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import hashlib
+from datetime import datetime, timezone
+from eth_account import Account
+from web3 import Web3, EthereumTesterProvider
+
+# 공용 모듈 경로 추가 (저장소 루트의 common)
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCH_DIR)
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from common.compile_cache import DEFAULT_SOLC_VERSION, compile_contract_cached  # noqa: E402
+from common.update_codec import decode_ipfs_hash  # noqa: E402
+from common.update_signing import build_register_args, build_register_batch_args  # noqa: E402
+
+# 로깅 설정
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+UPDATE_CONTRACT_PATH = os.path.join(
+    REPO_ROOT, "update_service", "contracts", "SoftwareUpdateContract.sol"
+)
+DEFAULT_OUTPUT = os.path.join(BENCH_DIR, "results", "latest.json")
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, "baseline.json")
+PAGE_SIZE = 50
+PRICE = 1000
+
+
+class Chain:
+    """in-process EVM(eth-tester/py-evm) 위에 SoftwareUpdateContract를 배포한 벤치마크 환경"""
+
+    def __init__(self, abi, bytecode):
+        provider = EthereumTesterProvider()
+        self.tester = provider.ethereum_tester
+        self.web3 = Web3(provider)
+        self.manufacturer = self.web3.eth.accounts[0]
+        self.manufacturer_key = self.tester.backend.account_keys[0].to_hex()
+        factory = self.web3.eth.contract(abi=abi, bytecode=bytecode)
+        tx_hash = factory.constructor().transact({"from": self.manufacturer})
+        receipt = self.web3.eth.wait_for_transaction_receipt(tx_hash)
+        self.contract = self.web3.eth.contract(address=receipt.contractAddress, abi=abi)
+        self._update_seq = 0
+
+    def new_accounts(self, count, balance_wei):
+        """새 계정을 만들어 eth-tester에 등록하고 잔액을 충전"""
+        accounts = []
+        for _ in range(count):
+            account = Account.create()
+            self.tester.add_account(Web3.to_hex(account.key))
+            self.web3.eth.send_transaction(
+                {"from": self.manufacturer, "to": account.address, "value": balance_wei}
+            )
+            accounts.append(account.address)
+        return accounts
+
+    def _next_update(self, price):
+        self._update_seq += 1
+        uid = f"bench-{self._update_seq:06d}"
+        payload_digest = hashlib.sha256(uid.encode("utf-8")).digest()
+        return (
+            uid,
+            decode_ipfs_hash(payload_digest),
+            b"\x01" * 32,
+            payload_digest.hex(),
+            f"benchmark update {self._update_seq}",
+            price,
+            "1.0.0",
+        )
+
+    def register_update(self, price=PRICE):
+        """서명된 업데이트를 하나 등록하고 (uid, 가스, 소요 시간) 반환"""
+        update = self._next_update(price)
+        uid = update[0]
+        args = build_register_args(self.manufacturer_key, *update)
+        gas, seconds = measure_tx(
+            self.web3,
+            self.contract.functions.registerUpdate(*args),
+            {"from": self.manufacturer},
+        )
+        return uid, gas, seconds
+
+    def register_updates_batch(self, count, price=PRICE):
+        """업데이트 count개를 서명 한 번으로 등록하고 (uid 목록, 가스, 소요 시간) 반환"""
+        updates = [self._next_update(price) for _ in range(count)]
+        items, signature = build_register_batch_args(self.manufacturer_key, updates)
+        gas, seconds = measure_tx(
+            self.web3,
+            self.contract.functions.registerUpdatesBatch(items, signature),
+            {"from": self.manufacturer},
+        )
+        return [u[0] for u in updates], gas, seconds
+
+
+def measure_tx(web3, contract_function, tx):
+    start = time.perf_counter()
+    tx_hash = contract_function.transact(tx)
+    receipt = web3.eth.wait_for_transaction_receipt(tx_hash)
+    seconds = time.perf_counter() - start
+    if receipt.status != 1:
+        raise RuntimeError(f"트랜잭션 실패: {contract_function.fn_name}")
+    return receipt.gasUsed, seconds
+
+
+def measure_call(contract_function, tx):
+    """view 함수의 가스(estimate_gas)와 eth_call 소요 시간 측정"""
+    try:
+        gas = contract_function.estimate_gas(tx)
+    except Exception as e:
+        return {"error": str(e)}
+    start = time.perf_counter()
+    contract_function.call(tx)
+    return {"gas": gas, "seconds": time.perf_counter() - start}
+
+
+def bench_catalogue(abi, bytecode, sizes, results):
+    """등록된 업데이트 수(N)에 따른 registerUpdate 및 카탈로그 조회 비용"""
+    chain = Chain(abi, bytecode)
+    (owner,) = chain.new_accounts(1, Web3.to_wei(1, "ether"))
+    registered = 0
+    for size in sorted(sizes):
+        while registered < size:
+            _, gas, seconds = chain.register_update()
+            registered += 1
+        label = f"updates={size}"
+        results[f"registerUpdate[{label}]"] = {"gas": gas, "seconds": seconds}
+        functions = chain.contract.functions
+        results[f"getAvailableUpdatesForOwner[{label}]"] = measure_call(
+            functions.getAvailableUpdatesForOwner(), {"from": owner}
+        )
+        results[f"getAvailableUpdatesForOwnerPage[{label},limit={PAGE_SIZE}]"] = measure_call(
+            functions.getAvailableUpdatesForOwnerPage(0, PAGE_SIZE), {"from": owner}
+        )
+        logger.info(f"카탈로그 벤치마크 완료: {label}")
+
+
+def bench_batch(abi, bytecode, sizes, results):
+    """묶음 크기(K)에 따른 registerUpdatesBatch의 업데이트당 가스와 지연 (K=1은 registerUpdate와 비교용)"""
+    chain = Chain(abi, bytecode)
+    _, gas, seconds = chain.register_update()
+    results["registerUpdate[single]"] = {"gas": gas, "seconds": seconds}
+    for size in sorted(sizes):
+        label = f"batch={size}"
+        _, gas, seconds = chain.register_updates_batch(size)
+        results[f"registerUpdatesBatch[{label}]"] = {"gas": gas, "seconds": seconds}
+        results[f"registerUpdatesBatch[{label},per_update]"] = {
+            "gas": gas // size,
+            "seconds": seconds / size,
+        }
+        logger.info(f"배치 등록 벤치마크 완료: {label}")
+
+
+def bench_buyers(abi, bytecode, sizes, results):
+    """업데이트별 구매자 수(B)에 따른 구매/설치/취소/환불 비용"""
+    chain = Chain(abi, bytecode)
+    buyers = chain.new_accounts(max(sizes), Web3.to_wei(1, "ether"))
+    functions = chain.contract.functions
+    for size in sorted(sizes):
+        label = f"buyers={size}"
+        uid, _, _ = chain.register_update()
+        purchase = [
+            measure_tx(chain.web3, functions.purchaseUpdate(uid), {"from": buyer, "value": PRICE})
+            for buyer in buyers[:size]
+        ]
+        results[f"purchaseUpdate[{label}]"] = {
+            "gas": purchase[-1][0],
+            "seconds": sum(s for _, s in purchase) / len(purchase),
+        }
+        # 첫 구매자만 설치를 확인하고 나머지는 취소 후 환불 대상이 됨
+        gas, seconds = measure_tx(
+            chain.web3,
+            functions.confirmInstallation(uid, "bench-device"),
+            {"from": buyers[0]},
+        )
+        results[f"confirmInstallation[{label}]"] = {"gas": gas, "seconds": seconds}
+        gas, seconds = measure_tx(
+            chain.web3, functions.cancelUpdate(uid), {"from": chain.manufacturer}
+        )
+        results[f"cancelUpdate[{label}]"] = {"gas": gas, "seconds": seconds}
+        gas, seconds = measure_tx(
+            chain.web3, functions.processRefunds(uid, size), {"from": chain.manufacturer}
+        )
+        results[f"processRefunds[{label}]"] = {"gas": gas, "seconds": seconds}
+        logger.info(f"구매자 벤치마크 완료: {label}")
+
+
+def bench_history(abi, bytecode, sizes, results):
+    """구매 기록 길이(H)에 따른 getOwnerUpdateHistory 비용"""
+    chain = Chain(abi, bytecode)
+    (owner,) = chain.new_accounts(1, Web3.to_wei(1, "ether"))
+    functions = chain.contract.functions
+    purchased = 0
+    for size in sorted(sizes):
+        while purchased < size:
+            uid, _, _ = chain.register_update()
+            measure_tx(chain.web3, functions.purchaseUpdate(uid), {"from": owner, "value": PRICE})
+            purchased += 1
+        label = f"history={size}"
+        results[f"getOwnerUpdateHistory[{label}]"] = measure_call(
+            functions.getOwnerUpdateHistory(), {"from": owner}
+        )
+        results[f"getOwnerUpdateHistoryPage[{label},limit={PAGE_SIZE}]"] = measure_call(
+            functions.getOwnerUpdateHistoryPage(0, PAGE_SIZE), {"from": owner}
+        )
+        logger.info(f"구매 기록 벤치마크 완료: {label}")
+
+
+def compare_with_baseline(results, baseline, tolerance):
+    """기준 파일보다 가스가 tolerance 비율 이상 늘어난 항목을 (이름, 기준, 현재) 목록으로 반환"""
+    regressions = []
+    for name, base in baseline.get("results", {}).items():
+        current = results.get(name)
+        if not current or "gas" not in current or "gas" not in base:
+            continue
+        if current["gas"] > base["gas"] * (1 + tolerance):
+            regressions.append((name, base["gas"], current["gas"]))
+    return regressions
+
+
+def _write_json(path, data):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+
+
+def _parse_sizes(value):
+    return [int(v) for v in value.split(",") if v]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SoftwareUpdateContract 가스/지연 벤치마크")
+    parser.add_argument("--updates", type=_parse_sizes, default=[10, 50, 100])
+    parser.add_argument("--buyers", type=_parse_sizes, default=[1, 10, 50])
+    parser.add_argument("--history", type=_parse_sizes, default=[1, 10, 50])
+    parser.add_argument("--batch", type=_parse_sizes, default=[1, 10, 50])
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument(
+        "--contract", default=UPDATE_CONTRACT_PATH, help="측정할 컨트랙트 소스 (CI에서 기준 커밋 측정용)"
+    )
+    parser.add_argument(
+        "--tolerance", type=float, default=0.01, help="허용 가스 증가율 (기본 1%%)"
+    )
+    parser.add_argument(
+        "--update-baseline", action="store_true", help="이번 결과로 기준 파일을 갱신"
+    )
+    args = parser.parse_args()
+    # 기준 파일이 없으면 회귀를 판정할 수 없으므로, 오래 걸리는 측정 전에 실패로 종료
+    if not args.update_baseline and not os.path.exists(args.baseline):
+        logger.error(
+            f"기준 파일이 없어 가스 회귀를 확인할 수 없습니다: {args.baseline} "
+            "(먼저 --update-baseline으로 생성해 커밋하세요)"
+        )
+        sys.exit(2)
+
+    abi, bytecode = compile_contract_cached(args.contract)
+    results = {}
+    bench_catalogue(abi, bytecode, args.updates, results)
+    bench_batch(abi, bytecode, args.batch, results)
+    bench_buyers(abi, bytecode, args.buyers, results)
+    bench_history(abi, bytecode, args.history, results)
+
+    report = {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "backend": "eth-tester/py-evm",
+        "solc_version": DEFAULT_SOLC_VERSION,
+        "results": results,
+    }
+    _write_json(args.output, report)
+    logger.info(f"벤치마크 결과가 {args.output}에 저장되었습니다.")
+
+    for name in sorted(results):
+        metrics = results[name]
+        if "error" in metrics:
+            print(f"{name:<60} error: {metrics['error']}")
+        else:
+            print(f"{name:<60} {metrics['gas']:>12,} gas {metrics['seconds'] * 1000:>10.2f} ms")
+
+    if args.update_baseline:
+        _write_json(args.baseline, report)
+        logger.info(f"기준 파일을 갱신했습니다: {args.baseline}")
+        return
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    regressions = compare_with_baseline(results, baseline, args.tolerance)
+    for name, base_gas, gas in regressions:
+        logger.error(f"가스 증가 감지: {name} {base_gas:,} → {gas:,}")
+    if regressions:
+        sys.exit(1)
+    logger.info("기준 대비 가스 회귀 없음")
+
+
+if __name__ == "__main__":
+    main()
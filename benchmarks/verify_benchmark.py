@@ -0,0 +1,175 @@
+import os
+import sys
+import json
+import time
+import shutil
+import hashlib
+import logging
+import argparse
+import tempfile
+import threading
+import tracemalloc
+from datetime import datetime, timezone
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+# 공용 모듈 경로 추가 (저장소 루트의 common)
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCH_DIR)
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from common.catalogue import UpdateRecord  # noqa: E402
+from common.payloads import HttpContentStore, LocalContentStore, PayloadVerifier  # noqa: E402
+from common.update_codec import decode_ipfs_hash  # noqa: E402
+
+# 로깅 설정
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_OUTPUT = os.path.join(BENCH_DIR, "results", "verify-latest.json")
+MIB = 1024 * 1024
+
+
+def parse_list(value):
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+def heap_peak_mb():
+    """마지막 reset 이후 파이썬 힙 할당 최대치(MB)
+
+    메모리 맵으로 읽은 파일 페이지는 RSS에는 잡히지만 회수 가능한 페이지 캐시이므로,
+    페이로드 크기만큼 버퍼를 잡는지는 힙 할당으로 비교한다.
+    """
+    return tracemalloc.get_traced_memory()[1] / MIB
+
+
+def write_payload(store, index, size_mb):
+    """index별로 내용이 다른 size_mb MiB 합성 페이로드를 저장소에 쓰고 UpdateRecord 반환"""
+    block = bytearray(os.urandom(MIB))
+    digest = hashlib.sha256()
+    os.makedirs(store.root, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=store.root, suffix=".tmp")
+    with os.fdopen(fd, "wb") as f:
+        for i in range(size_mb):
+            block[:8] = (index * size_mb + i).to_bytes(8, "big")
+            digest.update(block)
+            f.write(block)
+    cid = decode_ipfs_hash(digest.digest())
+    os.replace(tmp_path, store.path(cid))
+    return UpdateRecord(f"bench-{index:03d}", cid, b"", digest.hexdigest(), 0, "1.0.0", True)
+
+
+def serve_directory(root):
+    """<root>/<cid>를 /ipfs/<cid>로 제공하는 로컬 HTTP 서버 (게이트웨이 대용)"""
+    ipfs_dir = os.path.join(os.path.dirname(root), "ipfs")
+    if not os.path.exists(ipfs_dir):
+        os.symlink(root, ipfs_dir)
+
+    class QuietHandler(SimpleHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(
+        ("127.0.0.1", 0), partial(QuietHandler, directory=os.path.dirname(root))
+    )
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def run_case(store, records, workers, chunk_size):
+    verifier = PayloadVerifier(None, store, workers=workers, chunk_size=chunk_size)
+    tracemalloc.reset_peak()
+    started = time.perf_counter()
+    results = verifier.verify_records(records)
+    elapsed = time.perf_counter() - started
+    total_mb = sum(r.size for r in results) / MIB
+    return {
+        "workers": workers,
+        "chunk_mib": chunk_size / MIB,
+        "seconds": elapsed,
+        "mb_per_s": total_mb / elapsed if elapsed else None,
+        "all_ok": all(r.ok for r in results),
+        "heap_peak_mb": heap_peak_mb(),
+    }
+
+
+def run_benchmark(args):
+    work_dir = args.dir or tempfile.mkdtemp(prefix="payload-bench-")
+    store = LocalContentStore(os.path.join(work_dir, "payloads"))
+    try:
+        logger.info(f"합성 페이로드 생성: {args.count}개 × {args.size_mb} MiB → {store.root}")
+        records = [write_payload(store, i, args.size_mb) for i in range(args.count)]
+        stores = {"local": store}
+        server = None
+        if args.http:
+            server = serve_directory(store.root)
+            stores["http"] = HttpContentStore(f"http://127.0.0.1:{server.server_address[1]}")
+
+        cases = []
+        for name, case_store in stores.items():
+            for chunk_mib in parse_list(args.chunk_mib):
+                for workers in parse_list(args.workers):
+                    case = run_case(case_store, records, workers, chunk_mib * MIB)
+                    case["store"] = name
+                    logger.info(
+                        f"{name} chunk={chunk_mib}MiB workers={workers}: "
+                        f"{case['mb_per_s']:.0f} MB/s ({case['seconds']:.2f}s)"
+                    )
+                    cases.append(case)
+        if server is not None:
+            server.shutdown()
+
+        # 비교용: 파일 전체를 한 번에 읽어 해시하면 힙 사용량이 페이로드 크기만큼 늘어남
+        tracemalloc.reset_peak()
+        with open(store.path(records[0].ipfs_hash), "rb") as f:
+            hashlib.sha256(f.read()).hexdigest()
+        whole_read_heap_peak = heap_peak_mb()
+    finally:
+        if not args.dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "cpu_count": os.cpu_count(),
+        "payloads": args.count,
+        "payload_mib": args.size_mb,
+        "cases": cases,
+        "whole_read_heap_peak_mb": whole_read_heap_peak,
+    }
+
+
+def print_report(report):
+    print(f"\n페이로드 {report['payloads']}개 × {report['payload_mib']} MiB (CPU {report['cpu_count']}개)")
+    print(f"{'store':<6} {'chunk':>7} {'workers':>7} {'MB/s':>9} {'seconds':>8} {'heap peak':>9}  ok")
+    for c in report["cases"]:
+        print(
+            f"{c['store']:<6} {c['chunk_mib']:>5.0f}Mi {c['workers']:>7} {c['mb_per_s']:>9.0f} "
+            f"{c['seconds']:>8.2f} {c['heap_peak_mb']:>7.1f}MB  {'yes' if c['all_ok'] else 'NO'}"
+        )
+    print(f"비교: 파일 전체를 읽어 해시할 때 힙 최대치 {report['whole_read_heap_peak_mb']:.1f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="페이로드 검증 처리량 벤치마크")
+    parser.add_argument("--count", type=int, default=8, help="합성 페이로드 수")
+    parser.add_argument("--size-mb", type=int, default=256, help="페이로드 하나의 크기(MiB)")
+    parser.add_argument("--workers", default="1,2,4,8", help="비교할 스레드 수 목록")
+    parser.add_argument("--chunk-mib", default="1,4,16", help="비교할 조각 크기 목록(MiB)")
+    parser.add_argument("--http", action="store_true", help="로컬 HTTP 게이트웨이 경유 처리량도 측정")
+    parser.add_argument("--dir", help="페이로드를 만들 디렉터리 (지정하면 삭제하지 않음)")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="결과 JSON 경로")
+    args = parser.parse_args()
+
+    tracemalloc.start()
+    report = run_benchmark(args)
+    tracemalloc.stop()
+    print_report(report)
+    os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+    logger.info(f"결과가 {args.output}에 저장되었습니다.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+"""registry-service / update_service 배포 스크립트와 클라이언트가 함께 사용하는 공용 모듈"""
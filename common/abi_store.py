@@ -0,0 +1,74 @@
+import os
+import json
+import logging
+import tempfile
+import threading
+from eth_utils import keccak
+
+logger = logging.getLogger(__name__)
+
+# 컴파일 캐시와 같은 공유 디렉터리 아래에 다이제스트별로 ABI 본문을 저장
+DEFAULT_STORE_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), ".artifacts", "abi"
+)
+
+
+def canonical_abi_json(abi):
+    """키 정렬, 공백 제거로 같은 ABI가 항상 같은 바이트가 되도록 직렬화"""
+    return json.dumps(abi, sort_keys=True, separators=(",", ":")).encode("utf-8")
+
+
+def abi_digest(abi):
+    """AddressRegistry.setAbiHash에 기록하는 keccak256 다이제스트"""
+    return keccak(canonical_abi_json(abi))
+
+
+class AbiStore:
+    """ABI 본문을 다이제스트로 찾는 로컬 저장소 (읽을 때마다 다이제스트를 검증)"""
+
+    def __init__(self, store_dir=None):
+        self.store_dir = store_dir or os.getenv("ABI_STORE_DIR", DEFAULT_STORE_DIR)
+        self._lock = threading.Lock()
+        self._memory = {}
+
+    def _path(self, digest):
+        return os.path.join(self.store_dir, f"{bytes(digest).hex()}.json")
+
+    def put(self, abi):
+        """ABI를 저장하고 다이제스트(bytes32) 반환"""
+        body = canonical_abi_json(abi)
+        digest = keccak(body)
+        path = self._path(digest)
+        if not os.path.exists(path):
+            os.makedirs(self.store_dir, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.store_dir, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(body)
+                os.replace(tmp_path, path)
+            except Exception:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+        with self._lock:
+            self._memory[digest] = abi
+        return digest
+
+    def get(self, digest):
+        """다이제스트에 해당하는 ABI 반환 (메모리 → 디스크 순으로 조회)"""
+        digest = bytes(digest)
+        with self._lock:
+            abi = self._memory.get(digest)
+        if abi is not None:
+            return abi
+        try:
+            with open(self._path(digest), "rb") as f:
+                body = f.read()
+        except OSError:
+            raise KeyError(f"ABI 저장소에 없는 다이제스트입니다: 0x{digest.hex()}")
+        if keccak(body) != digest:
+            raise ValueError(f"ABI 다이제스트가 일치하지 않습니다: 0x{digest.hex()}")
+        abi = json.loads(body)
+        with self._lock:
+            self._memory[digest] = abi
+        return abi
@@ -0,0 +1,166 @@
+from collections import namedtuple
+from eth_utils import event_abi_to_log_topic
+from common.log_ranges import LogRangeReader
+from common.update_codec import decode_ipfs_hash, decode_update_hash, decode_version
+
+DEFAULT_PAGE_SIZE = 50
+# eth_call 가스 상한에 걸리지 않도록 한 번의 일괄 조회에 담는 최대 업데이트 수
+DEFAULT_BATCH_SIZE = 200
+
+UpdateRecord = namedtuple(
+    "UpdateRecord",
+    [
+        "uid",
+        "ipfs_hash",
+        "encrypted_key",
+        "hash_of_update",
+        "price",
+        "version",
+        "is_valid",
+    ],
+)
+
+UpdateSummary = namedtuple(
+    "UpdateSummary",
+    ["uid", "ipfs_hash", "hash_of_update", "price", "version", "is_valid"],
+)
+
+UpdateHistory = namedtuple(
+    "UpdateHistory",
+    [
+        "uid",
+        "ipfs_hash",
+        "encrypted_key",
+        "hash_of_update",
+        "price",
+        "version",
+        "is_valid",
+        "is_purchased",
+        "is_installed",
+        "is_refunded",
+        "purchase_time",
+        "install_time",
+        "refund_time",
+    ],
+)
+
+# 컨트랙트의 압축 형식(bytes32, uint64)을 사람이 읽는 값으로 되돌리는 필드별 변환
+_FIELD_DECODERS = {
+    "ipfs_hash": decode_ipfs_hash,
+    "hash_of_update": decode_update_hash,
+    "version": decode_version,
+}
+
+
+def decode_record(record_type, item):
+    """컨트랙트 구조체 튜플을 record_type으로 변환하면서 압축된 필드를 복원"""
+    return record_type(
+        *(
+            _FIELD_DECODERS[name](value) if name in _FIELD_DECODERS else value
+            for name, value in zip(record_type._fields, item)
+        )
+    )
+
+
+def _decode_update(item):
+    """UpdateRecord 구조체(마지막 필드가 exists)를 변환, 없는 업데이트면 None
+
+    다이제스트 등 다른 필드는 0일 수 있으므로 존재 여부는 컨트랙트의 exists로만 판단한다.
+    """
+    *fields, exists = item
+    return decode_record(UpdateRecord, fields) if exists else None
+
+
+def get_update(contract, uid):
+    """uid 하나의 업데이트 정보를 UpdateRecord로 반환 (없는 uid면 None)"""
+    return fetch_updates(contract, [uid])[0]
+
+
+def fetch_descriptions(web3, contract, from_block, to_block, ranges=None):
+    """description은 저장소에 두지 않으므로 UpdateRegistered 이벤트에서 {uid: description}을 읽음
+
+    호출하는 쪽이 아는 구간 [from_block, to_block]만 LogRangeReader로 나누어 조회하므로
+    체인이 길어져도 이미 읽은 블록을 다시 읽지 않고, 구간 제한이 있는 노드에서도 동작한다.
+    ranges를 넘기면 조절된 구간 크기를 다음 호출에서 이어서 쓴다.
+    """
+    event = contract.events.UpdateRegistered()
+    if ranges is None:
+        ranges = LogRangeReader(web3, contract.address, [event_abi_to_log_topic(event.abi)])
+    descriptions = {}
+    while from_block <= to_block:
+        end, logs = ranges.next_range(from_block, to_block)
+        for log in logs:
+            args = event.process_log(log)["args"]
+            descriptions[args["uid"]] = args["description"]
+        from_block = end + 1
+    return descriptions
+
+
+def _iter_pages(contract_function, owner, page_size, record_type, start=0):
+    # 한 번에 한 페이지씩만 조회하므로 카탈로그 크기와 무관하게 메모리 사용량이 일정함
+    cursor = start
+    while True:
+        page, next_cursor = contract_function(cursor, page_size).call({"from": owner})
+        for item in page:
+            yield decode_record(record_type, item)
+        if next_cursor == 0:
+            return
+        cursor = next_cursor
+
+
+def iter_available_updates(contract, owner, page_size=DEFAULT_PAGE_SIZE, start=0):
+    """owner가 설치/환불하지 않은 업데이트를 getAvailableUpdatesForOwnerPage로 한 페이지씩 반환"""
+    return _iter_pages(
+        contract.functions.getAvailableUpdatesForOwnerPage,
+        owner,
+        page_size,
+        UpdateSummary,
+        start,
+    )
+
+
+def iter_owner_update_history(contract, owner, page_size=DEFAULT_PAGE_SIZE, start=0):
+    """owner의 구매 기록을 getOwnerUpdateHistoryPage로 한 페이지씩 반환"""
+    return _iter_pages(
+        contract.functions.getOwnerUpdateHistoryPage,
+        owner,
+        page_size,
+        UpdateHistory,
+        start,
+    )
+
+
+def fetch_updates(contract, uids, batch_size=DEFAULT_BATCH_SIZE):
+    """getUpdateInfoBatch로 uids의 업데이트 정보를 batch_size개씩 묶어 조회
+
+    결과는 uids와 같은 순서이며 없는 uid 자리는 None이다.
+    """
+    uids = list(uids)
+    records = []
+    for i in range(0, len(uids), batch_size):
+        batch = contract.functions.getUpdateInfoBatch(uids[i : i + batch_size]).call()
+        records.extend(_decode_update(item) for item in batch)
+    return records
+
+
+def fetch_updates_range(contract, start=0, limit=None, batch_size=DEFAULT_BATCH_SIZE):
+    """getUpdatesRange로 updateIds[start:start + limit] 구간의 ID와 정보를 일괄 조회
+
+    limit이 None이면 끝까지 조회한다. 전체 개수는 첫 응답에 함께 오므로 별도의
+    getUpdateCount() 호출이 필요 없다.
+    """
+    records = []
+    cursor = start
+    end = None if limit is None else start + limit
+    total = None
+    while total is None or cursor < end:
+        size = batch_size if end is None else min(batch_size, end - cursor)
+        if size <= 0:
+            break
+        batch, total = contract.functions.getUpdatesRange(cursor, size).call()
+        end = total if end is None else min(end, total)
+        if not batch:
+            break
+        records.extend(_decode_update(item) for item in batch)
+        cursor += len(batch)
+    return records
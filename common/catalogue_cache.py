@@ -0,0 +1,227 @@
+import json
+import hashlib
+import logging
+import threading
+from collections import OrderedDict, namedtuple
+from common.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# 기기별 보기(owner view)를 몇 개까지 메모리에 둘지 (가장 오래 쓰지 않은 것부터 버림)
+DEFAULT_OWNER_VIEWS = 1024
+
+# 직렬화된 응답 본문과 그 내용으로 만든 ETag (내용 기반이므로 여러 워커 프로세스에서 같은 값)
+CachedView = namedtuple("CachedView", ["body", "etag"])
+
+
+def make_view(payload):
+    body = json.dumps(payload, separators=(",", ":"), sort_keys=True).encode()
+    return CachedView(body, hashlib.blake2b(body, digest_size=16).hexdigest())
+
+
+class OwnerViewLRU:
+    """owner별 보기를 max_entries개까지 보관하는 LRU (스레드 안전)"""
+
+    def __init__(self, max_entries=DEFAULT_OWNER_VIEWS):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, owner, version):
+        """version(카탈로그 버전)으로 만든 보기가 있으면 반환하고 최근 사용으로 표시"""
+        with self._lock:
+            entry = self._entries.get(owner)
+            if entry is None or entry[0] != version:
+                return None
+            self._entries.move_to_end(owner)
+            return entry[1]
+
+    def put(self, owner, version, view):
+        with self._lock:
+            self._entries[owner] = (version, view)
+            self._entries.move_to_end(owner)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def discard(self, owner):
+        with self._lock:
+            self._entries.pop(owner, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class CatalogueCache:
+    """게이트웨이가 노드 대신 읽기 요청에 답하도록 카탈로그를 메모리에 두는 동기화 저장소
+
+    SyncStore와 같은 인터페이스(checkpoint/reset/known_uids/apply_range/rollback)를
+    제공하므로 DeviceSyncClient가 UpdateRegistered 이벤트와 getUpdateInfoBatch로
+    새 업데이트만 채워 넣는다. 카탈로그/업데이트 보기는 바뀐 뒤 처음 읽을 때 한 번만
+    직렬화하고, owner별 보기(getAvailableUpdatesForOwner)는 크기가 제한된 LRU에 둔다.
+    """
+
+    def __init__(self, max_owner_views=DEFAULT_OWNER_VIEWS):
+        self._lock = threading.RLock()
+        self._contract = None
+        self._checkpoint = None
+        self._updates = OrderedDict()
+        # owner → {설치 또는 환불된 uid: 이벤트 블록}; 컨트랙트에서도 한 번 기록되면 풀리지 않음
+        self._excluded = {}
+        self._version = 0
+        self._catalogue_view = None
+        self._update_views = {}
+        self.owner_views = OwnerViewLRU(max_owner_views)
+
+    # --- DeviceSyncClient 저장소 인터페이스 ---
+
+    def checkpoint(self, contract_address):
+        with self._lock:
+            if self._checkpoint is None or self._contract != contract_address:
+                return None
+            return self._checkpoint
+
+    def reset(self, contract_address, block_number):
+        with self._lock:
+            self._contract = contract_address
+            self._checkpoint = (block_number, None)
+            self._updates.clear()
+            self._excluded.clear()
+            self._invalidate()
+
+    def known_uids(self, uids):
+        with self._lock:
+            return {uid for uid in uids if uid in self._updates}
+
+    def apply_range(self, contract_address, block_number, block_hash, events, records, descriptions):
+        """한 구간의 새 업데이트와 이벤트를 반영하고, 내용이 바뀐 보기만 무효화"""
+        with self._lock:
+            if contract_address != self._contract:
+                return
+            changed = set()
+            for r in records:
+                description, registered_block = descriptions[r.uid]
+                self._updates[r.uid] = {
+                    "uid": r.uid,
+                    "ipfs_hash": r.ipfs_hash,
+                    "encrypted_key": bytes(r.encrypted_key).hex(),
+                    "hash_of_update": r.hash_of_update,
+                    "price": int(r.price),
+                    "version": r.version,
+                    "is_valid": bool(r.is_valid),
+                    "description": description,
+                    "registered_block": registered_block,
+                    "cancelled_block": None,
+                }
+                changed.add(r.uid)
+            for event in events:
+                name, uid = event["event"], event["uid"]
+                if name == "UpdateCancelled" and uid in self._updates:
+                    self._updates[uid]["is_valid"] = False
+                    self._updates[uid]["cancelled_block"] = event["block_number"]
+                    changed.add(uid)
+                elif name in ("UpdateInstalled", "UpdateRefunded"):
+                    excluded = self._excluded.setdefault(event["owner"], {})
+                    excluded.setdefault(uid, event["block_number"])
+                    self.owner_views.discard(event["owner"])
+            self._checkpoint = (block_number, block_hash)
+            if changed:
+                self._invalidate(changed)
+
+    def rollback(self, contract_address, block_number):
+        """block_number 이후에 반영한 등록/취소/설치/환불을 되돌리고 모든 보기를 무효화"""
+        with self._lock:
+            for uid in [u for u, item in self._updates.items() if item["registered_block"] > block_number]:
+                del self._updates[uid]
+            for item in self._updates.values():
+                if item["cancelled_block"] is not None and item["cancelled_block"] > block_number:
+                    item["is_valid"] = True
+                    item["cancelled_block"] = None
+            for owner in list(self._excluded):
+                excluded = self._excluded[owner]
+                for uid in [u for u, block in excluded.items() if block > block_number]:
+                    del excluded[uid]
+                if not excluded:
+                    del self._excluded[owner]
+            self._checkpoint = (block_number, None)
+            self._invalidate()
+            self.owner_views.clear()
+
+    def _invalidate(self, uids=None):
+        self._version += 1
+        self._catalogue_view = None
+        if uids is None:
+            self._update_views.clear()
+        else:
+            for uid in uids:
+                self._update_views.pop(uid, None)
+
+    # --- 읽기 (게이트웨이 요청 경로) ---
+
+    @property
+    def block_number(self):
+        return None if self._checkpoint is None else self._checkpoint[0]
+
+    def __len__(self):
+        return len(self._updates)
+
+    @staticmethod
+    def _public(item, hidden=("registered_block", "cancelled_block")):
+        return {k: v for k, v in item.items() if k not in hidden}
+
+    @classmethod
+    def _summary(cls, item):
+        # 목록에는 getAvailableUpdatesForOwnerPage처럼 encrypted_key를 싣지 않음 (업데이트 보기에서 조회)
+        return cls._public(item, ("registered_block", "cancelled_block", "encrypted_key"))
+
+    def catalogue_view(self):
+        """등록 순서대로 정렬된 전체 카탈로그 (encrypted_key 제외)"""
+        view = self._catalogue_view
+        if view is not None:
+            metrics.inc("gateway_cache_total", view="catalogue", result="hit")
+            return view
+        with self._lock:
+            if self._catalogue_view is None:
+                metrics.inc("gateway_cache_total", view="catalogue", result="miss")
+                self._catalogue_view = make_view(
+                    {"updates": [self._summary(item) for item in self._updates.values()]}
+                )
+            return self._catalogue_view
+
+    def update_view(self, uid):
+        """uid 하나의 getUpdateInfo 결과와 description, 없으면 None"""
+        view = self._update_views.get(uid)
+        if view is not None:
+            metrics.inc("gateway_cache_total", view="update", result="hit")
+            return view
+        with self._lock:
+            item = self._updates.get(uid)
+            if item is None:
+                return None
+            metrics.inc("gateway_cache_total", view="update", result="miss")
+            view = self._update_views[uid] = make_view(self._public(item))
+            return view
+
+    def owner_view(self, owner):
+        """owner가 설치하거나 환불받지 않은 업데이트 (getAvailableUpdatesForOwner와 같은 기준)"""
+        version = self._version
+        view = self.owner_views.get(owner, version)
+        if view is not None:
+            metrics.inc("gateway_cache_total", view="owner", result="hit")
+            return view
+        with self._lock:
+            metrics.inc("gateway_cache_total", view="owner", result="miss")
+            excluded = self._excluded.get(owner, {})
+            view = make_view(
+                {
+                    "owner": owner,
+                    "updates": [
+                        self._summary(item) for uid, item in self._updates.items() if uid not in excluded
+                    ],
+                }
+            )
+            self.owner_views.put(owner, self._version, view)
+            return view
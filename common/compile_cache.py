@@ -0,0 +1,136 @@
+import os
+import json
+import hashlib
+import logging
+import tempfile
+from solcx import (
+    compile_source,
+    get_installed_solc_versions,
+    install_solc,
+    set_solc_version,
+)
+from common.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SOLC_VERSION = "0.8.17"
+# 컨테이너에서는 ../common 이 /app/common 으로 마운트되므로 두 서비스가 같은 캐시를 공유한다
+DEFAULT_CACHE_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), ".artifacts"
+)
+# bin-runtime은 이미 배포된 컨트랙트의 eth_getCode와 비교해 재배포를 건너뛸 때 사용
+OUTPUT_VALUES = ["abi", "bin", "bin-runtime"]
+
+
+def get_cache_dir():
+    return os.getenv("SOLC_CACHE_DIR", DEFAULT_CACHE_DIR)
+
+
+def ensure_solc(solc_version=DEFAULT_SOLC_VERSION):
+    """solc 바이너리가 없을 때만 설치하고 버전을 설정"""
+    installed = {str(v) for v in get_installed_solc_versions()}
+    if solc_version not in installed:
+        logger.info(f"solc {solc_version} 설치 중...")
+        with metrics.span("phase", phase="install_solc"):
+            install_solc(solc_version)
+    set_solc_version(solc_version)
+
+
+def artifact_key(source, solc_version, optimize, optimize_runs):
+    """(소스 바이트, solc 버전, 옵티마이저 설정)으로 캐시 키 생성"""
+    settings = {
+        "solc_version": solc_version,
+        "optimize": optimize,
+        "optimize_runs": optimize_runs,
+        "output_values": OUTPUT_VALUES,
+    }
+    digest = hashlib.sha256()
+    digest.update(source)
+    digest.update(json.dumps(settings, sort_keys=True).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def source_artifact_key(
+    contract_path,
+    solc_version=DEFAULT_SOLC_VERSION,
+    optimize=True,
+    optimize_runs=200,
+):
+    """컴파일하지 않고 소스 파일과 설정만으로 산출물 캐시 키 계산"""
+    with open(contract_path, "rb") as file:
+        return artifact_key(file.read(), solc_version, optimize, optimize_runs)
+
+
+def _load_artifact(artifact_path):
+    try:
+        with open(artifact_path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _save_artifact(artifact_path, artifact):
+    # 동시에 실행되는 다른 배포 프로세스가 반쯤 쓰인 파일을 읽지 않도록 교체 방식으로 저장
+    cache_dir = os.path.dirname(artifact_path)
+    os.makedirs(cache_dir, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(artifact, f)
+        os.replace(tmp_path, artifact_path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def compile_artifact(
+    contract_path,
+    solc_version=DEFAULT_SOLC_VERSION,
+    optimize=True,
+    optimize_runs=200,
+    cache_dir=None,
+):
+    """컨트랙트를 컴파일하거나 캐시에서 산출물(ABI, 바이트코드, 런타임 바이트코드)을 읽어 반환"""
+    with open(contract_path, "rb") as file:
+        source = file.read()
+    key = artifact_key(source, solc_version, optimize, optimize_runs)
+    artifact_path = os.path.join(cache_dir or get_cache_dir(), f"{key}.json")
+
+    artifact = _load_artifact(artifact_path)
+    if artifact is not None:
+        logger.info(f"컴파일 캐시 적중: {os.path.basename(contract_path)} ({key[:12]})")
+        metrics.inc("compile_cache_total", result="hit")
+        return artifact
+
+    metrics.inc("compile_cache_total", result="miss")
+    ensure_solc(solc_version)
+    with metrics.span("phase", phase="compile_source"):
+        compiled_sol = compile_source(
+            source.decode("utf-8"),
+            output_values=OUTPUT_VALUES,
+            solc_version=solc_version,
+            optimize=optimize,
+            optimize_runs=optimize_runs,
+        )
+    contract_id = list(compiled_sol.keys())[0]
+    contract_interface = compiled_sol[contract_id]
+    artifact = {
+        "key": key,
+        "contract": contract_id,
+        "abi": contract_interface["abi"],
+        "bin": contract_interface["bin"],
+        "bin_runtime": contract_interface["bin-runtime"],
+    }
+    try:
+        _save_artifact(artifact_path, artifact)
+    except OSError as e:
+        logger.warning(f"컴파일 캐시 저장 실패: {e}")
+    logger.info(f"컨트랙트 컴파일 완료 후 캐시에 저장: {contract_id} ({key[:12]})")
+    return artifact
+
+
+def compile_contract_cached(contract_path, **kwargs):
+    """compile_artifact 결과를 (abi, bytecode) 튜플로 반환"""
+    artifact = compile_artifact(contract_path, **kwargs)
+    return artifact["abi"], artifact["bin"]
@@ -0,0 +1,86 @@
+import os
+import json
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_VERSION = 1
+# 요약 표가 한 줄에 들어가도록 오류 메시지를 자르는 길이
+MAX_ERROR_WIDTH = 60
+
+
+def load_manifest(path):
+    """기존 매니페스트를 읽고, 없거나 깨졌으면 빈 매니페스트 반환"""
+    try:
+        with open(path, "r") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {"version": MANIFEST_VERSION, "abis": {}, "networks": {}}
+    manifest.setdefault("abis", {})
+    manifest.setdefault("networks", {})
+    return manifest
+
+
+def network_keys(results):
+    """배포 결과마다 매니페스트 키(chain id) 지정
+
+    같은 chain id를 쓰는 노드가 여럿이면(ganache 기본값 1337 등) 첫 번째만 chain id로,
+    나머지는 "<chain id>@<엔드포인트>"로 기록해 서로 덮어쓰지 않게 한다.
+    """
+    keys = []
+    taken = set()
+    for result in results:
+        key = str(result["chain_id"])
+        if key in taken:
+            logger.warning(f"chain id {key}가 중복되어 {result['endpoint']}는 별도 키로 기록합니다.")
+            key = f"{key}@{result['endpoint']}"
+        taken.add(key)
+        keys.append(key)
+    return keys
+
+
+def record_deployments(path, results, abis):
+    """성공한 배포를 chain id별로 매니페스트에 병합하고 저장 (다른 네트워크 기록은 유지)"""
+    manifest = load_manifest(path)
+    manifest["version"] = MANIFEST_VERSION
+    manifest["abis"].update(abis)
+    succeeded = [r for r in results if r["status"] == "ok"]
+    for key, result in zip(network_keys(succeeded), succeeded):
+        manifest["networks"][key] = {
+            "chain_id": result["chain_id"],
+            "endpoint": result["endpoint"],
+            "AddressRegistry": result["registry_address"],
+            "SoftwareUpdateContract": result["update_address"],
+            "deployed_at": int(time.time()),
+        }
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(manifest, f, indent=2)
+    logger.info(f"배포 매니페스트가 {path}에 저장되었습니다. (네트워크 {len(succeeded)}개 갱신)")
+    return manifest
+
+
+def format_summary(results):
+    """대상별 배포 결과 표 (chain id, 엔드포인트, 상태, 주소, 소요 시간)"""
+    rows = [("chain id", "endpoint", "status", "AddressRegistry", "SoftwareUpdateContract", "time")]
+    for r in results:
+        rows.append(
+            (
+                "-" if r["chain_id"] is None else str(r["chain_id"]),
+                r["endpoint"],
+                r["status"] if r["status"] == "ok" else f"failed: {_shorten(r['error'])}",
+                r["registry_address"] or "-",
+                r["update_address"] or "-",
+                f"{r['seconds']:.2f}s",
+            )
+        )
+    widths = [max(len(row[i]) for row in rows) for i in range(len(rows[0]))]
+    lines = ["  ".join(cell.ljust(width) for cell, width in zip(row, widths)).rstrip() for row in rows]
+    lines.insert(1, "  ".join("-" * width for width in widths))
+    return "\n".join(lines)
+
+
+def _shorten(text):
+    text = str(text or "")
+    return text if len(text) <= MAX_ERROR_WIDTH else text[: MAX_ERROR_WIDTH - 3] + "..."
@@ -0,0 +1,56 @@
+import json
+import logging
+from web3 import Web3
+
+logger = logging.getLogger(__name__)
+
+
+def runtime_code_hash(bin_runtime):
+    """solc bin-runtime(16진수)의 keccak256 (eth_getCode 결과와 같은 방식으로 계산)"""
+    return Web3.keccak(hexstr=bin_runtime).hex()
+
+
+def deployed_code_matches(web3, address, expected_code_hash):
+    """address에 배포된 코드가 expected_code_hash와 같은지 eth_getCode 한 번으로 확인"""
+    if not address or not expected_code_hash:
+        return False
+    code = web3.eth.get_code(Web3.to_checksum_address(address))
+    if not code:
+        return False
+    return Web3.keccak(code).hex() == expected_code_hash
+
+
+def load_deployment(path):
+    """저장된 배포 정보(address, abi, artifact_key, code_hash)를 읽고, 없거나 깨졌으면 None"""
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def save_deployment(path, address, abi, artifact=None):
+    """주소/ABI와 함께 다음 재시작 때 비교할 산출물 키와 런타임 코드 해시를 저장"""
+    data = {"address": address, "abi": abi}
+    if artifact is not None:
+        data["artifact_key"] = artifact["key"]
+        data["code_hash"] = runtime_code_hash(artifact["bin_runtime"])
+    with open(path, "w") as f:
+        f.write(json.dumps(data))
+    logger.info(f"컨트랙트 정보가 {path}에 저장되었습니다.")
+    return data
+
+
+def reusable_deployment(web3, path, artifact_key):
+    """저장된 배포가 같은 소스/설정으로 만들어졌고 체인에 그 코드가 그대로 있으면 반환
+
+    산출물 키는 컴파일 없이 소스에서 계산하므로, 재사용할 수 있을 때 드는 비용은
+    eth_getCode 한 번뿐이다. 체인이 초기화되었거나 소스가 바뀌었으면 None.
+    """
+    deployment = load_deployment(path)
+    if deployment is None or deployment.get("artifact_key") != artifact_key:
+        return None
+    if not deployed_code_matches(web3, deployment.get("address"), deployment.get("code_hash")):
+        logger.info(f"저장된 주소에 기대한 코드가 없어 새로 배포합니다: {deployment.get('address')}")
+        return None
+    return deployment
@@ -0,0 +1,317 @@
+import os
+import sqlite3
+import logging
+import threading
+from eth_utils import event_abi_to_log_topic, to_checksum_address
+from common.catalogue import fetch_updates
+from common.log_ranges import DEFAULT_RANGE_SIZE, MAX_RANGE_SIZE, LogRangeReader, block_hash, resume_block
+from common.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+SYNC_EVENTS = (
+    "UpdateRegistered",
+    "UpdateDelivered",
+    "UpdateInstalled",
+    "UpdateRefunded",
+    "UpdateCancelled",
+)
+DEFAULT_DB_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), ".artifacts", "device_sync.db"
+)
+# 체인 재구성을 감지하면 체크포인트에서 이 블록 수만큼 되돌아가 다시 동기화
+DEFAULT_REORG_DEPTH = 12
+# 3.32 이전 SQLite는 한 쿼리의 바인딩 변수가 최대 999개이므로 IN 목록을 나누어 조회
+SQLITE_IN_CHUNK = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sync_state (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    contract TEXT NOT NULL,
+    block_number INTEGER NOT NULL,
+    block_hash TEXT
+);
+CREATE TABLE IF NOT EXISTS updates (
+    uid TEXT PRIMARY KEY,
+    ipfs_hash TEXT NOT NULL,
+    encrypted_key BLOB NOT NULL,
+    hash_of_update TEXT NOT NULL,
+    price TEXT NOT NULL,
+    version TEXT NOT NULL,
+    is_valid INTEGER NOT NULL,
+    description TEXT,
+    registered_block INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS events (
+    block_number INTEGER NOT NULL,
+    log_index INTEGER NOT NULL,
+    tx_hash TEXT NOT NULL,
+    event TEXT NOT NULL,
+    uid TEXT NOT NULL,
+    owner TEXT,
+    device_id TEXT,
+    PRIMARY KEY (block_number, log_index)
+);
+CREATE INDEX IF NOT EXISTS events_owner_uid ON events (owner, uid, event);
+"""
+
+
+def select_in(conn, query, values, chunk_size=SQLITE_IN_CHUNK):
+    """query의 "IN ({})" 자리에 values를 chunk_size개씩 넣어 실행한 결과 행을 모두 반환"""
+    values = list(values)
+    rows = []
+    for start in range(0, len(values), chunk_size):
+        chunk = values[start:start + chunk_size]
+        rows.extend(conn.execute(query.format(",".join("?" * len(chunk))), chunk).fetchall())
+    return rows
+
+
+class SyncStore:
+    """기기 동기화 결과(체크포인트, 업데이트 정보, 이벤트)를 보관하는 SQLite 저장소
+
+    구간 하나의 이벤트/업데이트와 체크포인트는 한 트랜잭션으로 기록되므로, 중간에
+    종료되어도 마지막으로 완료된 구간부터 다시 시작한다.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or os.getenv("DEVICE_SYNC_DB", DEFAULT_DB_PATH)
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._conn:
+            self._conn.executescript(_SCHEMA)
+
+    def close(self):
+        self._conn.close()
+
+    def checkpoint(self, contract_address):
+        """(마지막으로 동기화한 블록 번호, 블록 해시) 반환, 다른 컨트랙트의 기록이면 None"""
+        row = self._conn.execute(
+            "SELECT contract, block_number, block_hash FROM sync_state WHERE id = 1"
+        ).fetchone()
+        if row is None or row[0] != contract_address:
+            return None
+        return row[1], row[2]
+
+    def reset(self, contract_address, block_number):
+        """새 컨트랙트를 따라가도록 저장된 내용을 모두 지우고 체크포인트를 설정"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM events")
+            self._conn.execute("DELETE FROM updates")
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sync_state (id, contract, block_number, block_hash) "
+                "VALUES (1, ?, ?, NULL)",
+                (contract_address, block_number),
+            )
+
+    def known_uids(self, uids):
+        rows = select_in(self._conn, "SELECT uid FROM updates WHERE uid IN ({})", uids)
+        return {row[0] for row in rows}
+
+    def apply_range(self, contract_address, block_number, block_hash, events, records, descriptions):
+        """한 구간의 이벤트와 새 업데이트 정보를 저장하고 체크포인트를 block_number로 이동
+
+        descriptions는 {uid: (description, 등록 블록)}이며 records의 모든 uid를 포함해야 한다.
+        """
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO events "
+                "(block_number, log_index, tx_hash, event, uid, owner, device_id) "
+                "VALUES (:block_number, :log_index, :tx_hash, :event, :uid, :owner, :device_id)",
+                events,
+            )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO updates "
+                "(uid, ipfs_hash, encrypted_key, hash_of_update, price, version, is_valid, "
+                "description, registered_block) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        r.uid,
+                        r.ipfs_hash,
+                        bytes(r.encrypted_key),
+                        r.hash_of_update,
+                        str(r.price),
+                        r.version,
+                        int(r.is_valid),
+                        *descriptions[r.uid],
+                    )
+                    for r in records
+                ],
+            )
+            self._conn.execute(
+                "UPDATE sync_state SET block_number = ?, block_hash = ? WHERE id = 1 AND contract = ?",
+                (block_number, block_hash, contract_address),
+            )
+
+    def rollback(self, contract_address, block_number):
+        """block_number 이후의 이벤트와 그 구간에 등록된 업데이트를 지우고 체크포인트를 되돌림"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM events WHERE block_number > ?", (block_number,))
+            self._conn.execute("DELETE FROM updates WHERE registered_block > ?", (block_number,))
+            self._conn.execute(
+                "UPDATE sync_state SET block_number = ?, block_hash = NULL WHERE id = 1 AND contract = ?",
+                (block_number, contract_address),
+            )
+
+    def available_updates(self, owner):
+        """owner가 아직 설치하거나 환불받지 않은 유효한 업데이트 (getAvailableUpdatesForOwner의 로컬 버전)
+
+        등록 이후 취소된 업데이트는 UpdateCancelled 이벤트로 제외한다.
+        """
+        rows = self._conn.execute(
+            "SELECT uid, ipfs_hash, hash_of_update, price, version, description FROM updates u "
+            "WHERE u.is_valid = 1 AND NOT EXISTS ("
+            "  SELECT 1 FROM events e WHERE e.uid = u.uid AND ("
+            "    (e.owner = ? AND e.event IN ('UpdateInstalled', 'UpdateRefunded'))"
+            "    OR e.event = 'UpdateCancelled'"
+            "  )"
+            ") ORDER BY registered_block, uid",
+            (owner,),
+        ).fetchall()
+        return [
+            {
+                "uid": uid,
+                "ipfs_hash": ipfs_hash,
+                "hash_of_update": hash_of_update,
+                "price": int(price),
+                "version": version,
+                "description": description,
+            }
+            for uid, ipfs_hash, hash_of_update, price, version, description in rows
+        ]
+
+    def owner_events(self, owner):
+        rows = self._conn.execute(
+            "SELECT block_number, event, uid, device_id FROM events WHERE owner = ? "
+            "ORDER BY block_number, log_index",
+            (owner,),
+        ).fetchall()
+        return [
+            {"block_number": b, "event": e, "uid": u, "device_id": d} for b, e, u, d in rows
+        ]
+
+
+class DeviceSyncClient:
+    """업데이트 등록/구매/설치/환불/취소 로그를 체크포인트부터 이어서 따라가는 동기화 클라이언트
+
+    한 번의 sync_once() 비용은 카탈로그 크기가 아니라 새 이벤트 수에 비례한다.
+    eth_getLogs 구간은 응답 크기와 오류에 따라 자동으로 늘리거나 줄이고, 새로 본 uid에
+    대해서만 getUpdateInfoBatch를 호출한다. owner를 지정하면 해당 계정의 구매/설치/
+    환불 이벤트만 저장한다. 이벤트의 주소는 체크섬 형식이므로 owner도 체크섬 주소로
+    바꿔 두며, 저장소 조회에는 self.owner를 쓴다.
+    """
+
+    def __init__(
+        self,
+        web3,
+        contract,
+        store,
+        owner=None,
+        start_block=0,
+        confirmations=0,
+        reorg_depth=DEFAULT_REORG_DEPTH,
+        range_size=DEFAULT_RANGE_SIZE,
+        min_range_size=1,
+        max_range_size=MAX_RANGE_SIZE,
+        record_fetcher=fetch_updates,
+    ):
+        self.web3 = web3
+        self.contract = contract
+        self.store = store
+        self.owner = to_checksum_address(owner) if owner else None
+        self.confirmations = confirmations
+        self.reorg_depth = reorg_depth
+        self.record_fetcher = record_fetcher
+        self._events = {}
+        for name in SYNC_EVENTS:
+            event = contract.events[name]()
+            self._events[bytes(event_abi_to_log_topic(event.abi))] = event
+        self.ranges = LogRangeReader(
+            web3,
+            contract.address,
+            list(self._events),
+            range_size=range_size,
+            min_range_size=min_range_size,
+            max_range_size=max_range_size,
+        )
+        if store.checkpoint(contract.address) is None:
+            store.reset(contract.address, start_block - 1)
+
+    @property
+    def range_size(self):
+        return self.ranges.range_size
+
+    def _decode(self, logs):
+        events = []
+        descriptions = {}
+        for log in logs:
+            event = self._events.get(bytes(log["topics"][0]))
+            if event is None:
+                continue
+            decoded = event.process_log(log)
+            args = decoded["args"]
+            owner = args.get("owner")
+            if self.owner and owner is not None and owner != self.owner:
+                continue
+            if decoded["event"] == "UpdateRegistered":
+                descriptions[args["uid"]] = (args["description"], log["blockNumber"])
+            events.append(
+                {
+                    "block_number": log["blockNumber"],
+                    "log_index": log["logIndex"],
+                    "tx_hash": bytes(log["transactionHash"]).hex(),
+                    "event": decoded["event"],
+                    "uid": args["uid"],
+                    "owner": owner,
+                    "device_id": args.get("deviceId"),
+                    "amount": args.get("amount"),
+                }
+            )
+        return events, descriptions
+
+    @metrics.timed("phase", phase="sync_once")
+    def sync_once(self):
+        """체크포인트 이후 확정된 블록까지 동기화하고 새로 저장한 이벤트 수 반환"""
+        head = self.web3.eth.block_number - self.confirmations
+        from_block = resume_block(self.web3, self.store, self.contract.address, head, self.reorg_depth) + 1
+        total = 0
+        while from_block <= head:
+            to_block, logs = self.ranges.next_range(from_block, head)
+            events, descriptions = self._decode(logs)
+            # 이미 저장한 uid는 건너뛰고 새 uid만 일괄 조회
+            new_uids = sorted(set(descriptions) - self.store.known_uids(descriptions))
+            records = self.record_fetcher(self.contract, new_uids) if new_uids else []
+            missing = [uid for uid, record in zip(new_uids, records) if record is None]
+            if missing:
+                # 등록 이벤트 이후 재구성 등으로 노드에 없는 uid는 저장하지 않음
+                logger.warning(f"노드에 없는 업데이트를 건너뜁니다: {missing}")
+                records = [record for record in records if record is not None]
+            self.store.apply_range(
+                self.contract.address,
+                to_block,
+                block_hash(self.web3, to_block),
+                events,
+                records,
+                descriptions,
+            )
+            total += len(events)
+            metrics.inc("synced_events_total", len(events), client=type(self).__name__)
+            from_block = to_block + 1
+        if total:
+            logger.info(f"새 이벤트 {total}개 동기화 (블록 {head}까지)")
+        return total
+
+    def run(self, poll_interval=2.0, stop_event=None):
+        """stop_event가 설정될 때까지 poll_interval마다 sync_once() 반복"""
+        stop_event = stop_event or threading.Event()
+        while not stop_event.is_set():
+            try:
+                self.sync_once()
+            except Exception as e:
+                logger.warning(f"동기화 중 오류 발생: {e}")
+                metrics.inc("retries_total", operation="sync")
+            # 장기 실행 프로세스는 종료 시점까지 기다리지 않고 주기마다 내보냄
+            metrics.flush()
+            stop_event.wait(poll_interval)
+
@@ -0,0 +1,281 @@
+import os
+import math
+import time
+import logging
+import threading
+from eth_utils import keccak
+from common.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# eth_feeHistory로 살펴볼 최근 블록 수와 우선 수수료(reward) 백분위
+FEE_HISTORY_BLOCKS = 10
+PRIORITY_PERCENTILE = 50
+# 기본 수수료는 블록마다 최대 12.5%씩 오르므로 2배를 잡으면 몇 블록 동안은 포함 가능
+BASE_FEE_MULTIPLIER = 2
+MIN_PRIORITY_FEE_GWEI = 1
+# 같은 nonce로 교체할 때 노드(geth 등)가 요구하는 최소 인상폭(10%)보다 조금 높게
+REPLACEMENT_BUMP = 1.125
+# 연속 전송 시 트랜잭션마다 eth_feeHistory를 호출하지 않도록 제안값을 재사용하는 시간(초)
+FEE_CACHE_SECONDS = 2.0
+DEFAULT_GAS_MARGIN = 1.2
+# calldata 길이 구간을 2^(1/8)배(약 9%) 간격으로 나눔 (구간 안의 차이는 여유분이 흡수)
+SIZE_CLASSES_PER_DOUBLING = 8
+# 저장소 상태에 따라 가스가 크게 달라지는 함수는 캐시하지 않고 매번 추정
+# setAbiHash: 다이제스트가 같으면 저장 없이 바로 반환
+# setContractAddress: 처음 등록(0 → 주소)과 갱신의 SSTORE 비용 차이가 여유분(20%)보다 큼
+UNCACHED_FUNCTIONS = frozenset({"setAbiHash", "setContractAddress"})
+DEFAULT_REPLACE_AFTER = 30.0
+DEFAULT_MAX_REPLACEMENTS = 3
+
+
+def _gwei(value):
+    return int(float(value) * 10**9)
+
+
+def _env_gwei(name):
+    value = os.getenv(name, "").strip()
+    return _gwei(value) if value else None
+
+
+def suggest_eip1559_fees(history, min_priority_fee=0, base_fee_multiplier=BASE_FEE_MULTIPLIER):
+    """eth_feeHistory 응답으로 {maxFeePerGas, maxPriorityFeePerGas} 계산, 기본 수수료가 없으면 None
+
+    baseFeePerGas의 마지막 값은 다음 블록의 기본 수수료이고, 우선 수수료는 최근 블록들의
+    reward 백분위 값의 중앙값(최소 min_priority_fee)을 쓴다.
+    """
+    base_fees = history.get("baseFeePerGas") or []
+    if not base_fees or base_fees[-1] is None:
+        return None
+    rewards = sorted(r[0] for r in history.get("reward") or [] if r)
+    priority = rewards[len(rewards) // 2] if rewards else 0
+    priority = max(priority, min_priority_fee)
+    return {
+        "maxFeePerGas": base_fees[-1] * base_fee_multiplier + priority,
+        "maxPriorityFeePerGas": priority,
+    }
+
+
+class FeeStrategy:
+    """트랜잭션 수수료 필드를 정하는 전략 (EIP-1559 우선, 안 되면 legacy gasPrice)
+
+    최근 eth_feeHistory로 maxFeePerGas/maxPriorityFeePerGas를 제안하고, 노드가
+    eth_feeHistory를 지원하지 않거나 기본 수수료가 없는 체인이면 eth_gasPrice를 쓴다.
+    gas_price를 주면 항상 그 값으로 legacy 트랜잭션을 만들고, max_fee를 주면 어떤
+    제안값도 그 상한을 넘지 않는다. AsyncWeb3를 받았다면 fee_params_async()를 쓴다.
+    """
+
+    def __init__(
+        self,
+        web3,
+        gas_price=None,
+        max_fee=None,
+        min_priority_fee=None,
+        history_blocks=FEE_HISTORY_BLOCKS,
+        percentile=PRIORITY_PERCENTILE,
+        cache_seconds=FEE_CACHE_SECONDS,
+    ):
+        self.web3 = web3
+        self.gas_price = gas_price
+        self.max_fee = max_fee
+        self.min_priority_fee = _gwei(MIN_PRIORITY_FEE_GWEI) if min_priority_fee is None else min_priority_fee
+        self.history_blocks = history_blocks
+        self.percentile = percentile
+        self.cache_seconds = cache_seconds
+        self._lock = threading.Lock()
+        self._cached = None
+        self._cached_at = 0.0
+        # eth_feeHistory가 실패한 노드에는 다시 묻지 않음
+        self._legacy = False
+
+    @classmethod
+    def from_env(cls, web3):
+        """GAS_PRICE_GWEI(고정 legacy 가격), MAX_FEE_GWEI(상한), PRIORITY_FEE_GWEI(최소 우선 수수료)"""
+        return cls(
+            web3,
+            gas_price=_env_gwei("GAS_PRICE_GWEI"),
+            max_fee=_env_gwei("MAX_FEE_GWEI"),
+            min_priority_fee=_env_gwei("PRIORITY_FEE_GWEI"),
+        )
+
+    def _cap(self, params):
+        if self.max_fee is None:
+            return params
+        if "gasPrice" in params:
+            return {"gasPrice": min(params["gasPrice"], self.max_fee)}
+        return {
+            "maxFeePerGas": min(params["maxFeePerGas"], self.max_fee),
+            "maxPriorityFeePerGas": min(params["maxPriorityFeePerGas"], self.max_fee),
+        }
+
+    def _from_history(self, history):
+        params = suggest_eip1559_fees(history, self.min_priority_fee)
+        if params is None:
+            logger.info("기본 수수료가 없는 체인이므로 legacy gasPrice를 사용합니다.")
+            self._legacy = True
+        return params
+
+    def _remember(self, params, mode):
+        params = self._cap(params)
+        self._cached, self._cached_at = params, time.monotonic()
+        metrics.inc("fee_estimates_total", mode=mode)
+        return dict(params)
+
+    def _fresh(self):
+        if self._cached is not None and time.monotonic() - self._cached_at < self.cache_seconds:
+            return dict(self._cached)
+        return None
+
+    def fee_params(self):
+        """트랜잭션 파라미터에 그대로 합칠 수 있는 수수료 필드 dict"""
+        if self.gas_price is not None:
+            return {"gasPrice": self.gas_price}
+        with self._lock:
+            params = self._fresh()
+            if params is not None:
+                return params
+            if not self._legacy:
+                try:
+                    history = self.web3.eth.fee_history(self.history_blocks, "latest", [self.percentile])
+                except Exception as e:
+                    logger.info(f"eth_feeHistory를 사용할 수 없어 legacy gasPrice를 사용합니다: {e}")
+                    self._legacy = True
+                else:
+                    params = self._from_history(history)
+                    if params is not None:
+                        return self._remember(params, "eip1559")
+            return self._remember({"gasPrice": self.web3.eth.gas_price}, "legacy")
+
+    async def fee_params_async(self):
+        """fee_params()의 AsyncWeb3 버전"""
+        if self.gas_price is not None:
+            return {"gasPrice": self.gas_price}
+        params = self._fresh()
+        if params is not None:
+            return params
+        if not self._legacy:
+            try:
+                history = await self.web3.eth.fee_history(self.history_blocks, "latest", [self.percentile])
+            except Exception as e:
+                logger.info(f"eth_feeHistory를 사용할 수 없어 legacy gasPrice를 사용합니다: {e}")
+                self._legacy = True
+            else:
+                params = self._from_history(history)
+                if params is not None:
+                    return self._remember(params, "eip1559")
+        return self._remember({"gasPrice": await self.web3.eth.gas_price}, "legacy")
+
+    def bump(self, tx_params):
+        """대기 중인 트랜잭션을 같은 nonce로 교체할 수수료 필드 반환 (상한 때문에 못 올리면 None)
+
+        이전 값의 REPLACEMENT_BUMP배와 현재 제안값 중 큰 값을 쓴다.
+        """
+        current = self.fee_params()
+        if "gasPrice" in tx_params:
+            suggested = current.get("gasPrice", current.get("maxFeePerGas", 0))
+            bumped = {"gasPrice": max(math.ceil(tx_params["gasPrice"] * REPLACEMENT_BUMP), suggested)}
+        else:
+            bumped = {
+                key: max(math.ceil(tx_params[key] * REPLACEMENT_BUMP), current.get(key, current.get("gasPrice", 0)))
+                for key in ("maxFeePerGas", "maxPriorityFeePerGas")
+            }
+        bumped = self._cap(bumped)
+        if any(bumped[key] < math.ceil(tx_params[key] * 1.1) for key in bumped):
+            logger.warning(f"수수료 상한(MAX_FEE_GWEI) 때문에 교체 트랜잭션을 보낼 수 없습니다: {tx_params}")
+            return None
+        return bumped
+
+
+def _calldata(tx_callable):
+    """ContractFunction/ContractConstructor가 보낼 데이터 (배포는 생성 코드 + 인자)"""
+    fn_name = getattr(tx_callable, "fn_name", None)
+    if fn_name is None:
+        data = tx_callable.data_in_transaction
+    else:
+        contract = tx_callable.w3.eth.contract(abi=tx_callable.contract_abi)
+        data = contract.encodeABI(fn_name=fn_name, args=tx_callable.args, kwargs=tx_callable.kwargs)
+    return bytes.fromhex(data[2:])
+
+
+def gas_cache_key(tx_callable):
+    """(함수 선택자, calldata 길이 구간); 배포는 생성 코드 해시 앞 4바이트를 선택자로 사용"""
+    data = _calldata(tx_callable)
+    if getattr(tx_callable, "fn_name", None) is not None:
+        selector = data[:4].hex()
+    else:
+        selector = "create:" + keccak(data)[:4].hex()
+    size_class = int(math.log2(len(data)) * SIZE_CLASSES_PER_DOUBLING) if data else 0
+    return selector, size_class
+
+
+class GasEstimator:
+    """eth_estimateGas 결과를 (함수 선택자, 인자 크기 구간)별로 캐시하고 margin을 곱해 가스 한도로 사용
+
+    같은 함수라도 문자열/배열 인자가 길면 가스가 늘어나므로 calldata 길이 구간마다 한 번씩
+    추정하고, 같은 키에서 더 큰 추정치가 나오면 큰 값을 유지한다. 앞선 트랜잭션이 채굴되어야
+    성공하는 호출은 추정이 revert되므로 호출하는 쪽에서 가스를 직접 지정해야 한다.
+
+    키에는 인자 값이나 저장소 상태가 들어가지 않으므로, 상태에 따라 일찍 반환하는 함수는 먼저
+    추정한 싼 경로의 값이 캐시되어 이후 실제 쓰기가 가스 부족으로 실패할 수 있다. 그런 함수는
+    uncached(기본값 UNCACHED_FUNCTIONS)에 이름을 넣어 매번 추정한다.
+    """
+
+    def __init__(self, margin=DEFAULT_GAS_MARGIN, uncached=UNCACHED_FUNCTIONS):
+        self.margin = margin
+        self.uncached = frozenset(uncached)
+        self._lock = threading.Lock()
+        self._estimates = {}
+
+    def _cached(self, key):
+        with self._lock:
+            estimate = self._estimates.get(key)
+        if estimate is not None:
+            metrics.inc("gas_estimate_cache_total", result="hit")
+            return int(estimate * self.margin)
+        metrics.inc("gas_estimate_cache_total", result="miss")
+        return None
+
+    def _store(self, key, estimate):
+        with self._lock:
+            estimate = max(estimate, self._estimates.get(key, 0))
+            self._estimates[key] = estimate
+        return int(estimate * self.margin)
+
+    @staticmethod
+    def _estimate_params(tx_params):
+        return {k: v for k, v in tx_params.items() if k in ("from", "value")}
+
+    def _bypass(self, tx_callable):
+        if getattr(tx_callable, "fn_name", None) in self.uncached:
+            metrics.inc("gas_estimate_cache_total", result="uncached")
+            return True
+        return False
+
+    def gas_limit(self, tx_callable, tx_params):
+        if self._bypass(tx_callable):
+            return int(tx_callable.estimate_gas(self._estimate_params(tx_params)) * self.margin)
+        key = gas_cache_key(tx_callable)
+        limit = self._cached(key)
+        if limit is None:
+            limit = self._store(key, tx_callable.estimate_gas(self._estimate_params(tx_params)))
+        return limit
+
+    async def gas_limit_async(self, tx_callable, tx_params):
+        if self._bypass(tx_callable):
+            return int(await tx_callable.estimate_gas(self._estimate_params(tx_params)) * self.margin)
+        key = gas_cache_key(tx_callable)
+        limit = self._cached(key)
+        if limit is None:
+            limit = self._store(key, await tx_callable.estimate_gas(self._estimate_params(tx_params)))
+        return limit
+
+
+# 한 프로세스 안의 여러 파이프라인이 추정치를 공유
+gas_estimator = GasEstimator()
+
+
+def replace_after_from_env():
+    """TX_REPLACE_AFTER(초) 동안 채굴되지 않으면 수수료를 올려 교체, 0이면 교체하지 않음"""
+    value = os.getenv("TX_REPLACE_AFTER", "").strip()
+    seconds = float(value) if value else DEFAULT_REPLACE_AFTER
+    return seconds if seconds > 0 else None
@@ -0,0 +1,289 @@
+import os
+import sqlite3
+import logging
+import threading
+from common.device_sync import DeviceSyncClient, select_in
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), ".artifacts", "lifecycle_index.db"
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cursor (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    contract TEXT NOT NULL,
+    block_number INTEGER NOT NULL,
+    block_hash TEXT
+);
+CREATE TABLE IF NOT EXISTS blocks (
+    block_number INTEGER PRIMARY KEY,
+    timestamp INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS events (
+    block_number INTEGER NOT NULL,
+    log_index INTEGER NOT NULL,
+    tx_hash TEXT NOT NULL,
+    event TEXT NOT NULL,
+    uid TEXT NOT NULL,
+    owner TEXT,
+    device_id TEXT,
+    amount TEXT,
+    PRIMARY KEY (block_number, log_index)
+);
+CREATE INDEX IF NOT EXISTS events_uid_event ON events (uid, event);
+CREATE INDEX IF NOT EXISTS events_owner ON events (owner, uid);
+CREATE TABLE IF NOT EXISTS updates (
+    uid TEXT PRIMARY KEY,
+    price TEXT NOT NULL,
+    version TEXT NOT NULL,
+    registered_block INTEGER NOT NULL,
+    cancelled_block INTEGER
+);
+CREATE TABLE IF NOT EXISTS purchases (
+    owner TEXT NOT NULL,
+    uid TEXT NOT NULL,
+    purchase_block INTEGER NOT NULL,
+    purchase_log_index INTEGER NOT NULL,
+    purchase_time INTEGER NOT NULL,
+    install_block INTEGER,
+    install_time INTEGER,
+    device_id TEXT,
+    refund_block INTEGER,
+    refund_time INTEGER,
+    refund_amount TEXT,
+    PRIMARY KEY (purchase_block, purchase_log_index)
+);
+CREATE INDEX IF NOT EXISTS purchases_uid ON purchases (uid);
+CREATE INDEX IF NOT EXISTS purchases_owner_uid ON purchases (owner, uid);
+"""
+
+# (owner, uid)의 해당 이벤트보다 앞선 가장 최근의 미결 구매에 설치/환불을 기록
+_CLOSE_PURCHASE = """
+UPDATE purchases SET {columns}
+WHERE rowid = (
+    SELECT rowid FROM purchases
+    WHERE owner = :owner AND uid = :uid AND install_block IS NULL AND refund_block IS NULL
+      AND (purchase_block, purchase_log_index) < (:block_number, :log_index)
+    ORDER BY purchase_block DESC, purchase_log_index DESC LIMIT 1
+)
+"""
+_INSTALL = _CLOSE_PURCHASE.format(
+    columns="install_block = :block_number, install_time = :timestamp, device_id = :device_id"
+)
+_REFUND = _CLOSE_PURCHASE.format(
+    columns="refund_block = :block_number, refund_time = :timestamp, refund_amount = :amount"
+)
+
+
+class LifecycleStore:
+    """업데이트 등록/구매/설치/환불/취소 이벤트와 구매별 수명 주기를 보관하는 SQLite 색인
+
+    DeviceSyncClient가 기대하는 저장소 인터페이스(checkpoint/reset/known_uids/
+    apply_range/rollback)를 구현하므로 같은 동기화 루프로 채운다. 구간 하나의 기록과
+    커서 이동은 한 트랜잭션이며 각 표는 executemany로 일괄 기록한다.
+
+    에스크로 잔액은 가격 기준으로 계산한다. UpdateDelivered에는 실제 결제 금액이 없어
+    가격보다 많이 낸 구매는 과소 집계된다.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or os.getenv("LIFECYCLE_INDEX_DB", DEFAULT_DB_PATH)
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._conn:
+            self._conn.executescript(_SCHEMA)
+
+    def close(self):
+        self._conn.close()
+
+    def checkpoint(self, contract_address):
+        """(마지막으로 색인한 블록 번호, 블록 해시) 반환, 다른 컨트랙트의 기록이면 None"""
+        row = self._conn.execute(
+            "SELECT contract, block_number, block_hash FROM cursor WHERE id = 1"
+        ).fetchone()
+        if row is None or row[0] != contract_address:
+            return None
+        return row[1], row[2]
+
+    def reset(self, contract_address, block_number):
+        with self._lock, self._conn:
+            for table in ("events", "purchases", "updates", "blocks"):
+                self._conn.execute(f"DELETE FROM {table}")
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cursor (id, contract, block_number, block_hash) "
+                "VALUES (1, ?, ?, NULL)",
+                (contract_address, block_number),
+            )
+
+    def known_uids(self, uids):
+        rows = select_in(self._conn, "SELECT uid FROM updates WHERE uid IN ({})", uids)
+        return {row[0] for row in rows}
+
+    def block_times(self, block_numbers):
+        """이미 저장한 블록 시각 {블록 번호: timestamp}"""
+        rows = select_in(
+            self._conn, "SELECT block_number, timestamp FROM blocks WHERE block_number IN ({})", block_numbers
+        )
+        return dict(rows)
+
+    def apply_range(self, contract_address, block_number, block_hash, events, records, descriptions):
+        """한 구간의 이벤트를 색인하고 커서를 block_number로 이동
+
+        events는 블록/로그 순서이고 각 항목에 블록 시각(timestamp)이 있어야 한다.
+        descriptions는 {uid: (description, 등록 블록)}이며 records의 모든 uid를 포함해야 한다.
+        """
+        for event in events:
+            if event.get("amount") is not None:
+                event["amount"] = str(event["amount"])
+        by_name = {}
+        for event in events:
+            by_name.setdefault(event["event"], []).append(event)
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO blocks (block_number, timestamp) VALUES (?, ?)",
+                sorted({(e["block_number"], e["timestamp"]) for e in events}),
+            )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO events "
+                "(block_number, log_index, tx_hash, event, uid, owner, device_id, amount) "
+                "VALUES (:block_number, :log_index, :tx_hash, :event, :uid, :owner, :device_id, :amount)",
+                events,
+            )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO updates (uid, price, version, registered_block) "
+                "VALUES (?, ?, ?, ?)",
+                [(r.uid, str(r.price), r.version, descriptions[r.uid][1]) for r in records],
+            )
+            self._conn.executemany(
+                "UPDATE updates SET cancelled_block = :block_number WHERE uid = :uid",
+                by_name.get("UpdateCancelled", []),
+            )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO purchases "
+                "(owner, uid, purchase_block, purchase_log_index, purchase_time) "
+                "VALUES (:owner, :uid, :block_number, :log_index, :timestamp)",
+                by_name.get("UpdateDelivered", []),
+            )
+            # 같은 구간에서 구매 직후 설치/환불된 경우도 있으므로 구매를 먼저 기록한 뒤 닫음
+            self._conn.executemany(_INSTALL, by_name.get("UpdateInstalled", []))
+            self._conn.executemany(_REFUND, by_name.get("UpdateRefunded", []))
+            self._conn.execute(
+                "UPDATE cursor SET block_number = ?, block_hash = ? WHERE id = 1 AND contract = ?",
+                (block_number, block_hash, contract_address),
+            )
+
+    def rollback(self, contract_address, block_number):
+        """block_number 이후에 색인한 내용을 모두 되돌리고 커서를 이동"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM events WHERE block_number > ?", (block_number,))
+            self._conn.execute("DELETE FROM blocks WHERE block_number > ?", (block_number,))
+            self._conn.execute("DELETE FROM updates WHERE registered_block > ?", (block_number,))
+            self._conn.execute(
+                "UPDATE updates SET cancelled_block = NULL WHERE cancelled_block > ?", (block_number,)
+            )
+            self._conn.execute("DELETE FROM purchases WHERE purchase_block > ?", (block_number,))
+            self._conn.execute(
+                "UPDATE purchases SET install_block = NULL, install_time = NULL, device_id = NULL "
+                "WHERE install_block > ?",
+                (block_number,),
+            )
+            self._conn.execute(
+                "UPDATE purchases SET refund_block = NULL, refund_time = NULL, refund_amount = NULL "
+                "WHERE refund_block > ?",
+                (block_number,),
+            )
+            self._conn.execute(
+                "UPDATE cursor SET block_number = ?, block_hash = NULL WHERE id = 1 AND contract = ?",
+                (block_number, contract_address),
+            )
+
+    def update_stats(self, uid=None):
+        """업데이트별 구매/설치/환불 수, 설치율, 구매→설치 소요 시간(초), 에스크로 잔액(wei)"""
+        where, params = ("WHERE u.uid = ?", (uid,)) if uid else ("", ())
+        rows = self._conn.execute(
+            "SELECT u.uid, u.version, u.price, u.cancelled_block IS NOT NULL, "
+            "  COUNT(p.uid), COUNT(p.install_block), COUNT(p.refund_block), "
+            "  AVG(p.install_time - p.purchase_time), MAX(p.install_time - p.purchase_time), "
+            "  SUM(p.install_block IS NULL AND p.refund_block IS NULL) "
+            "FROM updates u LEFT JOIN purchases p ON p.uid = u.uid "
+            f"{where} GROUP BY u.uid ORDER BY u.registered_block, u.uid",
+            params,
+        ).fetchall()
+        refunded = self._refunded_amounts(uid)
+        stats = []
+        for uid_, version, price, cancelled, purchases, installs, refunds, avg_s, max_s, pending in rows:
+            stats.append(
+                {
+                    "uid": uid_,
+                    "version": version,
+                    "price": int(price),
+                    "cancelled": bool(cancelled),
+                    "purchases": purchases,
+                    "installs": installs,
+                    "refunds": refunds,
+                    "install_rate": installs / purchases if purchases else None,
+                    "avg_install_seconds": avg_s,
+                    "max_install_seconds": max_s,
+                    "refunded_wei": refunded.get(uid_, 0),
+                    "escrow_outstanding_wei": int(price) * (pending or 0),
+                }
+            )
+        return stats
+
+    def _refunded_amounts(self, uid=None):
+        # uint256 금액은 TEXT로 저장하므로 합계는 파이썬 정수로 계산
+        where, params = ("AND uid = ?", (uid,)) if uid else ("", ())
+        totals = {}
+        for uid_, amount in self._conn.execute(
+            f"SELECT uid, refund_amount FROM purchases WHERE refund_amount IS NOT NULL {where}", params
+        ):
+            totals[uid_] = totals.get(uid_, 0) + int(amount)
+        return totals
+
+    def escrow_outstanding(self):
+        """설치도 환불도 되지 않은 구매의 에스크로 총액(wei, 가격 기준)"""
+        return sum(s["escrow_outstanding_wei"] for s in self.update_stats())
+
+    def owner_history(self, owner):
+        """owner의 구매별 수명 주기 (구매/설치/환불 블록과 시각)"""
+        rows = self._conn.execute(
+            "SELECT uid, purchase_block, purchase_time, install_block, install_time, device_id, "
+            "refund_block, refund_time, refund_amount FROM purchases WHERE owner = ? "
+            "ORDER BY purchase_block, purchase_log_index",
+            (owner,),
+        ).fetchall()
+        columns = (
+            "uid", "purchase_block", "purchase_time", "install_block", "install_time",
+            "device_id", "refund_block", "refund_time", "refund_amount",
+        )
+        history = [dict(zip(columns, row)) for row in rows]
+        for item in history:
+            if item["refund_amount"] is not None:
+                item["refund_amount"] = int(item["refund_amount"])
+        return history
+
+
+class LifecycleIndexer(DeviceSyncClient):
+    """모든 계정의 수명 주기 이벤트를 LifecycleStore로 색인하는 동기화 클라이언트
+
+    구간 조회, 재구성 처리, 새 uid만 일괄 조회하는 흐름은 DeviceSyncClient와 같고,
+    이벤트가 있는 블록의 시각만 조회해 저장소에 캐시한다.
+    """
+
+    def __init__(self, web3, contract, store, **kwargs):
+        kwargs.pop("owner", None)
+        super().__init__(web3, contract, store, **kwargs)
+
+    def _decode(self, logs):
+        events, descriptions = super()._decode(logs)
+        numbers = {event["block_number"] for event in events}
+        times = self.store.block_times(numbers)
+        for number in sorted(numbers - set(times)):
+            times[number] = self.web3.eth.get_block(number)["timestamp"]
+        for event in events:
+            event["timestamp"] = times[event["block_number"]]
+        return events, descriptions
@@ -0,0 +1,84 @@
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RANGE_SIZE = 1000
+MAX_RANGE_SIZE = 50000
+# 한 번의 eth_getLogs 응답이 이보다 크면 다음 구간을 줄이고, 1/4 미만이면 늘림
+TARGET_LOGS_PER_RANGE = 2000
+
+
+class LogRangeReader:
+    """eth_getLogs 구간 크기를 응답 크기와 오류에 따라 자동으로 조절하며 로그를 읽는 도우미
+
+    노드가 구간이 너무 넓다고 거부하면 절반으로 줄여 다시 시도하고, 응답이 작으면
+    다음 구간을 두 배로 늘린다.
+    """
+
+    def __init__(
+        self,
+        web3,
+        address,
+        topics,
+        range_size=DEFAULT_RANGE_SIZE,
+        min_range_size=1,
+        max_range_size=MAX_RANGE_SIZE,
+        target_logs=TARGET_LOGS_PER_RANGE,
+    ):
+        self.web3 = web3
+        self.address = address
+        self.topics = [web3.to_hex(topic) for topic in topics]
+        self.range_size = range_size
+        self.min_range_size = min_range_size
+        self.max_range_size = max_range_size
+        self.target_logs = target_logs
+
+    def get_logs(self, from_block, to_block):
+        return self.web3.eth.get_logs(
+            {
+                "address": self.address,
+                "topics": [self.topics],
+                "fromBlock": from_block,
+                "toBlock": to_block,
+            }
+        )
+
+    def next_range(self, from_block, head):
+        """현재 구간 크기로 로그를 조회해 (구간 끝 블록, 로그) 반환, 실패하면 구간을 줄여 재시도"""
+        while True:
+            to_block = min(head, from_block + self.range_size - 1)
+            try:
+                logs = self.get_logs(from_block, to_block)
+            except Exception as e:
+                if self.range_size <= self.min_range_size:
+                    raise
+                self.range_size = max(self.min_range_size, self.range_size // 2)
+                logger.info(f"eth_getLogs 실패, 구간을 {self.range_size}블록으로 축소: {e}")
+                continue
+            if len(logs) > self.target_logs:
+                self.range_size = max(self.min_range_size, self.range_size // 2)
+            elif len(logs) < self.target_logs // 4:
+                self.range_size = min(self.max_range_size, self.range_size * 2)
+            return to_block, logs
+
+
+def block_hash(web3, block_number):
+    return web3.to_hex(web3.eth.get_block(block_number)["hash"])
+
+
+def resume_block(web3, store, contract_address, head, reorg_depth):
+    """체크포인트 블록 번호 반환, 체크포인트 블록의 해시가 바뀌었거나 체인이 짧아졌으면
+    store.rollback()으로 reorg_depth만큼 되돌린 블록 번호를 반환
+
+    store는 checkpoint(contract) → (블록 번호, 블록 해시)와 rollback(contract, 블록 번호)를
+    제공해야 한다.
+    """
+    block_number, stored_hash = store.checkpoint(contract_address)
+    if block_number < 0:
+        return block_number
+    if block_number <= head and (stored_hash is None or block_hash(web3, block_number) == stored_hash):
+        return block_number
+    rollback_to = max(min(block_number, head) - reorg_depth, -1)
+    logger.warning(f"체인 재구성 감지: 블록 {block_number} → {rollback_to}부터 다시 동기화")
+    store.rollback(contract_address, rollback_to)
+    return rollback_to
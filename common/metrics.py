@@ -0,0 +1,237 @@
+import os
+import json
+import time
+import atexit
+import logging
+import tempfile
+import threading
+import functools
+from contextlib import nullcontext
+
+logger = logging.getLogger(__name__)
+
+METRIC_PREFIX = "blocker_"
+EXPORTERS = ("prometheus", "jsonl")
+DEFAULT_METRICS_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), ".artifacts"
+)
+_DEFAULT_FILES = {"prometheus": "metrics.prom", "jsonl": "metrics.jsonl"}
+
+# 비활성화 상태에서 span()이 돌려주는 재사용 가능한 빈 컨텍스트
+_NOOP_SPAN = nullcontext()
+
+
+class _Span:
+    def __init__(self, registry, name, labels):
+        self.registry = registry
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        labels = dict(self.labels, status="error") if exc_type is not None else self.labels
+        self.registry.observe(self.name, time.perf_counter() - self.start, **labels)
+        return False
+
+
+class MetricsRegistry:
+    """단계별 소요 시간(span)과 카운터를 모아 Prometheus 텍스트나 JSON lines로 내보내는 저장소
+
+    exporter가 None이면 span()은 공유된 빈 컨텍스트를, inc()/observe()는 즉시 반환하므로
+    계측 코드를 그대로 두어도 비용이 거의 없다.
+    """
+
+    def __init__(self, exporter=None, path=None):
+        self._lock = threading.Lock()
+        self.configure(exporter, path)
+
+    def configure(self, exporter=None, path=None):
+        """내보내기 형식과 경로를 바꾸고 지금까지 모은 값을 비움"""
+        if exporter is not None and exporter not in EXPORTERS:
+            raise ValueError(f"지원하지 않는 메트릭 형식입니다: {exporter} (지원: {', '.join(EXPORTERS)})")
+        with self._lock:
+            self.exporter = exporter
+            self.path = path or (
+                os.path.join(DEFAULT_METRICS_DIR, _DEFAULT_FILES[exporter]) if exporter else None
+            )
+            self._counters = {}
+            self._timings = {}
+            self._events = []
+
+    @classmethod
+    def from_env(cls):
+        """METRICS_EXPORT(prometheus|jsonl)가 설정되면 활성화하고 종료 시 METRICS_PATH로 기록"""
+        exporter = os.getenv("METRICS_EXPORT", "").strip().lower() or None
+        if exporter is not None and exporter not in EXPORTERS:
+            logger.warning(f"METRICS_EXPORT 값을 무시합니다: {exporter}")
+            exporter = None
+        registry = cls(exporter, os.getenv("METRICS_PATH") or None)
+        if registry.enabled:
+            atexit.register(registry.flush)
+        return registry
+
+    @property
+    def enabled(self):
+        return self.exporter is not None
+
+    def _event(self, kind, name, value, labels):
+        if self.exporter == "jsonl":
+            self._events.append(
+                {"ts": time.time(), "type": kind, "name": name, "value": value, **labels}
+            )
+
+    def inc(self, name, value=1, **labels):
+        if self.exporter is None:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+            self._event("counter", name, value, labels)
+
+    def observe(self, name, seconds, **labels):
+        if self.exporter is None:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            timing = self._timings.get(key)
+            if timing is None:
+                self._timings[key] = [1, seconds, seconds]
+            else:
+                timing[0] += 1
+                timing[1] += seconds
+                timing[2] = max(timing[2], seconds)
+            self._event("span", name, seconds, labels)
+
+    def span(self, name, **labels):
+        """with 블록의 소요 시간을 name_seconds로 기록 (예외로 끝나면 status="error" 추가)"""
+        if self.exporter is None:
+            return _NOOP_SPAN
+        return _Span(self, name, labels)
+
+    def timed(self, name, **labels):
+        """함수 호출 시간을 span(name)으로 기록하는 데코레이터"""
+
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if self.exporter is None:
+                    return func(*args, **kwargs)
+                with _Span(self, name, labels):
+                    return func(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+    def snapshot(self):
+        """{"counters": {...}, "timings": {...}} 형태의 현재 값 (키는 Prometheus 표기)"""
+        with self._lock:
+            counters = {_series(name, labels): value for (name, labels), value in self._counters.items()}
+            timings = {
+                _series(name, labels): {"count": count, "sum": total, "max": peak}
+                for (name, labels), (count, total, peak) in self._timings.items()
+            }
+        return {"counters": counters, "timings": timings}
+
+    def render_prometheus(self):
+        lines = []
+        with self._lock:
+            counters = sorted(self._counters.items())
+            timings = sorted(self._timings.items())
+        declared = set()
+        for (name, labels), value in counters:
+            metric = f"{METRIC_PREFIX}{name}"
+            if metric not in declared:
+                declared.add(metric)
+                lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{_series(metric, labels)} {value}")
+        # summary 형식에는 _max가 없으므로 최댓값은 별도 gauge로 내보내고, 한 메트릭의 줄은
+        # 연속되어야 하므로 이름별로 summary 줄을 모두 쓴 뒤 gauge 줄을 씀
+        by_name = {}
+        for (name, labels), timing in timings:
+            by_name.setdefault(name, []).append((labels, timing))
+        for name, series in by_name.items():
+            metric = f"{METRIC_PREFIX}{name}_seconds"
+            lines.append(f"# TYPE {metric} summary")
+            for labels, (count, total, _) in series:
+                lines.append(f"{_series(metric + '_count', labels)} {count}")
+                lines.append(f"{_series(metric + '_sum', labels)} {total:.6f}")
+            lines.append(f"# TYPE {metric}_max gauge")
+            for labels, (_, _, peak) in series:
+                lines.append(f"{_series(metric + '_max', labels)} {peak:.6f}")
+        return "\n".join(lines) + "\n"
+
+    def flush(self):
+        """Prometheus는 파일 전체를 현재 값으로 교체하고, JSON lines는 쌓인 기록을 이어 씀"""
+        if self.exporter is None:
+            return
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            if self.exporter == "prometheus":
+                _write_atomic(self.path, self.render_prometheus())
+            else:
+                with self._lock:
+                    events, self._events = self._events, []
+                with open(self.path, "a") as f:
+                    for event in events:
+                        f.write(json.dumps(event, default=str) + "\n")
+        except OSError as e:
+            logger.warning(f"메트릭 기록 실패: {self.path}: {e}")
+
+
+def _escape(value):
+    # Prometheus 텍스트 형식의 라벨 값 이스케이프 (역슬래시, 큰따옴표, 줄바꿈)
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _series(name, labels):
+    if not labels:
+        return name
+    rendered = ",".join(f'{key}="{_escape(value)}"' for key, value in labels)
+    return f"{name}{{{rendered}}}"
+
+
+def _write_atomic(path, text):
+    # 스크레이퍼가 반쯤 쓰인 파일을 읽지 않도록 교체 방식으로 저장
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+metrics = MetricsRegistry.from_env()
+
+
+def rpc_metrics_middleware(make_request, w3):
+    """JSON-RPC 메서드별 호출 수, 오류 수, 소요 시간을 기록하는 web3 미들웨어"""
+
+    def middleware(method, params):
+        start = time.perf_counter()
+        try:
+            response = make_request(method, params)
+        except Exception:
+            metrics.inc("rpc_errors_total", method=method)
+            raise
+        finally:
+            metrics.observe("rpc", time.perf_counter() - start, method=method)
+            metrics.inc("rpc_calls_total", method=method)
+        if isinstance(response, dict) and "error" in response:
+            metrics.inc("rpc_errors_total", method=method)
+        return response
+
+    return middleware
+
+
+def instrument_web3(web3):
+    """메트릭이 켜져 있을 때만 RPC 미들웨어를 추가 (꺼져 있으면 요청 경로에 아무것도 끼우지 않음)"""
+    if metrics.enabled and "metrics" not in web3.middleware_onion:
+        web3.middleware_onion.add(rpc_metrics_middleware, "metrics")
+    return web3
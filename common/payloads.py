@@ -0,0 +1,176 @@
+import os
+import mmap
+import time
+import hashlib
+import logging
+import tempfile
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from common.catalogue import fetch_updates
+from common.providers import pooled_session
+from common.update_codec import decode_ipfs_hash
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STORE_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), ".artifacts", "payloads"
+)
+# hashlib은 큰 버퍼를 해시할 때 GIL을 놓으므로 스레드 수만큼 코어를 활용할 수 있다
+DEFAULT_CHUNK_SIZE = 4 * 1024 * 1024
+DEFAULT_WORKERS = 4
+DEFAULT_HTTP_TIMEOUT = 30
+
+VerificationResult = namedtuple(
+    "VerificationResult",
+    ["uid", "ipfs_hash", "ok", "expected", "actual", "size", "seconds", "error"],
+)
+
+
+class LocalContentStore:
+    """<root>/<ipfsHash> 파일로 페이로드를 보관하는 IPFS 대용 저장소
+
+    hash_into()는 파일을 메모리 맵으로 열어 memoryview 조각 단위로 해시하므로 이미지
+    전체를 프로세스 메모리로 복사하지 않는다.
+    """
+
+    def __init__(self, root=None):
+        self.root = root or DEFAULT_STORE_DIR
+
+    def path(self, cid):
+        if not cid or os.sep in cid or cid.startswith("."):
+            raise ValueError(f"잘못된 콘텐츠 ID입니다: {cid!r}")
+        return os.path.join(self.root, cid)
+
+    def hash_into(self, cid, hasher, chunk_size=DEFAULT_CHUNK_SIZE):
+        """페이로드를 chunk_size 단위로 hasher.update()에 전달하고 바이트 수 반환"""
+        with open(self.path(cid), "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size == 0:
+                return 0
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped, memoryview(mapped) as view:
+                for offset in range(0, size, chunk_size):
+                    # 조각 뷰를 바로 해제해야 mmap을 닫을 수 있음
+                    with view[offset : offset + chunk_size] as chunk:
+                        hasher.update(chunk)
+        return size
+
+    def put_file(self, source_path, cid=None):
+        """source_path를 저장소로 복사하고 콘텐츠 ID 반환
+
+        cid를 주지 않으면 내용의 sha2-256 다이제스트로 CIDv0 형식 ID를 만든다. 실제 IPFS의
+        CIDv0(dag-pb 루트 해시)와는 값이 다르므로 로컬 대용 저장소에서만 의미가 있다.
+        """
+        digest = hashlib.sha256()
+        os.makedirs(self.root, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as out, open(source_path, "rb") as src:
+                while True:
+                    block = src.read(DEFAULT_CHUNK_SIZE)
+                    if not block:
+                        break
+                    digest.update(block)
+                    out.write(block)
+            cid = cid or decode_ipfs_hash(digest.digest())
+            os.replace(tmp_path, self.path(cid))
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return cid
+
+
+class HttpContentStore:
+    """IPFS 게이트웨이(또는 같은 경로를 제공하는 HTTP 서버)의 <base_url>/ipfs/<cid>를 스트리밍으로 읽는 저장소"""
+
+    def __init__(self, base_url, session=None, timeout=DEFAULT_HTTP_TIMEOUT):
+        self.base_url = base_url.rstrip("/")
+        self.session = session or pooled_session()
+        self.timeout = timeout
+
+    def url(self, cid):
+        return f"{self.base_url}/ipfs/{cid}"
+
+    def hash_into(self, cid, hasher, chunk_size=DEFAULT_CHUNK_SIZE):
+        """응답 본문을 chunk_size 단위로 받아 hasher.update()에 전달하고 바이트 수 반환"""
+        size = 0
+        with self.session.get(self.url(cid), stream=True, timeout=self.timeout) as response:
+            response.raise_for_status()
+            for chunk in response.iter_content(chunk_size=chunk_size):
+                hasher.update(chunk)
+                size += len(chunk)
+        return size
+
+
+def content_store_from_env():
+    """PAYLOAD_STORE가 http(s) URL이면 HTTP 저장소, 아니면 해당 디렉터리(기본 common/.artifacts/payloads)"""
+    location = os.getenv("PAYLOAD_STORE", "")
+    if location.startswith(("http://", "https://")):
+        return HttpContentStore(location)
+    return LocalContentStore(location or None)
+
+
+def hash_payload(store, cid, chunk_size=DEFAULT_CHUNK_SIZE):
+    """저장소의 페이로드를 조각 단위로 SHA-256 해시해 (16진수 다이제스트, 바이트 수) 반환"""
+    digest = hashlib.sha256()
+    size = store.hash_into(cid, digest, chunk_size)
+    return digest.hexdigest(), size
+
+
+class PayloadVerifier:
+    """업데이트의 ipfsHash로 페이로드를 받아 hashOfUpdate와 비교하는 검증기
+
+    컨트랙트 조회는 getUpdateInfoBatch로 한 번에 하고, 페이로드 해시는 workers개의
+    스레드에서 동시에 계산한다.
+    """
+
+    def __init__(
+        self,
+        contract,
+        store,
+        workers=DEFAULT_WORKERS,
+        chunk_size=DEFAULT_CHUNK_SIZE,
+        record_fetcher=fetch_updates,
+    ):
+        self.contract = contract
+        self.store = store
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.record_fetcher = record_fetcher
+
+    def verify_record(self, record):
+        """UpdateRecord 하나를 검증 (예외는 결과의 error로 반환)"""
+        started = time.perf_counter()
+        expected = record.hash_of_update.lower()
+        try:
+            actual, size = hash_payload(self.store, record.ipfs_hash, self.chunk_size)
+        except Exception as e:
+            return VerificationResult(
+                record.uid, record.ipfs_hash, False, expected, None, 0,
+                time.perf_counter() - started, str(e),
+            )
+        ok = actual == expected
+        if not ok:
+            logger.warning(f"페이로드 해시 불일치: {record.uid} (기대 {expected}, 실제 {actual})")
+        return VerificationResult(
+            record.uid, record.ipfs_hash, ok, expected, actual, size, time.perf_counter() - started, None
+        )
+
+    def verify_records(self, records):
+        """records를 스레드 풀에서 검증하고 입력 순서대로 결과 반환"""
+        records = list(records)
+        if not records:
+            return []
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(records))) as executor:
+            return list(executor.map(self.verify_record, records))
+
+    def verify(self, uids):
+        """uids의 업데이트 정보를 조회해 각 페이로드를 검증 (없는 uid는 실패 결과)"""
+        uids = list(uids)
+        records = self.record_fetcher(self.contract, uids)
+        verified = iter(self.verify_records(r for r in records if r is not None))
+        return [
+            next(verified) if record is not None
+            else VerificationResult(uid, None, False, None, None, 0, 0.0, "업데이트가 존재하지 않습니다")
+            for uid, record in zip(uids, records)
+        ]
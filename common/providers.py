@@ -0,0 +1,351 @@
+import os
+import json
+import time
+import asyncio
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+import requests
+import websockets
+from requests.adapters import HTTPAdapter
+from eth_utils import event_abi_to_log_topic
+from hexbytes import HexBytes
+from web3 import Web3, HTTPProvider
+from web3.datastructures import AttributeDict
+from web3.exceptions import TimeExhausted
+from common.metrics import instrument_web3, metrics
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POOL_SIZE = 10
+DEFAULT_TIMEOUT = 30
+UPDATE_EVENTS = (
+    "UpdateRegistered",
+    "UpdateDelivered",
+    "UpdateInstalled",
+    "UpdateRefunded",
+    "UpdateCancelled",
+)
+
+# 재연결 시 보충한 로그와 이미 전달한 로그가 겹치는지 확인하기 위해 기억하는 최근 로그 수
+DISPATCHED_LOG_MEMORY = 4096
+
+_web3_cache = {}
+_web3_cache_lock = threading.Lock()
+
+
+def pooled_session(pool_size=DEFAULT_POOL_SIZE, retries=3):
+    """keep-alive 연결을 pool_size개까지 재사용하는 requests 세션 (연결 실패만 재시도)"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retries)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+class PooledHTTPProvider(HTTPProvider):
+    """모든 스레드가 하나의 연결 풀을 공유하는 HTTPProvider
+
+    web3.py 기본 HTTPProvider는 스레드마다 세션을 따로 만들기 때문에 워커 스레드가
+    많으면 연결도 그만큼 늘어난다. 여기서는 프로세스 전체에서 한 세션을 사용한다.
+    """
+
+    def __init__(self, endpoint_uri, session=None, request_kwargs=None):
+        request_kwargs = dict(request_kwargs or {})
+        request_kwargs.setdefault("timeout", DEFAULT_TIMEOUT)
+        super().__init__(endpoint_uri, request_kwargs=request_kwargs)
+        self.session = session or pooled_session()
+
+    def make_request(self, method, params):
+        request_data = self.encode_rpc_request(method, params)
+        response = self.session.post(self.endpoint_uri, data=request_data, **self.get_request_kwargs())
+        response.raise_for_status()
+        return self.decode_rpc_response(response.content)
+
+
+def get_web3(endpoint_uri=None, pool_size=DEFAULT_POOL_SIZE):
+    """엔드포인트별로 프로세스 안에서 하나만 만들어 공유하는 Web3 인스턴스"""
+    endpoint_uri = endpoint_uri or os.getenv("WEB3_PROVIDER", "http://ganache:8545")
+    with _web3_cache_lock:
+        web3 = _web3_cache.get(endpoint_uri)
+        if web3 is None:
+            web3 = instrument_web3(Web3(PooledHTTPProvider(endpoint_uri, session=pooled_session(pool_size))))
+            _web3_cache[endpoint_uri] = web3
+        return web3
+
+
+def ws_endpoint_for(http_uri):
+    """WEB3_WS_PROVIDER가 없으면 HTTP 주소의 스킴만 바꿔 사용 (ganache는 같은 포트에서 WebSocket 제공)"""
+    ws_uri = os.getenv("WEB3_WS_PROVIDER")
+    if ws_uri:
+        return ws_uri
+    if http_uri.startswith("https://"):
+        return "wss://" + http_uri[len("https://"):]
+    return "ws://" + http_uri[len("http://"):] if http_uri.startswith("http://") else http_uri
+
+
+def _format_log(raw):
+    """eth_subscription으로 받은 JSON 로그를 get_logs 결과와 같은 형식으로 변환"""
+    return AttributeDict(
+        {
+            "address": Web3.to_checksum_address(raw["address"]),
+            "topics": [HexBytes(topic) for topic in raw["topics"]],
+            "data": HexBytes(raw["data"]),
+            "blockNumber": int(raw["blockNumber"], 16),
+            "blockHash": HexBytes(raw["blockHash"]),
+            "transactionHash": HexBytes(raw["transactionHash"]),
+            "transactionIndex": int(raw["transactionIndex"], 16),
+            "logIndex": int(raw["logIndex"], 16),
+            "removed": raw.get("removed", False),
+        }
+    )
+
+
+class SubscriptionClient:
+    """WebSocket 구독(newHeads, 컨트랙트 로그)으로 영수증 대기와 이벤트 소비자를 깨우는 클라이언트
+
+    새 블록 알림을 받으면 그 블록에 포함된 대기 중 트랜잭션의 영수증만 조회하므로
+    wait_for_transaction_receipt의 주기적 폴링이 필요 없다. 조회는 HTTP(web3)로 하고,
+    WebSocket이 끊긴 동안에는 fallback_poll 간격의 폴링으로 동작한 뒤 재연결 시
+    놓친 블록의 로그를 get_logs로 보충한다.
+    """
+
+    def __init__(self, web3, ws_uri, fallback_poll=0.5, safety_poll=5.0, max_reconnect_delay=10.0):
+        self.web3 = web3
+        self.ws_uri = ws_uri
+        self.fallback_poll = fallback_poll
+        self.safety_poll = safety_poll
+        self.max_reconnect_delay = max_reconnect_delay
+        self.last_block = None
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._log_filters = []
+        self._head_callbacks = []
+        # (blockHash, logIndex) → None, 최근에 전달한 로그 (오래된 것부터 버림)
+        self._dispatched = OrderedDict()
+        self._connected = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._loop = None
+
+    @property
+    def connected(self):
+        return self._connected.is_set()
+
+    def on_new_head(self, callback):
+        """새 블록 번호를 인자로 호출할 콜백 등록"""
+        self._head_callbacks.append(callback)
+
+    def subscribe_events(self, contract, callback, event_names=UPDATE_EVENTS):
+        """contract의 지정 이벤트를 디코딩해 callback(event)으로 전달 (start() 전에 등록)"""
+        events = {}
+        for name in event_names:
+            event = contract.events[name]()
+            events[bytes(event_abi_to_log_topic(event.abi))] = event
+        params = {"address": contract.address, "topics": [[Web3.to_hex(t) for t in events]]}
+        self._log_filters.append((params, events, callback))
+
+    def start(self, connect_timeout=5.0):
+        """백그라운드 스레드에서 구독을 시작하고 첫 연결을 connect_timeout초까지 기다림"""
+        if self._thread is not None:
+            return self
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run_loop, daemon=True)
+        self._thread.start()
+        if not self._connected.wait(connect_timeout):
+            logger.warning(f"WebSocket 연결 대기 시간 초과, 폴링으로 영수증 확인: {self.ws_uri}")
+        return self
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stop_event.set()
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(lambda: None)
+        self._thread.join()
+        self._thread = None
+
+    def wait_for_receipt(self, tx_hash, timeout=120):
+        """영수증이 포함된 블록 알림을 받는 즉시 반환 (web3 wait_for_transaction_receipt 대체)"""
+        tx_hash = HexBytes(tx_hash)
+        future = Future()
+        with self._lock:
+            self._pending.setdefault(tx_hash, []).append(future)
+        try:
+            deadline = time.monotonic() + timeout
+            while True:
+                # 등록 전에 이미 채굴되었거나 알림이 유실된 경우를 위해 직접 확인
+                receipt = self._get_receipt(tx_hash)
+                if receipt is not None:
+                    return receipt
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeExhausted(f"{timeout}초 안에 영수증을 받지 못했습니다: {tx_hash.hex()}")
+                wait = self.safety_poll if self.connected else self.fallback_poll
+                try:
+                    return future.result(timeout=min(remaining, wait))
+                except FutureTimeout:
+                    continue
+        finally:
+            with self._lock:
+                futures = self._pending.get(tx_hash, [])
+                if future in futures:
+                    futures.remove(future)
+                if not futures:
+                    self._pending.pop(tx_hash, None)
+
+    def _get_receipt(self, tx_hash):
+        try:
+            return self.web3.eth.get_transaction_receipt(tx_hash)
+        except Exception:
+            return None
+
+    def _resolve_block(self, block_number):
+        """새 블록에 포함된 대기 중 트랜잭션의 영수증을 조회해 기다리는 스레드를 깨움"""
+        with self._lock:
+            pending = set(self._pending)
+        if not pending:
+            return
+        block = self.web3.eth.get_block(block_number)
+        self._resolve(pending.intersection(HexBytes(tx) for tx in block["transactions"]))
+
+    def _resolve(self, tx_hashes):
+        for tx_hash in tx_hashes:
+            receipt = self._get_receipt(tx_hash)
+            if receipt is None:
+                continue
+            with self._lock:
+                futures = self._pending.pop(tx_hash, [])
+            for future in futures:
+                if not future.done():
+                    future.set_result(receipt)
+
+    def _first_dispatch(self, log):
+        """처음 보는 로그면 기억하고 True (같은 로그가 구독과 보충 조회로 두 번 오는 경우 방지)
+
+        last_block은 newHeads로만 전진하므로, 블록 알림보다 먼저 로그 알림을 받은 블록이나
+        재연결 직후 _catch_up 전에 새 소켓으로 받은 로그는 보충 조회에서 다시 나온다.
+        """
+        key = (bytes(log["blockHash"]), log["logIndex"])
+        with self._lock:
+            if log.get("removed"):
+                # 재구성으로 취소된 로그는 잊어서, 그 블록이 다시 채택되면 다시 전달
+                self._dispatched.pop(key, None)
+                return False
+            if key in self._dispatched:
+                return False
+            self._dispatched[key] = None
+            if len(self._dispatched) > DISPATCHED_LOG_MEMORY:
+                self._dispatched.popitem(last=False)
+        return True
+
+    def _dispatch_log(self, raw_or_log):
+        log = raw_or_log if isinstance(raw_or_log, AttributeDict) else _format_log(raw_or_log)
+        # 체인 재구성으로 취소된 로그와 이미 전달한 로그는 소비자에게 전달하지 않음
+        if not self._first_dispatch(log):
+            return
+        for params, events, callback in self._log_filters:
+            if log["address"] != params["address"] or not log["topics"]:
+                continue
+            event = events.get(bytes(log["topics"][0]))
+            if event is None:
+                continue
+            try:
+                callback(event.process_log(log))
+            except Exception as e:
+                logger.error(f"이벤트 처리 중 오류 발생: {e}")
+
+    def _catch_up(self):
+        """끊긴 동안 놓친 블록의 로그를 보충하고 대기 중 영수증을 다시 확인"""
+        latest = self.web3.eth.block_number
+        if self.last_block is not None and latest > self.last_block:
+            for params, _, _ in self._log_filters:
+                logs = self.web3.eth.get_logs(
+                    {**params, "fromBlock": self.last_block + 1, "toBlock": latest}
+                )
+                for log in logs:
+                    self._dispatch_log(log)
+        self.last_block = latest
+        with self._lock:
+            pending = list(self._pending)
+        self._resolve(pending)
+
+    def _run_loop(self):
+        self._loop = asyncio.new_event_loop()
+        try:
+            self._loop.run_until_complete(self._run())
+        finally:
+            self._loop.close()
+            self._loop = None
+
+    async def _run(self):
+        delay = self.fallback_poll
+        while not self._stop_event.is_set():
+            try:
+                async with websockets.connect(self.ws_uri, max_size=None) as ws:
+                    subscriptions = await self._subscribe(ws)
+                    self._connected.set()
+                    delay = self.fallback_poll
+                    logger.info(f"WebSocket 구독 시작: {self.ws_uri} (구독 {len(subscriptions)}개)")
+                    await asyncio.to_thread(self._catch_up)
+                    await self._consume(ws, subscriptions)
+            except Exception as e:
+                if self._stop_event.is_set():
+                    break
+                logger.warning(f"WebSocket 연결 끊김, {delay:.1f}초 후 재연결: {e}")
+                metrics.inc("retries_total", operation="ws_reconnect")
+            finally:
+                self._connected.clear()
+            if self._stop_event.is_set():
+                break
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_reconnect_delay)
+
+    async def _subscribe(self, ws):
+        """newHeads와 로그 필터를 구독하고 구독 id → 처리 함수 매핑 반환"""
+        requests_ = [("newHeads", None)] + [("logs", params) for params, _, _ in self._log_filters]
+        subscriptions = {}
+        for request_id, (kind, params) in enumerate(requests_, start=1):
+            rpc_params = [kind] if params is None else [kind, params]
+            await ws.send(
+                json.dumps({"jsonrpc": "2.0", "id": request_id, "method": "eth_subscribe", "params": rpc_params})
+            )
+            while True:
+                message = json.loads(await ws.recv())
+                if message.get("id") == request_id:
+                    break
+            if "error" in message:
+                raise ConnectionError(f"eth_subscribe({kind}) 실패: {message['error']}")
+            subscriptions[message["result"]] = kind
+        return subscriptions
+
+    async def _consume(self, ws, subscriptions):
+        while not self._stop_event.is_set():
+            try:
+                message = json.loads(await asyncio.wait_for(ws.recv(), timeout=1.0))
+            except asyncio.TimeoutError:
+                continue
+            if message.get("method") != "eth_subscription":
+                continue
+            params = message["params"]
+            kind = subscriptions.get(params["subscription"])
+            if kind == "newHeads":
+                block_number = int(params["result"]["number"], 16)
+                self.last_block = block_number
+                await asyncio.to_thread(self._resolve_block, block_number)
+                for callback in self._head_callbacks:
+                    try:
+                        callback(block_number)
+                    except Exception as e:
+                        logger.error(f"새 블록 처리 중 오류 발생: {e}")
+            elif kind == "logs":
+                self._dispatch_log(params["result"])
+
+
+def receipt_waiter_from_env(web3):
+    """WEB3_WS_PROVIDER가 설정된 경우에만 구독 클라이언트를 시작해 반환 (없으면 None → 폴링)"""
+    ws_uri = os.getenv("WEB3_WS_PROVIDER")
+    if not ws_uri:
+        return None
+    return SubscriptionClient(web3, ws_uri).start()
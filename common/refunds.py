@@ -0,0 +1,49 @@
+import logging
+from common.tx_pipeline import TransactionPipeline, log_results
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BUYERS = 100
+# 구매자 1명 환불 시 저장소 갱신 3건 + 송금에 드는 가스의 여유 있는 상한
+REFUND_GAS_PER_BUYER = 80000
+REFUND_BASE_GAS = 100000
+
+
+def process_refunds(
+    web3,
+    contract,
+    uid,
+    account_address,
+    private_key="",
+    max_buyers=DEFAULT_MAX_BUYERS,
+    max_in_flight=4,
+    progress=None,
+):
+    """취소된 업데이트의 환불을 processRefunds(uid, max_buyers)로 끝까지 반복 처리
+
+    한 라운드에 최대 max_in_flight개의 processRefunds 트랜잭션을 연속 전송하고,
+    영수증을 모은 뒤 getRefundProgress로 진행 상황을 확인한다. progress가 주어지면
+    라운드마다 progress(processed, total)를 호출한다. 없는 업데이트나 취소되지 않은
+    업데이트면 트랜잭션을 보내지 않고 ValueError를 발생시킨다.
+    """
+    # 없거나 유효한 업데이트에 보내면 체인에서 revert되어 가스만 소모하므로 전송 전에 확인
+    if not contract.functions.updateExists(uid).call():
+        raise ValueError(f"존재하지 않는 업데이트입니다: {uid}")
+    if contract.functions.getUpdateInfo(uid).call()[-1]:
+        raise ValueError(f"취소되지 않은 업데이트는 환불 처리할 수 없습니다: {uid}")
+    gas = REFUND_GAS_PER_BUYER * max_buyers + REFUND_BASE_GAS
+    pipeline = TransactionPipeline(web3, account_address, private_key)
+    processed, total = contract.functions.getRefundProgress(uid).call()
+    while processed < total:
+        chunks = min(max_in_flight, -(-(total - processed) // max_buyers))
+        for i in range(chunks):
+            # 파이프라인 label은 메트릭 라벨로도 쓰이므로 고정값을 쓰고 uid/위치는 로그로 남김
+            logger.info(f"환불 처리 전송: {uid} (구매자 {processed + i * max_buyers}번부터 최대 {max_buyers}명)")
+            pipeline.submit("processRefunds", contract.functions.processRefunds(uid, max_buyers), gas=gas)
+        if not log_results(pipeline.wait_all()):
+            raise RuntimeError(f"환불 처리 트랜잭션 실패: {uid} ({processed}/{total})")
+        processed, total = contract.functions.getRefundProgress(uid).call()
+        logger.info(f"환불 처리 진행: {uid} {processed}/{total}")
+        if progress is not None:
+            progress(processed, total)
+    return processed, total
@@ -0,0 +1,173 @@
+import os
+import json
+import logging
+import tempfile
+import threading
+from eth_utils import event_abi_to_log_topic
+from common.abi_store import AbiStore
+from common.log_ranges import LogRangeReader
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_REGISTRY_PATH = "/app/registry-service/registry_address.json"
+
+
+class RegistryClient:
+    """AddressRegistry 조회 결과(이름→주소, 이름→ABI 다이제스트)를 캐시하는 클라이언트
+
+    주소는 ContractAddressUpdated, ABI 다이제스트는 AbiUpdated 이벤트로 해당 이름이
+    갱신되었을 때만 캐시에서 삭제된다. ABI 본문은 다이제스트를 검증하며 AbiStore에서
+    읽으므로 버전마다 한 번만 디스크에서 로드된다. start_watching()으로 이벤트를
+    백그라운드에서 확인하면 조회 자체는 RPC 호출 없이 메모리에서 처리된다.
+    cache_path를 지정하면 재시작 후에도 캐시를 이어서 사용한다.
+    이벤트 토픽은 레지스트리 ABI에서 계산하고, 오래 멈춰 있다가 재시작해도 LogRangeReader로
+    구간을 나누어 조회한다.
+    """
+
+    def __init__(self, web3, registry_address, registry_abi, cache_path=None, abi_store=None):
+        self.web3 = web3
+        self.registry = web3.eth.contract(address=registry_address, abi=registry_abi)
+        # 토픽 → 갱신 이벤트와 그 이벤트가 무효화하는 캐시
+        self._address_event = self.registry.events.ContractAddressUpdated()
+        self._abi_event = self.registry.events.AbiUpdated()
+        self._address_topic = bytes(event_abi_to_log_topic(self._address_event.abi))
+        self.ranges = LogRangeReader(
+            web3,
+            self.registry.address,
+            [self._address_topic, event_abi_to_log_topic(self._abi_event.abi)],
+        )
+        self.cache_path = cache_path
+        self.abi_store = abi_store or AbiStore()
+        self._lock = threading.RLock()
+        self._addresses = {}
+        self._abi_hashes = {}
+        self._last_block = None
+        self._watch_thread = None
+        self._stop_event = threading.Event()
+        if cache_path:
+            self._load_cache()
+        if self._last_block is None:
+            # 이 블록 이후의 이벤트만 확인하면 되도록 조회 전에 기준 블록을 기록
+            self._last_block = web3.eth.block_number
+
+    @classmethod
+    def from_file(cls, web3, registry_path=DEFAULT_REGISTRY_PATH, cache_path=None, abi_store=None):
+        """deploy_registry.py가 저장한 registry_address.json으로 클라이언트 생성"""
+        with open(registry_path) as f:
+            reg = json.load(f)
+        return cls(web3, reg["address"], reg["abi"], cache_path=cache_path, abi_store=abi_store)
+
+    def _load_cache(self):
+        try:
+            with open(self.cache_path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("registry") != self.registry.address:
+            logger.info("레지스트리 주소가 바뀌어 디스크 캐시를 무시합니다.")
+            return
+        self._addresses = data.get("addresses", {})
+        self._abi_hashes = data.get("abi_hashes", {})
+        self._last_block = data.get("block")
+
+    def _save_cache(self):
+        if not self.cache_path:
+            return
+        data = {
+            "registry": self.registry.address,
+            "block": self._last_block,
+            "addresses": self._addresses,
+            "abi_hashes": self._abi_hashes,
+        }
+        cache_dir = os.path.dirname(os.path.abspath(self.cache_path))
+        os.makedirs(cache_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            logger.warning(f"레지스트리 캐시 저장 실패: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def get_address(self, name):
+        with self._lock:
+            address = self._addresses.get(name)
+            if address is None:
+                address = self.registry.functions.getContractAddress(name).call()
+                self._addresses[name] = address
+                self._save_cache()
+            return address
+
+    def get_abi_hash(self, name):
+        """(다이제스트 16진수 문자열, 버전) 반환"""
+        with self._lock:
+            record = self._abi_hashes.get(name)
+            if record is None:
+                digest, version = self.registry.functions.getAbiHash(name).call()
+                record = {"digest": bytes(digest).hex(), "version": version}
+                self._abi_hashes[name] = record
+                self._save_cache()
+            return record["digest"], record["version"]
+
+    def get_abi(self, name):
+        digest, _ = self.get_abi_hash(name)
+        return self.abi_store.get(bytes.fromhex(digest))
+
+    def get_contract(self, name):
+        """캐시된 주소와 ABI로 컨트랙트 인스턴스 생성"""
+        return self.web3.eth.contract(address=self.get_address(name), abi=self.get_abi(name))
+
+    def invalidate(self, name):
+        with self._lock:
+            self._addresses.pop(name, None)
+            self._abi_hashes.pop(name, None)
+
+    def poll_events(self):
+        """마지막 확인 이후의 주소/ABI 갱신 이벤트를 읽어 해당 이름의 항목만 캐시에서 삭제"""
+        latest = self.web3.eth.block_number
+        with self._lock:
+            from_block = self._last_block + 1
+        names = []
+        while from_block <= latest:
+            to_block, logs = self.ranges.next_range(from_block, latest)
+            with self._lock:
+                for log in logs:
+                    if bytes(log["topics"][0]) == self._address_topic:
+                        name = self._address_event.process_log(log)["args"]["name"]
+                        self._addresses.pop(name, None)
+                    else:
+                        name = self._abi_event.process_log(log)["args"]["name"]
+                        self._abi_hashes.pop(name, None)
+                    names.append(name)
+                # 구간마다 기록해 중간에 실패해도 처리한 구간은 다시 조회하지 않음
+                self._last_block = to_block
+                self._save_cache()
+            from_block = to_block + 1
+        if names:
+            logger.info(f"레지스트리 갱신 감지, 캐시 무효화: {sorted(set(names))}")
+        return names
+
+    def start_watching(self, poll_interval=2.0):
+        """백그라운드 스레드에서 주기적으로 poll_events() 호출"""
+        if self._watch_thread is not None:
+            return
+        self._stop_event.clear()
+
+        def _watch():
+            while not self._stop_event.wait(poll_interval):
+                try:
+                    self.poll_events()
+                except Exception as e:
+                    logger.warning(f"레지스트리 이벤트 확인 중 오류 발생: {e}")
+
+        self._watch_thread = threading.Thread(target=_watch, daemon=True)
+        self._watch_thread.start()
+
+    def stop_watching(self):
+        if self._watch_thread is None:
+            return
+        self._stop_event.set()
+        self._watch_thread.join()
+        self._watch_thread = None
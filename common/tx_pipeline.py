@@ -0,0 +1,267 @@
+import time
+import logging
+import threading
+import rlp
+from eth_utils import keccak, to_canonical_address, to_checksum_address
+from web3.exceptions import TimeExhausted
+from common.fees import (
+    DEFAULT_MAX_REPLACEMENTS,
+    FeeStrategy,
+    gas_estimator,
+    replace_after_from_env,
+)
+from common.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+def metric_label(tx_callable):
+    """메트릭 라벨로 쓸 함수 이름 (배포는 "constructor")
+
+    submit()의 label은 uid 등 자유 형식이라 그대로 쓰면 Prometheus 시계열이 끝없이 늘어나므로
+    메트릭에는 값의 종류가 한정된 함수 이름만 쓰고, label은 로그와 결과에만 남긴다.
+    """
+    return getattr(tx_callable, "fn_name", None) or "constructor"
+
+
+def predict_contract_address(sender, nonce):
+    """배포자 주소와 nonce로 CREATE 배포 주소를 미리 계산"""
+    encoded = rlp.encode([to_canonical_address(sender), nonce])
+    return to_checksum_address(keccak(encoded)[12:])
+
+
+class NonceManager:
+    """계정 nonce를 로컬에서 증가시켜 영수증을 기다리지 않고 연속 전송할 수 있게 함"""
+
+    def __init__(self, web3, account_address):
+        self.web3 = web3
+        self.account_address = account_address
+        self._lock = threading.Lock()
+        self._next_nonce = None
+
+    def _sync(self):
+        if self._next_nonce is None:
+            # 아직 채굴되지 않은 트랜잭션까지 포함한 nonce에서 시작
+            self._next_nonce = self.web3.eth.get_transaction_count(
+                self.account_address, "pending"
+            )
+
+    def peek(self):
+        with self._lock:
+            self._sync()
+            return self._next_nonce
+
+    def next_nonce(self):
+        with self._lock:
+            self._sync()
+            nonce = self._next_nonce
+            self._next_nonce += 1
+            return nonce
+
+    def reset(self):
+        """전송 실패로 nonce 공백이 생겼을 때 다음 호출에서 노드 값으로 다시 동기화"""
+        with self._lock:
+            self._next_nonce = None
+
+
+class TransactionPipeline:
+    """의존 관계가 있는 트랜잭션을 연속 서명/전송한 뒤 영수증을 한꺼번에 기다림
+
+    트랜잭션은 nonce 순서대로 처리되므로 앞선 배포가 채굴되기 전에도 예측 주소를
+    이용해 후속 호출을 보낼 수 있다. 단, 앞선 트랜잭션이 revert되어도 후속
+    트랜잭션은 그대로 실행되므로 wait_all() 결과의 status를 반드시 확인해야 한다.
+    receipt_waiter(providers.SubscriptionClient)를 주면 영수증을 폴링하지 않고
+    새 블록 알림으로 확인한다.
+
+    수수료는 fees(FeeStrategy, 기본값은 환경 변수 설정)로 정하고, submit()에 gas를
+    주지 않으면 GasEstimator의 캐시된 추정치를 쓴다. replace_after초 동안 채굴되지 않은
+    트랜잭션은 같은 nonce로 수수료를 올려 최대 max_replacements번 다시 보낸다.
+    """
+
+    def __init__(
+        self,
+        web3,
+        account_address,
+        private_key="",
+        nonce_manager=None,
+        receipt_waiter=None,
+        fees=None,
+        estimator=None,
+        replace_after=None,
+        max_replacements=DEFAULT_MAX_REPLACEMENTS,
+    ):
+        self.web3 = web3
+        self.account_address = account_address
+        self.private_key = private_key
+        self.nonce_manager = nonce_manager or NonceManager(web3, account_address)
+        self.receipt_waiter = receipt_waiter
+        self.fees = fees or FeeStrategy.from_env(web3)
+        self.estimator = estimator or gas_estimator
+        self.replace_after = replace_after_from_env() if replace_after is None else (replace_after or None)
+        self.max_replacements = max_replacements
+        self._pending = []
+        self._failed = False
+
+    def predict_next_contract_address(self):
+        return predict_contract_address(self.account_address, self.nonce_manager.peek())
+
+    def _send(self, tx_callable, tx_params):
+        if self.private_key:
+            tx = tx_callable.build_transaction(tx_params)
+            with metrics.span("phase", phase="sign"):
+                signed_tx = self.web3.eth.account.sign_transaction(tx, self.private_key)
+            return self.web3.eth.send_raw_transaction(signed_tx.raw_transaction)
+        return tx_callable.transact(tx_params)
+
+    def submit(self, label, tx_callable, gas=None, value=0):
+        """constructor() 또는 functions.xxx(...) 호출을 다음 nonce로 전송 (gas가 없으면 추정)"""
+        entry = {
+            "label": label,
+            "metric_label": metric_label(tx_callable),
+            "nonce": None,
+            "tx_hash": None,
+            "tx_hashes": [],
+            "submitted_at": None,
+        }
+        self._pending.append(entry)
+        if self._failed:
+            # 앞선 전송이 실패하면 nonce 공백 때문에 후속 트랜잭션이 처리되지 않으므로 건너뜀
+            entry["error"] = "skipped: previous submission failed"
+            return entry
+        tx_params = {"from": self.account_address}
+        if value:
+            tx_params["value"] = value
+        try:
+            # 추정이 revert되면 nonce를 쓰기 전에 실패로 처리
+            tx_params["gas"] = gas or self.estimator.gas_limit(tx_callable, tx_params)
+        except Exception as e:
+            logger.error(f"가스 추정 실패: {label}: {e}")
+            metrics.inc("tx_failed_total", label=entry["metric_label"], stage="estimate")
+            entry["error"] = str(e)
+            self._failed = True
+            return entry
+        tx_params.update(self.fees.fee_params())
+        nonce = self.nonce_manager.next_nonce()
+        tx_params["nonce"] = nonce
+        entry["nonce"] = nonce
+        entry["tx_callable"] = tx_callable
+        entry["tx_params"] = tx_params
+        try:
+            entry["submitted_at"] = time.perf_counter()
+            with metrics.span("phase", phase="submit"):
+                entry["tx_hash"] = self._send(tx_callable, tx_params)
+            entry["tx_hashes"].append(entry["tx_hash"])
+            metrics.inc("tx_submitted_total", label=entry["metric_label"])
+            logger.info(f"트랜잭션 전송: {label} (nonce={nonce}, gas={tx_params['gas']})")
+        except Exception as e:
+            logger.error(f"트랜잭션 전송 실패: {label} (nonce={nonce}): {e}")
+            metrics.inc("tx_failed_total", label=entry["metric_label"], stage="submit")
+            entry["error"] = str(e)
+            self._failed = True
+            self.nonce_manager.reset()
+        return entry
+
+    def _replace(self, entry):
+        """대기 중인 트랜잭션을 같은 nonce, 더 높은 수수료로 다시 전송"""
+        fees = self.fees.bump(entry["tx_params"])
+        if fees is None:
+            return False
+        tx_params = dict(entry["tx_params"], **fees)
+        try:
+            tx_hash = self._send(entry["tx_callable"], tx_params)
+        except Exception as e:
+            # 그 사이 이전 트랜잭션이 채굴되었으면 nonce too low 등으로 거부됨
+            logger.warning(f"교체 트랜잭션 전송 실패: {entry['label']} (nonce={entry['nonce']}): {e}")
+            return False
+        entry["tx_params"] = tx_params
+        entry["tx_hash"] = tx_hash
+        entry["tx_hashes"].append(tx_hash)
+        metrics.inc("tx_replaced_total", label=entry["metric_label"])
+        logger.info(f"수수료를 올려 교체 전송: {entry['label']} (nonce={entry['nonce']}, {fees})")
+        return True
+
+    def _mined_receipt(self, entry):
+        # 교체 전에 보낸 트랜잭션이 먼저 채굴되었을 수 있으므로 모든 해시를 확인
+        for tx_hash in reversed(entry["tx_hashes"]):
+            try:
+                return self.web3.eth.get_transaction_receipt(tx_hash)
+            except Exception:
+                continue
+        return None
+
+    def _wait_receipt(self, tx_hash, timeout, poll_latency):
+        if self.receipt_waiter is not None:
+            return self.receipt_waiter.wait_for_receipt(tx_hash, timeout=timeout)
+        return self.web3.eth.wait_for_transaction_receipt(
+            tx_hash, timeout=timeout, poll_latency=poll_latency
+        )
+
+    def _wait_entry(self, entry, timeout, poll_latency):
+        """영수증을 기다리다 replace_after초마다 수수료를 올려 교체 (timeout은 전체 대기 시간)"""
+        deadline = time.monotonic() + timeout
+        attempts = 0
+        while True:
+            remaining = max(0.0, deadline - time.monotonic())
+            replaceable = self.replace_after is not None and attempts < self.max_replacements
+            wait = min(remaining, self.replace_after) if replaceable else remaining
+            try:
+                return self._wait_receipt(entry["tx_hash"], wait, poll_latency)
+            except TimeExhausted:
+                receipt = self._mined_receipt(entry)
+                if receipt is not None:
+                    return receipt
+                if not replaceable or time.monotonic() >= deadline:
+                    raise
+                attempts += 1
+                self._replace(entry)
+
+    def wait_all(self, timeout=120, poll_latency=0.1):
+        """전송한 모든 트랜잭션의 영수증을 모아 트랜잭션별 결과 목록으로 반환"""
+        results = []
+        # 모두 이미 브로드캐스트되었으므로 순서대로 기다려도 전체 대기 시간은 마지막 블록 기준
+        for entry in self._pending:
+            result = {
+                "label": entry["label"],
+                "nonce": entry["nonce"],
+                "tx_hash": entry["tx_hash"],
+                "status": 0,
+                "receipt": None,
+                "error": entry.get("error"),
+                "submitted_at": entry["submitted_at"],
+                "confirmed_at": None,
+            }
+            if entry["tx_hash"] is not None:
+                try:
+                    with metrics.span("phase", phase="wait_receipt"):
+                        receipt = self._wait_entry(entry, timeout, poll_latency)
+                    result["receipt"] = receipt
+                    result["tx_hash"] = receipt.transactionHash
+                    result["status"] = receipt.status
+                    result["confirmed_at"] = time.perf_counter()
+                    metrics.inc("gas_used_total", receipt.gasUsed, label=entry["metric_label"])
+                    if receipt.status != 1:
+                        metrics.inc("tx_failed_total", label=entry["metric_label"], stage="reverted")
+                except Exception as e:
+                    result["error"] = str(e)
+                    metrics.inc("tx_failed_total", label=entry["metric_label"], stage="receipt")
+            result["replacements"] = max(0, len(entry["tx_hashes"]) - 1)
+            results.append(result)
+        self._pending = []
+        self._failed = False
+        return results
+
+
+def log_results(results):
+    """wait_all() 결과를 트랜잭션별로 로깅하고 전체 성공 여부를 반환"""
+    ok = True
+    for result in results:
+        tx_hash = result["tx_hash"].hex() if result["tx_hash"] is not None else "-"
+        if result["status"] == 1:
+            logger.info(f"{result['label']} 성공 (nonce={result['nonce']}, 트랜잭션 해시: {tx_hash})")
+        else:
+            ok = False
+            logger.error(
+                f"{result['label']} 실패 (nonce={result['nonce']}, 트랜잭션 해시: {tx_hash}): "
+                f"{result['error'] or 'reverted'}"
+            )
+    return ok
@@ -0,0 +1,88 @@
+"""SoftwareUpdateContract의 압축 저장 형식과 사람이 읽는 값 사이의 변환
+
+- ipfsHash: CIDv0("Qm...") ↔ sha2-256 multihash의 32바이트 다이제스트(bytes32)
+- hashOfUpdate: 64자리 16진수 SHA-256 문자열 ↔ bytes32
+- version: "major.minor.patch" ↔ uint64 ((major << 32) | (minor << 16) | patch)
+"""
+
+B58_ALPHABET = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+# multihash 접두어: 0x12 = sha2-256, 0x20 = 32바이트
+SHA256_MULTIHASH_PREFIX = b"\x12\x20"
+VERSION_PART_MAX = 0xFFFF
+
+
+def b58encode(data):
+    num = int.from_bytes(data, "big")
+    encoded = ""
+    while num > 0:
+        num, rem = divmod(num, 58)
+        encoded = B58_ALPHABET[rem] + encoded
+    pad = len(data) - len(data.lstrip(b"\x00"))
+    return B58_ALPHABET[0] * pad + encoded
+
+
+def b58decode(text):
+    num = 0
+    for char in text:
+        index = B58_ALPHABET.find(char)
+        if index < 0:
+            raise ValueError(f"base58 문자가 아닙니다: {char!r}")
+        num = num * 58 + index
+    pad = len(text) - len(text.lstrip(B58_ALPHABET[0]))
+    body = num.to_bytes((num.bit_length() + 7) // 8, "big") if num else b""
+    return b"\x00" * pad + body
+
+
+def encode_ipfs_hash(cid):
+    """CIDv0 문자열을 bytes32 다이제스트로 변환"""
+    raw = b58decode(cid)
+    if len(raw) != 34 or not raw.startswith(SHA256_MULTIHASH_PREFIX):
+        raise ValueError(f"sha2-256 CIDv0 형식이 아닙니다: {cid}")
+    return raw[2:]
+
+
+def decode_ipfs_hash(digest):
+    """bytes32 다이제스트를 CIDv0 문자열로 변환"""
+    return b58encode(SHA256_MULTIHASH_PREFIX + bytes(digest))
+
+
+def encode_update_hash(value):
+    """16진수 SHA-256 문자열(0x 접두어 허용) 또는 32바이트 값을 bytes32로 변환"""
+    if isinstance(value, str):
+        value = bytes.fromhex(value[2:] if value.startswith("0x") else value)
+    value = bytes(value)
+    if len(value) != 32:
+        raise ValueError(f"32바이트 해시가 아닙니다: {len(value)}바이트")
+    return value
+
+
+def decode_update_hash(value):
+    return bytes(value).hex()
+
+
+def encode_version(version):
+    """"1.2.3" 형식의 버전을 uint64로 변환"""
+    parts = [int(p) for p in version.split(".")]
+    if len(parts) > 3 or any(p < 0 or p > VERSION_PART_MAX for p in parts):
+        raise ValueError(f"지원하지 않는 버전 형식입니다: {version}")
+    major, minor, patch = (parts + [0, 0])[:3]
+    return (major << 32) | (minor << 16) | patch
+
+
+def decode_version(packed):
+    return f"{packed >> 32}.{(packed >> 16) & VERSION_PART_MAX}.{packed & VERSION_PART_MAX}"
+
+
+def encode_update(uid, ipfs_hash, encrypted_key, hash_of_update, description, price, version):
+    """registerUpdate에 전달할 인자(서명 제외)를 압축 형식으로 변환"""
+    if isinstance(encrypted_key, str):
+        encrypted_key = encrypted_key.encode("utf-8")
+    return (
+        uid,
+        encode_ipfs_hash(ipfs_hash),
+        bytes(encrypted_key),
+        encode_update_hash(hash_of_update),
+        description,
+        int(price),
+        encode_version(version),
+    )
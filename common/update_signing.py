@@ -0,0 +1,50 @@
+from eth_account import Account
+from eth_account.messages import encode_defunct
+from web3 import Web3
+from common.update_codec import encode_update
+
+
+def update_message_hash(uid, ipfs_digest, encrypted_key, update_hash, description, price, version):
+    """registerUpdate가 검증하는 keccak256(abi.encodePacked(...)) 메시지 해시 (압축 형식 인자)"""
+    return Web3.solidity_keccak(
+        ["string", "bytes32", "bytes", "bytes32", "string", "uint128", "uint64"],
+        [uid, ipfs_digest, encrypted_key, update_hash, description, price, version],
+    )
+
+
+def sign_update(private_key, uid, ipfs_digest, encrypted_key, update_hash, description, price, version):
+    """제조사 비밀키로 업데이트 등록 메시지에 서명하여 65바이트 서명 반환"""
+    message_hash = update_message_hash(
+        uid, ipfs_digest, encrypted_key, update_hash, description, price, version
+    )
+    # 컨트랙트는 "\x19Ethereum Signed Message:\n32" 접두어를 붙인 해시로 ecrecover 수행
+    signed = Account.sign_message(encode_defunct(primitive=message_hash), private_key)
+    return bytes(signed.signature)
+
+
+def build_register_args(private_key, uid, ipfs_hash, encrypted_key, hash_of_update, description, price, version):
+    """사람이 읽는 값(CID, 16진수 해시, "1.2.3")으로 서명까지 포함한 registerUpdate 인자 생성"""
+    encoded = encode_update(
+        uid, ipfs_hash, encrypted_key, hash_of_update, description, price, version
+    )
+    return encoded + (sign_update(private_key, *encoded),)
+
+
+def batch_message_hash(encoded_updates):
+    """registerUpdatesBatch가 검증하는 해시: 항목별 update_message_hash를 순서대로 이어 붙여 keccak256"""
+    item_hashes = [update_message_hash(*encoded) for encoded in encoded_updates]
+    return Web3.keccak(b"".join(bytes(h) for h in item_hashes))
+
+
+def sign_update_batch(private_key, encoded_updates):
+    """압축 형식 업데이트 목록 전체에 한 번만 서명하여 65바이트 서명 반환"""
+    message_hash = batch_message_hash(encoded_updates)
+    signed = Account.sign_message(encode_defunct(primitive=message_hash), private_key)
+    return bytes(signed.signature)
+
+
+def build_register_batch_args(private_key, updates):
+    """사람이 읽는 값의 (uid, ipfs_hash, encrypted_key, hash_of_update, description, price, version)
+    목록으로 registerUpdatesBatch 인자 (UpdateInput 튜플 목록, 서명) 생성"""
+    encoded_updates = [encode_update(*update) for update in updates]
+    return encoded_updates, sign_update_batch(private_key, encoded_updates)
@@ -0,0 +1,302 @@
+import os
+import sys
+import time
+import asyncio
+import logging
+import argparse
+from web3 import AsyncWeb3, AsyncHTTPProvider
+from dotenv import load_dotenv
+
+# 공용 모듈 경로 추가 (컨테이너: /app/common, 저장소: ../common)
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for _root in (BASE_DIR, os.path.dirname(BASE_DIR)):
+    if os.path.isdir(os.path.join(_root, "common")) and _root not in sys.path:
+        sys.path.insert(0, _root)
+
+from common.abi_store import AbiStore  # noqa: E402
+from common.compile_cache import compile_artifact  # noqa: E402
+from common.deploy_manifest import format_summary, record_deployments  # noqa: E402
+from common.deploy_state import save_deployment  # noqa: E402
+from common.fees import FeeStrategy, gas_estimator  # noqa: E402
+
+# 로깅 설정
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_WORKERS = 16
+
+
+def _find_service_dir(name):
+    """컨테이너(/app/<name>)와 저장소(../<name>) 양쪽에서 서비스 디렉터리 탐색"""
+    for root in (BASE_DIR, os.path.dirname(BASE_DIR)):
+        path = os.path.join(root, name)
+        if os.path.isdir(path):
+            return path
+    raise FileNotFoundError(f"서비스 디렉터리를 찾을 수 없습니다: {name}")
+
+
+REGISTRY_DIR = _find_service_dir("registry-service")
+UPDATE_DIR = _find_service_dir("update_service")
+REGISTRY_SOURCE = os.path.join(REGISTRY_DIR, "contracts", "AddressRegistry.sol")
+UPDATE_SOURCE = os.path.join(UPDATE_DIR, "contracts", "SoftwareUpdateContract.sol")
+DEFAULT_MANIFEST = os.path.join(BASE_DIR, "deployments.json")
+
+
+def load_env():
+    load_dotenv()
+    web3_provider = os.getenv("WEB3_PROVIDER", "http://host.docker.internal:8545")
+    private_key = os.getenv("PRIVATE_KEY", "")
+    account_address = os.getenv(
+        "ACCOUNT_ADDRESS", "0xf39Fd6e51aad88F6F4ce6aB8827279cffFb92266"
+    )
+    return web3_provider, private_key, account_address
+
+
+async def wait_for_node(web3, timeout=60, initial_delay=0.05, max_delay=2.0):
+    """eth_chainId 응답을 기준으로 노드 준비 상태를 지수 백오프로 확인하고 chain id 반환"""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    delay = initial_delay
+    attempt = 0
+    while True:
+        attempt += 1
+        try:
+            chain_id = await web3.eth.chain_id
+            logger.info(f"노드 준비 완료 (chain id: {chain_id}, 시도 {attempt}회)")
+            return chain_id
+        except Exception as e:
+            if loop.time() + delay > deadline:
+                raise ConnectionError(f"{timeout}초 안에 노드에 연결할 수 없습니다: {e}")
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, max_delay)
+
+
+async def compile_contracts():
+    """두 컨트랙트를 별도 스레드에서 동시에 컴파일 (캐시 적중 시 즉시 반환)
+
+    서비스별 배포 스크립트와 같은 기본 컴파일 설정을 써야 산출물 키가 같아져서,
+    이후 각 서비스가 재시작할 때 이 배포를 그대로 재사용한다.
+    """
+    return await asyncio.gather(
+        asyncio.to_thread(compile_artifact, REGISTRY_SOURCE),
+        asyncio.to_thread(compile_artifact, UPDATE_SOURCE),
+    )
+
+
+class AsyncSender:
+    """한 계정의 nonce를 로컬에서 증가시키며 AsyncWeb3로 트랜잭션을 연속 전송
+
+    수수료와 가스 한도는 TransactionPipeline과 같은 FeeStrategy/GasEstimator로 정한다.
+    """
+
+    def __init__(self, web3, account_address, private_key):
+        self.web3 = web3
+        self.account_address = account_address
+        self.private_key = private_key
+        self.fees = FeeStrategy.from_env(web3)
+        self._nonce = None
+
+    async def send(self, label, tx_callable, gas=None):
+        if self._nonce is None:
+            self._nonce = await self.web3.eth.get_transaction_count(
+                self.account_address, "pending"
+            )
+        tx_params = {"from": self.account_address}
+        tx_params["gas"] = gas or await gas_estimator.gas_limit_async(tx_callable, tx_params)
+        tx_params.update(await self.fees.fee_params_async())
+        tx_params["nonce"] = self._nonce
+        self._nonce += 1
+        if self.private_key:
+            tx = await tx_callable.build_transaction(tx_params)
+            signed_tx = self.web3.eth.account.sign_transaction(tx, self.private_key)
+            tx_hash = await self.web3.eth.send_raw_transaction(signed_tx.raw_transaction)
+        else:
+            tx_hash = await tx_callable.transact(tx_params)
+        logger.info(f"트랜잭션 전송: {label} (nonce={tx_params['nonce']})")
+        return label, tx_hash
+
+    async def wait_all(self, sent):
+        """전송한 트랜잭션의 영수증을 동시에 기다리고, 하나라도 실패하면 예외 발생"""
+        receipts = await asyncio.gather(
+            *(
+                self.web3.eth.wait_for_transaction_receipt(tx_hash, poll_latency=0.1)
+                for _, tx_hash in sent
+            )
+        )
+        for (label, tx_hash), receipt in zip(sent, receipts):
+            if receipt.status != 1:
+                raise RuntimeError(f"{label} 실패 (트랜잭션 해시: {tx_hash.hex()})")
+            logger.info(f"{label} 성공 (트랜잭션 해시: {tx_hash.hex()})")
+        return receipts
+
+
+async def deploy_contracts(web3, artifacts, abi_digest, account_address, private_key):
+    """한 노드에 두 컨트랙트를 동시에 배포하고, 두 영수증이 도착하면 바로 레지스트리에 등록"""
+    registry_artifact, update_artifact = artifacts
+    registry_abi = registry_artifact["abi"]
+    sender = AsyncSender(web3, account_address, private_key)
+    registry_factory = web3.eth.contract(abi=registry_abi, bytecode=registry_artifact["bin"])
+    update_factory = web3.eth.contract(abi=update_artifact["abi"], bytecode=update_artifact["bin"])
+    deploys = [
+        await sender.send("AddressRegistry 배포", registry_factory.constructor()),
+        await sender.send("SoftwareUpdateContract 배포", update_factory.constructor()),
+    ]
+    registry_receipt, update_receipt = await sender.wait_all(deploys)
+    registry_address = registry_receipt.contractAddress
+    update_address = update_receipt.contractAddress
+
+    registry = web3.eth.contract(address=registry_address, abi=registry_abi)
+    registrations = [
+        await sender.send(
+            "setAbiHash",
+            registry.functions.setAbiHash("SoftwareUpdateContract", abi_digest),
+        ),
+        await sender.send(
+            "setContractAddress",
+            registry.functions.setContractAddress("SoftwareUpdateContract", update_address),
+        ),
+    ]
+    await sender.wait_all(registrations)
+    return registry_address, update_address
+
+
+def _abis(artifacts):
+    registry_artifact, update_artifact = artifacts
+    return {"AddressRegistry": registry_artifact["abi"], "SoftwareUpdateContract": update_artifact["abi"]}
+
+
+async def deploy_all(web3_provider, account_address, private_key, manifest_path=None):
+    """단일 노드 배포: 노드 준비 대기와 컴파일을 겹치고, 서비스별 주소 파일과 매니페스트를 기록"""
+    started = time.perf_counter()
+    web3 = AsyncWeb3(AsyncHTTPProvider(web3_provider))
+
+    # 노드 준비 대기와 컴파일을 동시에 진행
+    chain_id, artifacts = await asyncio.gather(wait_for_node(web3), compile_contracts())
+    abis = _abis(artifacts)
+    abi_digest = AbiStore().put(abis["SoftwareUpdateContract"])
+    registry_address, update_address = await deploy_contracts(
+        web3, artifacts, abi_digest, account_address, private_key
+    )
+
+    # 산출물 키와 런타임 코드 해시를 함께 저장해 서비스별 배포 스크립트가 재배포하지 않게 함
+    registry_artifact, update_artifact = artifacts
+    save_deployment(
+        os.path.join(REGISTRY_DIR, "registry_address.json"),
+        registry_address,
+        abis["AddressRegistry"],
+        registry_artifact,
+    )
+    save_deployment(
+        os.path.join(UPDATE_DIR, "contract_address.json"),
+        update_address,
+        abis["SoftwareUpdateContract"],
+        update_artifact,
+    )
+    result = {
+        "endpoint": web3_provider,
+        "chain_id": chain_id,
+        "status": "ok",
+        "registry_address": registry_address,
+        "update_address": update_address,
+        "seconds": time.perf_counter() - started,
+        "error": None,
+    }
+    record_deployments(manifest_path or DEFAULT_MANIFEST, [result], abis)
+    logger.info(
+        f"전체 배포 완료 ({result['seconds']:.2f}초): chain id {chain_id}, "
+        f"레지스트리 {registry_address}, 업데이트 컨트랙트 {update_address}"
+    )
+    return result
+
+
+async def deploy_target(endpoint, artifacts, abi_digest, account_address, private_key, semaphore):
+    """한 대상 노드에 배포하고 결과를 반환 (실패해도 예외 대신 status="failed")"""
+    result = {
+        "endpoint": endpoint,
+        "chain_id": None,
+        "status": "failed",
+        "registry_address": None,
+        "update_address": None,
+        "seconds": 0.0,
+        "error": None,
+    }
+    async with semaphore:
+        started = time.perf_counter()
+        try:
+            web3 = AsyncWeb3(AsyncHTTPProvider(endpoint))
+            result["chain_id"] = await wait_for_node(web3)
+            result["registry_address"], result["update_address"] = await deploy_contracts(
+                web3, artifacts, abi_digest, account_address, private_key
+            )
+            result["status"] = "ok"
+        except Exception as e:
+            logger.error(f"{endpoint} 배포 실패: {e}")
+            result["error"] = str(e)
+        result["seconds"] = time.perf_counter() - started
+    return result
+
+
+async def deploy_many(endpoints, account_address, private_key, workers=None, manifest_path=None):
+    """여러 노드에 한 번 컴파일한 산출물을 동시에 배포하고 chain id별 매니페스트와 요약 표를 출력
+
+    대상별 작업은 노드 응답을 기다리는 시간이 대부분이므로 workers개까지 동시에 진행하면
+    전체 소요 시간이 가장 느린 대상 하나와 비슷해진다.
+    """
+    started = time.perf_counter()
+    artifacts = await compile_contracts()
+    abis = _abis(artifacts)
+    abi_digest = AbiStore().put(abis["SoftwareUpdateContract"])
+    semaphore = asyncio.Semaphore(workers or min(len(endpoints), DEFAULT_WORKERS))
+    results = await asyncio.gather(
+        *(
+            deploy_target(endpoint, artifacts, abi_digest, account_address, private_key, semaphore)
+            for endpoint in endpoints
+        )
+    )
+    record_deployments(manifest_path or DEFAULT_MANIFEST, results, abis)
+    print(format_summary(results))
+    failed = sum(1 for r in results if r["status"] != "ok")
+    logger.info(
+        f"{len(endpoints)}개 대상 배포 완료 ({time.perf_counter() - started:.2f}초), 실패 {failed}개"
+    )
+    return results
+
+
+def parse_targets(value):
+    """쉼표/공백으로 구분한 엔드포인트 목록 (중복 제거, 순서 유지)"""
+    targets = []
+    for item in (value or "").replace(",", " ").split():
+        if item not in targets:
+            targets.append(item)
+    return targets
+
+
+def main():
+    parser = argparse.ArgumentParser(description="레지스트리/업데이트 컨트랙트 배포")
+    parser.add_argument(
+        "--targets",
+        help="여러 노드에 동시에 배포할 엔드포인트 목록 (쉼표 구분, 기본값 WEB3_PROVIDERS, 없으면 WEB3_PROVIDER 하나)",
+    )
+    parser.add_argument("--workers", type=int, default=None, help="동시에 배포할 대상 수")
+    parser.add_argument("--manifest", help="chain id별 주소 매니페스트 (기본값 DEPLOY_MANIFEST)")
+    args = parser.parse_args()
+    try:
+        web3_provider, private_key, account_address = load_env()
+        logger.info(f"사용할 계정 주소: {account_address}")
+        targets = parse_targets(args.targets or os.getenv("WEB3_PROVIDERS"))
+        manifest_path = args.manifest or os.getenv("DEPLOY_MANIFEST", DEFAULT_MANIFEST)
+        if not targets:
+            asyncio.run(deploy_all(web3_provider, account_address, private_key, manifest_path))
+            return
+        results = asyncio.run(
+            deploy_many(targets, account_address, private_key, args.workers, manifest_path)
+        )
+        if any(r["status"] != "ok" for r in results):
+            exit(1)
+    except Exception as e:
+        logger.error(f"오류 발생: {e}")
+        exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import threading
+from dotenv import load_dotenv
+from flask import Flask, Response, abort, jsonify, request
+from web3 import Web3
+
+# 공용 모듈 경로 추가 (컨테이너: /app/common, 저장소: ../common)
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for _root in (BASE_DIR, os.path.dirname(BASE_DIR)):
+    if os.path.isdir(os.path.join(_root, "common")) and _root not in sys.path:
+        sys.path.insert(0, _root)
+
+from common.catalogue_cache import DEFAULT_OWNER_VIEWS, CatalogueCache  # noqa: E402
+from common.device_sync import DeviceSyncClient  # noqa: E402
+from common.metrics import metrics  # noqa: E402
+from common.providers import get_web3  # noqa: E402
+
+# 로깅 설정
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# .env 파일 로드
+load_dotenv()
+
+# 기기는 매번 ETag로 재검증하므로 중간 캐시가 오래된 본문을 그대로 돌려주지 않게 함
+CACHE_CONTROL = "no-cache"
+
+
+def contract_file():
+    """컨테이너에 마운트된 contract_address.json, 없으면 저장소의 update_service 파일"""
+    path = os.getenv("CONTRACT_ADDRESS_FILE")
+    if path:
+        return path
+    for candidate in (
+        os.path.join(BASE_DIR, "contract_address.json"),
+        os.path.join(os.path.dirname(BASE_DIR), "update_service", "contract_address.json"),
+    ):
+        if os.path.exists(candidate):
+            return candidate
+    raise FileNotFoundError("contract_address.json을 찾을 수 없습니다. CONTRACT_ADDRESS_FILE을 지정하세요.")
+
+
+def _conditional(view):
+    """캐시된 본문을 ETag와 함께 반환하고, If-None-Match가 일치하면 본문 없이 304 반환"""
+    response = Response(view.body, mimetype="application/json")
+    response.set_etag(view.etag)
+    response.headers["Cache-Control"] = CACHE_CONTROL
+    response = response.make_conditional(request)
+    metrics.inc("gateway_responses_total", endpoint=request.endpoint, status=response.status_code)
+    return response
+
+
+def create_app(cache, ready=None):
+    """cache(CatalogueCache)의 보기만 읽는 읽기 전용 게이트웨이 앱
+
+    ready는 첫 동기화가 끝나면 설정되는 threading.Event이며, 그 전에는 /healthz가 503을
+    반환해 로드 밸런서가 빈 카탈로그를 제공하는 워커로 요청을 보내지 않게 한다.
+    """
+    app = Flask(__name__)
+    ready = ready or threading.Event()
+
+    @app.get("/healthz")
+    def healthz():
+        body = {"ready": ready.is_set(), "block": cache.block_number, "updates": len(cache)}
+        return jsonify(body), 200 if ready.is_set() else 503
+
+    @app.get("/updates")
+    def catalogue():
+        return _conditional(cache.catalogue_view())
+
+    @app.get("/updates/<path:uid>")
+    def update(uid):
+        view = cache.update_view(uid)
+        if view is None:
+            abort(404)
+        return _conditional(view)
+
+    @app.get("/owners/<owner>/available")
+    def available(owner):
+        if not Web3.is_address(owner):
+            abort(400, description=f"잘못된 주소입니다: {owner}")
+        return _conditional(cache.owner_view(Web3.to_checksum_address(owner)))
+
+    return app
+
+
+def start_sync(client, poll_interval, ready):
+    """첫 동기화를 마치면 ready를 설정하고 이후 poll_interval마다 따라가는 데몬 스레드 시작"""
+
+    def loop():
+        while not ready.is_set():
+            try:
+                client.sync_once()
+                ready.set()
+            except Exception as e:
+                logger.warning(f"초기 동기화 실패, 다시 시도합니다: {e}")
+                metrics.inc("retries_total", operation="gateway_sync")
+                time.sleep(poll_interval)
+        client.run(poll_interval=poll_interval)
+
+    thread = threading.Thread(target=loop, name="catalogue-sync", daemon=True)
+    thread.start()
+    return thread
+
+
+def create_app_from_env():
+    """환경 변수로 노드/컨트랙트에 연결해 동기화 스레드와 앱을 만듦 (gunicorn 워커마다 호출)
+
+    워커 프로세스마다 자기 캐시를 채우므로 읽기 처리량은 워커 수에 비례하고, 노드에는
+    워커당 eth_getLogs 폴링과 새 업데이트의 getUpdateInfoBatch 호출만 간다.
+    """
+    web3_provider = os.getenv("WEB3_PROVIDER", "http://ganache:8545")
+    web3 = get_web3(web3_provider)
+    if not web3.is_connected():
+        raise ConnectionError(f"Web3 제공자에 연결할 수 없습니다: {web3_provider}")
+
+    with open(contract_file()) as f:
+        contract_data = json.load(f)
+    contract = web3.eth.contract(
+        address=contract_data["address"], abi=contract_data["abi"]
+    )
+
+    cache = CatalogueCache(int(os.getenv("GATEWAY_OWNER_VIEWS", DEFAULT_OWNER_VIEWS)))
+    client = DeviceSyncClient(
+        web3,
+        contract,
+        cache,
+        start_block=int(os.getenv("GATEWAY_START_BLOCK", "0")),
+        confirmations=int(os.getenv("GATEWAY_CONFIRMATIONS", "0")),
+    )
+    ready = threading.Event()
+    start_sync(client, float(os.getenv("GATEWAY_POLL_INTERVAL", "2.0")), ready)
+    logger.info(f"카탈로그 게이트웨이 시작: {contract.address}")
+    return create_app(cache, ready)
+
+
+def main():
+    """개발용 단일 프로세스 실행 (운영은 gunicorn "gateway.app:create_app_from_env()")"""
+    parser = argparse.ArgumentParser(description="업데이트 카탈로그 읽기 전용 게이트웨이")
+    parser.add_argument("--host", default="0.0.0.0", help="수신 주소")
+    parser.add_argument("--port", type=int, default=int(os.getenv("GATEWAY_PORT", "8000")), help="수신 포트")
+    args = parser.parse_args()
+    create_app_from_env().run(host=args.host, port=args.port, threaded=True)
+
+
+if __name__ == "__main__":
+    main()
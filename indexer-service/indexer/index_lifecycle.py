@@ -0,0 +1,79 @@
+import os
+import sys
+import json
+import logging
+import argparse
+from dotenv import load_dotenv
+
+# 공용 모듈 경로 추가 (컨테이너: /app/common, 저장소: ../common)
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for _root in (BASE_DIR, os.path.dirname(BASE_DIR)):
+    if os.path.isdir(os.path.join(_root, "common")) and _root not in sys.path:
+        sys.path.insert(0, _root)
+
+from common.lifecycle_index import LifecycleIndexer, LifecycleStore  # noqa: E402
+from common.providers import get_web3  # noqa: E402
+
+# 로깅 설정
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# .env 파일 로드
+load_dotenv()
+
+
+def contract_file():
+    """컨테이너에 마운트된 contract_address.json, 없으면 저장소의 update_service 파일"""
+    path = os.getenv("CONTRACT_ADDRESS_FILE")
+    if path:
+        return path
+    for candidate in (
+        os.path.join(BASE_DIR, "contract_address.json"),
+        os.path.join(os.path.dirname(BASE_DIR), "update_service", "contract_address.json"),
+    ):
+        if os.path.exists(candidate):
+            return candidate
+    raise FileNotFoundError("contract_address.json을 찾을 수 없습니다. CONTRACT_ADDRESS_FILE을 지정하세요.")
+
+
+def main():
+    """SoftwareUpdateContract의 수명 주기 이벤트를 SQLite 색인으로 계속 동기화"""
+    parser = argparse.ArgumentParser(description="업데이트 수명 주기 이벤트 색인")
+    parser.add_argument("--db", default=os.getenv("LIFECYCLE_INDEX_DB"), help="SQLite 파일 경로")
+    parser.add_argument("--once", action="store_true", help="한 번만 색인하고 종료")
+    parser.add_argument("--interval", type=float, default=2.0, help="색인 주기(초)")
+    parser.add_argument("--confirmations", type=int, default=0, help="확정으로 보는 블록 수")
+    parser.add_argument("--start-block", type=int, default=0, help="처음 색인할 블록 (컨트랙트 배포 블록)")
+    args = parser.parse_args()
+
+    web3_provider = os.getenv("WEB3_PROVIDER", "http://ganache:8545")
+    web3 = get_web3(web3_provider)
+    if not web3.is_connected():
+        raise ConnectionError(f"Web3 제공자에 연결할 수 없습니다: {web3_provider}")
+
+    with open(contract_file()) as f:
+        contract_data = json.load(f)
+    contract = web3.eth.contract(
+        address=contract_data["address"], abi=contract_data["abi"]
+    )
+
+    store = LifecycleStore(args.db)
+    indexer = LifecycleIndexer(
+        web3,
+        contract,
+        store,
+        start_block=args.start_block,
+        confirmations=args.confirmations,
+    )
+    logger.info(f"수명 주기 색인 시작: {contract.address} → {store.path}")
+    if args.once:
+        indexer.sync_once()
+        return
+    try:
+        indexer.run(poll_interval=args.interval)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
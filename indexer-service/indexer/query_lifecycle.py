@@ -0,0 +1,80 @@
+import os
+import sys
+import json
+import argparse
+from dotenv import load_dotenv
+from web3 import Web3
+
+# 공용 모듈 경로 추가 (컨테이너: /app/common, 저장소: ../common)
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for _root in (BASE_DIR, os.path.dirname(BASE_DIR)):
+    if os.path.isdir(os.path.join(_root, "common")) and _root not in sys.path:
+        sys.path.insert(0, _root)
+
+from common.lifecycle_index import LifecycleStore  # noqa: E402
+
+# .env 파일 로드
+load_dotenv()
+
+
+def _address(value):
+    """색인에는 체크섬 주소로 저장되므로 입력한 주소를 체크섬 형식으로 변환"""
+    if not Web3.is_address(value):
+        raise argparse.ArgumentTypeError(f"올바른 주소가 아닙니다: {value}")
+    return Web3.to_checksum_address(value)
+
+
+def _seconds(value):
+    return "-" if value is None else f"{value:.0f}s"
+
+
+def print_stats(stats):
+    print(
+        f"{'uid':<32} {'purchases':>9} {'installs':>8} {'refunds':>7} {'rate':>6} "
+        f"{'avg install':>11} {'escrow (wei)':>16}"
+    )
+    for s in stats:
+        rate = "-" if s["install_rate"] is None else f"{s['install_rate']:.0%}"
+        uid = s["uid"] + (" (취소)" if s["cancelled"] else "")
+        print(
+            f"{uid:<32} {s['purchases']:>9} {s['installs']:>8} {s['refunds']:>7} {rate:>6} "
+            f"{_seconds(s['avg_install_seconds']):>11} {s['escrow_outstanding_wei']:>16}"
+        )
+
+
+def main():
+    """색인된 SQLite에서 설치율, 구매→설치 시간, 에스크로 잔액 등을 조회 (노드 호출 없음)"""
+    parser = argparse.ArgumentParser(description="업데이트 수명 주기 집계 조회")
+    parser.add_argument("--db", default=os.getenv("LIFECYCLE_INDEX_DB"), help="SQLite 파일 경로")
+    parser.add_argument("--json", action="store_true", help="JSON으로 출력")
+    commands = parser.add_subparsers(dest="command", required=True)
+    stats_parser = commands.add_parser("stats", help="업데이트별 구매/설치/환불 집계")
+    stats_parser.add_argument("--uid", help="특정 업데이트만 조회")
+    commands.add_parser("escrow", help="전체 에스크로 잔액")
+    owner_parser = commands.add_parser("owner", help="계정의 구매별 수명 주기")
+    owner_parser.add_argument("address", type=_address)
+    args = parser.parse_args()
+
+    store = LifecycleStore(args.db)
+    if args.command == "stats":
+        result = store.update_stats(args.uid)
+    elif args.command == "escrow":
+        result = {"escrow_outstanding_wei": store.escrow_outstanding()}
+    else:
+        result = store.owner_history(args.address)
+    store.close()
+
+    if args.json:
+        print(json.dumps(result, indent=2, ensure_ascii=False))
+    elif args.command == "stats":
+        print_stats(result)
+    elif args.command == "escrow":
+        print(f"에스크로 잔액: {result['escrow_outstanding_wei']} wei")
+    else:
+        for item in result:
+            status = "설치" if item["install_block"] else "환불" if item["refund_block"] else "대기"
+            print(f"{item['uid']:<32} 구매 블록 {item['purchase_block']:<8} {status}")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,9 +8,16 @@ pragma solidity ^0.8.17;
 contract AddressRegistry {
     address public admin;
     mapping(string => address) public contracts;
-    mapping(string => string) public abis;
+
+    // ABI 본문은 오프체인 저장소에 두고, 체인에는 다이제스트와 버전만 기록
+    struct AbiRecord {
+        bytes32 digest;   // keccak256(정규화된 ABI JSON)
+        uint64 version;   // 다이제스트가 바뀔 때마다 1씩 증가
+    }
+    mapping(string => AbiRecord) public abiRecords;
     
     event ContractAddressUpdated(string name, address indexed addr, uint256 timestamp);
+    event AbiUpdated(string name, bytes32 digest, uint64 version);
     
     constructor() {
         admin = msg.sender;
@@ -44,22 +51,30 @@ contract AddressRegistry {
     }
 
     /**
-     * @dev 컨트랙트 ABI를 등록하거나 업데이트합니다
+     * @dev 컨트랙트 ABI 다이제스트를 등록하거나 업데이트합니다
      * @param name 컨트랙트 이름 (예: "SoftwareUpdateContract")
-     * @param abiJson ABI JSON 문자열
+     * @param digest 정규화된 ABI JSON의 keccak256 해시
      */
-    function setAbi(string memory name, string memory abiJson) public onlyAdmin {
-        abis[name] = abiJson;
+    function setAbiHash(string memory name, bytes32 digest) public onlyAdmin {
+        require(digest != bytes32(0), "Invalid ABI digest");
+        AbiRecord storage record = abiRecords[name];
+        if (record.digest == digest) {
+            return;
+        }
+        record.digest = digest;
+        record.version += 1;
+        emit AbiUpdated(name, digest, record.version);
     }
 
     /**
-     * @dev 컨트랙트 ABI를 조회합니다
+     * @dev 컨트랙트 ABI 다이제스트와 버전을 조회합니다
      * @param name 컨트랙트 이름
-     * @return ABI JSON 문자열
+     * @return digest ABI 다이제스트
+     * @return version ABI 버전
      */
-    function getAbi(string memory name) public view returns (string memory) {
-        string memory abiJson = abis[name];
-        require(bytes(abiJson).length != 0, "ABI not found");
-        return abiJson;
+    function getAbiHash(string memory name) public view returns (bytes32 digest, uint64 version) {
+        AbiRecord storage record = abiRecords[name];
+        require(record.digest != bytes32(0), "ABI not found");
+        return (record.digest, record.version);
     }
 }
\ No newline at end of file
@@ -1,11 +1,21 @@
 import os
-import json
+import sys
 import logging
 import time
-from web3 import Web3
-from solcx import compile_source, set_solc_version
 from dotenv import load_dotenv
 
+# 공용 모듈 경로 추가 (컨테이너: /app/common, 저장소: ../common)
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for _root in (BASE_DIR, os.path.dirname(BASE_DIR)):
+    if os.path.isdir(os.path.join(_root, "common")) and _root not in sys.path:
+        sys.path.insert(0, _root)
+
+from common.compile_cache import compile_artifact, source_artifact_key  # noqa: E402
+from common.deploy_state import reusable_deployment, save_deployment  # noqa: E402
+from common.metrics import metrics  # noqa: E402
+from common.providers import get_web3  # noqa: E402
+from common.tx_pipeline import TransactionPipeline, log_results  # noqa: E402
+
 # 로깅 설정
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -30,43 +40,34 @@ def load_env():
     return web3_provider, private_key, account_address
 
 
-def wait_for_web3_connection(web3_provider, max_retries=20, wait_sec=3):
+def wait_for_web3_connection(web3_provider, max_retries=20, initial_delay=0.1, max_delay=3):
     logger.info(f"외부 블록체인 서버에 연결 시도 중: {web3_provider}")
-    retries = 0
-    while retries < max_retries:
+    # 재시도마다 새 Web3 인스턴스를 만들지 않고, 대기 시간은 지수적으로 늘림
+    web3 = get_web3(web3_provider)
+    delay = initial_delay
+    for retries in range(max_retries):
         try:
-            web3 = Web3(Web3.HTTPProvider(web3_provider))
             if web3.is_connected():
                 logger.info("Web3 연결 성공!")
                 return web3
-            else:
-                logger.warning(
-                    f"Web3 연결 실패, {retries+1}/{max_retries} 재시도 중..."
-                )
+            logger.warning(f"Web3 연결 실패, {retries+1}/{max_retries} 재시도 중...")
         except Exception as e:
             logger.warning(
                 f"Web3 연결 중 오류 발생: {e}, {retries+1}/{max_retries} 재시도 중..."
             )
-        retries += 1
-        time.sleep(wait_sec)
+        metrics.inc("retries_total", operation="connect")
+        time.sleep(delay)
+        delay = min(delay * 2, max_delay)
     raise ConnectionError(
         f"{max_retries}번 시도 후 Web3 제공자에 연결할 수 없습니다: {web3_provider}"
     )
 
 
 def compile_contract(contract_path, solc_version="0.8.17"):
+    # 소스/컴파일러/옵티마이저 설정이 같으면 solc를 실행하지 않고 캐시된 산출물을 사용
     try:
-        set_solc_version(solc_version)
-        logger.info(f"Solidity 컴파일러 버전 설정 완료: {solc_version}")
-    except Exception as e:
-        logger.error(f"Solidity 컴파일러 버전 설정 실패: {e}")
-        raise
-    with open(contract_path, "r") as file:
-        contract_source = file.read()
-    try:
-        compiled_sol = compile_source(
-            contract_source,
-            output_values=["abi", "bin"],
+        artifact = compile_artifact(
+            contract_path,
             solc_version=solc_version,
             optimize=True,
             optimize_runs=200,
@@ -75,66 +76,60 @@ def compile_contract(contract_path, solc_version="0.8.17"):
     except Exception as e:
         logger.error(f"컨트랙트 컴파일 실패: {e}")
         raise
-    contract_id = list(compiled_sol.keys())[0]
-    contract_interface = compiled_sol[contract_id]
-    return contract_interface["abi"], contract_interface["bin"]
+    return artifact
 
 
 def deploy_contract(web3, abi, bytecode, account_address, private_key):
     AddressRegistry = web3.eth.contract(abi=abi, bytecode=bytecode)
     web3.eth.default_account = account_address
-    if private_key:
-        tx_params = {
-            "from": account_address,
-            "gas": 3000000,
-            "gasPrice": web3.to_wei("50", "gwei"),
-            "nonce": web3.eth.get_transaction_count(account_address),
-        }
-        tx = AddressRegistry.constructor().build_transaction(tx_params)
-        signed_tx = web3.eth.account.sign_transaction(tx, private_key)
-        tx_hash = web3.eth.send_raw_transaction(signed_tx.raw_transaction)
-    else:
-        tx_hash = AddressRegistry.constructor().transact(
-            {
-                "from": account_address,
-                "gas": 3000000,
-                "gasPrice": web3.to_wei("50", "gwei"),
-            }
-        )
-    tx_receipt = web3.eth.wait_for_transaction_receipt(tx_hash)
-    contract_address = tx_receipt.contractAddress
+    pipeline = TransactionPipeline(web3, account_address, private_key)
+    # 가스 한도는 eth_estimateGas + 여유분, 수수료는 eth_feeHistory 기반 (common/fees.py)
+    pipeline.submit("deploy", AddressRegistry.constructor())
+    results = pipeline.wait_all()
+    if not log_results(results):
+        raise RuntimeError("레지스트리 컨트랙트 배포 트랜잭션 실패")
+    contract_address = results[0]["receipt"].contractAddress
     logger.info(f"레지스트리 컨트랙트 배포 성공! 주소: {contract_address}")
     return contract_address
 
 
-def save_registry_info(contract_address, abi, output_path):
-    registry_data = {"address": contract_address, "abi": abi}
-    with open(output_path, "w") as f:
-        f.write(json.dumps(registry_data))
-    logger.info(f"레지스트리 컨트랙트 정보가 {output_path}에 저장되었습니다.")
+def save_registry_info(contract_address, artifact, output_path):
+    # 다음 재시작 때 eth_getCode와 비교할 수 있도록 산출물 키와 런타임 코드 해시도 함께 저장
+    save_deployment(output_path, contract_address, artifact["abi"], artifact)
 
 
 def main():
-    logger.info("서비스 시작... 5초 후 레지스트리 컨트랙트 배포를 시작합니다.")
-    time.sleep(5)
+    logger.info("서비스 시작... 레지스트리 컨트랙트 배포를 시작합니다.")
     try:
         web3_provider, private_key, account_address = load_env()
-        web3 = wait_for_web3_connection(web3_provider)
+        with metrics.span("phase", phase="connect"):
+            web3 = wait_for_web3_connection(web3_provider)
         logger.info(f"사용할 계정 주소: {account_address}")
         contract_path = os.path.join(
             os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
             "contracts",
             "AddressRegistry.sol",
         )
-        abi, bytecode = compile_contract(contract_path)
-        contract_address = deploy_contract(
-            web3, abi, bytecode, account_address, private_key
-        )
         registry_info_path = os.path.join(
             os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
             "registry_address.json",
         )
-        save_registry_info(contract_address, abi, registry_info_path)
+        # ganache_data 볼륨으로 체인이 유지된 재시작이면 컴파일/배포 없이 기존 컨트랙트를 사용
+        with metrics.span("phase", phase="reuse_check"):
+            existing = reusable_deployment(
+                web3, registry_info_path, source_artifact_key(contract_path)
+            )
+        if existing is not None:
+            metrics.inc("deploy_reused_total", contract="AddressRegistry")
+            logger.info(f"배포된 레지스트리 컨트랙트를 재사용합니다. 주소: {existing['address']}")
+            return
+        with metrics.span("phase", phase="compile"):
+            artifact = compile_contract(contract_path)
+        with metrics.span("phase", phase="deploy"):
+            contract_address = deploy_contract(
+                web3, artifact["abi"], artifact["bin"], account_address, private_key
+            )
+        save_registry_info(contract_address, artifact, registry_info_path)
         logger.info(f"레지스트리 컨트랙트 배포 완료. 주소: {contract_address}")
         logger.info("모든 작업이 완료되었습니다. 서비스를 종료합니다.")
     except Exception as e:
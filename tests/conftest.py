@@ -0,0 +1,235 @@
+import os
+import sys
+import pytest
+from eth_abi import encode
+from eth_utils import event_abi_to_log_topic, keccak
+from web3 import Web3, EthereumTesterProvider
+
+# 공용 모듈 경로 추가 (컨테이너: /app/common, 저장소: ../common)
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+for _root in (TESTS_DIR, os.path.dirname(TESTS_DIR)):
+    if os.path.isdir(os.path.join(_root, "common")) and _root not in sys.path:
+        sys.path.insert(0, _root)
+
+from common.catalogue import UpdateRecord  # noqa: E402
+from common.compile_cache import DEFAULT_SOLC_VERSION, compile_contract_cached  # noqa: E402
+from common.update_codec import decode_ipfs_hash  # noqa: E402
+from solcx import get_installed_solc_versions  # noqa: E402
+
+# ganache --deterministic 첫 번째 계정의 비밀키 (외부 노드 사용 시 제조사/관리자)
+GANACHE_DEPLOYER_KEY = "0xac0974bec39a17e36ba4a6b4d238ff944bacb478cbed5efcae784d7bf4f2ff80"
+FAKE_CONTRACT = "0x5FbDB2315678afecb367f032d93F642f64180aa3"
+
+
+def _find_contract(service, filename):
+    """저장소(../<service>)와 테스트 컨테이너(/<service>) 양쪽에서 컨트랙트 소스 탐색"""
+    for root in (os.path.dirname(TESTS_DIR), "/"):
+        path = os.path.join(root, service, "contracts", filename)
+        if os.path.exists(path):
+            return path
+    pytest.skip(f"컨트랙트 소스를 찾을 수 없습니다: {service}/contracts/{filename}")
+
+
+def _compile(service, filename):
+    return _compile_path(_find_contract(service, filename))
+
+
+def _compile_path(path):
+    try:
+        return compile_contract_cached(path)
+    except Exception as e:
+        # 캐시가 비어 있고 solc도 설치할 수 없는 환경(오프라인 등)에서만 건너뜀
+        installed = {str(v) for v in get_installed_solc_versions()}
+        if DEFAULT_SOLC_VERSION not in installed:
+            pytest.skip(f"solc {DEFAULT_SOLC_VERSION}를 사용할 수 없습니다: {e}")
+        raise
+
+
+class Chain:
+    """세션 동안 한 번 배포한 컨트랙트와, 테스트별 스냅샷/복원을 제공하는 테스트 체인
+
+    TEST_WEB3_PROVIDER가 없으면 in-process EVM(eth-tester/py-evm), 있으면 해당
+    ganache/anvil 노드에 연결하고 evm_snapshot/evm_revert로 상태를 되돌린다.
+    """
+
+    def __init__(self, provider_url=None):
+        if provider_url:
+            self.web3 = Web3(Web3.HTTPProvider(provider_url))
+            self.tester = None
+            self.manufacturer_key = os.getenv("TEST_MANUFACTURER_KEY", GANACHE_DEPLOYER_KEY)
+        else:
+            provider = EthereumTesterProvider()
+            self.web3 = Web3(provider)
+            self.tester = provider.ethereum_tester
+            self.manufacturer_key = self.tester.backend.account_keys[0].to_hex()
+        self.deployer = self.web3.eth.accounts[0]
+
+    def snapshot(self):
+        if self.tester is not None:
+            return self.tester.take_snapshot()
+        return self.web3.provider.make_request("evm_snapshot", [])["result"]
+
+    def revert(self, snapshot_id):
+        if self.tester is not None:
+            self.tester.revert_to_snapshot(snapshot_id)
+        else:
+            self.web3.provider.make_request("evm_revert", [snapshot_id])
+
+    def deploy(self, abi, bytecode):
+        factory = self.web3.eth.contract(abi=abi, bytecode=bytecode)
+        tx_hash = factory.constructor().transact({"from": self.deployer})
+        receipt = self.web3.eth.wait_for_transaction_receipt(tx_hash)
+        return self.web3.eth.contract(address=receipt.contractAddress, abi=abi)
+
+
+@pytest.fixture(scope="session")
+def chain():
+    provider_url = os.getenv("TEST_WEB3_PROVIDER")
+    if provider_url and int(os.getenv("PYTEST_XDIST_WORKER_COUNT", "1")) > 1:
+        # 외부 노드는 워커들이 한 체인을 공유하므로 스냅샷 복원이 서로의 상태를 지움
+        pytest.fail("TEST_WEB3_PROVIDER 사용 시에는 -n 없이 실행해야 합니다.")
+    return Chain(provider_url)
+
+
+@pytest.fixture(scope="session")
+def deployed(chain):
+    """두 컨트랙트를 세션당 한 번만 컴파일(캐시)/배포하고 그 직후 상태를 스냅샷으로 보관"""
+    registry = chain.deploy(*_compile("registry-service", "AddressRegistry.sol"))
+    update = chain.deploy(*_compile("update_service", "SoftwareUpdateContract.sol"))
+    return {"registry": registry, "update": update}
+
+
+@pytest.fixture(scope="session")
+def compile_contract():
+    """테스트 전용 컨트랙트 소스를 (캐시) 컴파일해 (abi, bytecode) 반환하는 함수"""
+    return _compile_path
+
+
+@pytest.fixture
+def w3(chain, deployed):
+    """테스트마다 배포 직후 상태에서 시작하도록 스냅샷을 찍고 끝나면 복원"""
+    snapshot_id = chain.snapshot()
+    yield chain.web3
+    chain.revert(snapshot_id)
+
+
+@pytest.fixture
+def registry_contract(w3, deployed):
+    return deployed["registry"]
+
+
+@pytest.fixture
+def update_contract(w3, deployed):
+    return deployed["update"]
+
+
+@pytest.fixture(scope="session")
+def manufacturer_key(chain):
+    return chain.manufacturer_key
+
+
+def _event(name, inputs):
+    return {
+        "type": "event",
+        "name": name,
+        "anonymous": False,
+        "inputs": [{"name": n, "type": t, "indexed": False} for n, t in inputs],
+    }
+
+
+# SoftwareUpdateContract의 수명 주기 이벤트 ABI (컴파일 없이 로그를 만들기 위한 사본)
+LIFECYCLE_EVENT_ABI = [
+    _event("UpdateRegistered", [("uid", "string"), ("version", "uint64"), ("description", "string")]),
+    _event("UpdateDelivered", [("owner", "address"), ("uid", "string")]),
+    _event("UpdateInstalled", [("owner", "address"), ("uid", "string"), ("deviceId", "string")]),
+    _event("UpdateRefunded", [("owner", "address"), ("uid", "string"), ("amount", "uint256")]),
+    _event("UpdateCancelled", [("uid", "string")]),
+]
+
+
+class FakeEth:
+    """블록 해시/시각과 로그만 흉내내는 체인 (fork()로 재구성 재현)"""
+
+    def __init__(self, block_time=12):
+        self.blocks = [keccak(b"genesis")]
+        self.block_time = block_time
+        self.mined = 0
+        self.logs = []
+        self.get_logs_calls = []
+        self.get_block_calls = []
+        self.max_range = None
+
+    @property
+    def block_number(self):
+        return len(self.blocks) - 1
+
+    def mine(self, *events):
+        number = len(self.blocks)
+        self.mined += 1
+        self.blocks.append(keccak(f"block-{number}-{self.mined}".encode()))
+        for index, (name, values) in enumerate(events):
+            abi = next(e for e in LIFECYCLE_EVENT_ABI if e["name"] == name)
+            self.logs.append(
+                {
+                    "address": FAKE_CONTRACT,
+                    "topics": [event_abi_to_log_topic(abi)],
+                    "data": encode([i["type"] for i in abi["inputs"]], values),
+                    "blockNumber": number,
+                    "blockHash": self.blocks[number],
+                    "logIndex": index,
+                    "transactionHash": keccak(f"tx-{number}-{index}".encode()),
+                    "transactionIndex": index,
+                }
+            )
+
+    def fork(self, block_number):
+        """block_number 이후 블록과 로그를 버림"""
+        del self.blocks[block_number + 1:]
+        self.logs = [log for log in self.logs if log["blockNumber"] <= block_number]
+
+    def get_block(self, number):
+        self.get_block_calls.append(number)
+        return {"hash": self.blocks[number], "timestamp": 1_700_000_000 + number * self.block_time}
+
+    def get_logs(self, params):
+        start, end = params["fromBlock"], params["toBlock"]
+        self.get_logs_calls.append((start, end))
+        if self.max_range is not None and end - start + 1 > self.max_range:
+            raise ValueError("query returned more than 10000 results")
+        return [log for log in self.logs if start <= log["blockNumber"] <= end]
+
+
+class FakeWeb3:
+    def __init__(self):
+        self.eth = FakeEth()
+        self.to_hex = Web3.to_hex
+
+
+@pytest.fixture
+def fake_web3():
+    return FakeWeb3()
+
+
+class RecordingFetcher:
+    """fetch_updates 대신 쓰는 record_fetcher: 조회한 uid를 fetched에 기록하고 고정된 정보를 반환"""
+
+    def __init__(self):
+        self.fetched = []
+
+    def __call__(self, contract, uids):
+        self.fetched.extend(uids)
+        return [
+            UpdateRecord(uid, decode_ipfs_hash(bytes(32)), b"key", "ab" * 32, 1000, "1.0.0", True)
+            for uid in uids
+        ]
+
+
+@pytest.fixture
+def record_fetcher():
+    return RecordingFetcher()
+
+
+@pytest.fixture
+def event_contract():
+    """수명 주기 이벤트 ABI만 가진 컨트랙트 객체 (FakeEth의 로그를 디코딩)"""
+    return Web3().eth.contract(address=FAKE_CONTRACT, abi=LIFECYCLE_EVENT_ABI)
@@ -0,0 +1,63 @@
+import json
+import pytest
+from common import compile_cache
+
+
+@pytest.fixture
+def contract_file(tmp_path):
+    path = tmp_path / "Sample.sol"
+    path.write_text("pragma solidity ^0.8.17; contract Sample {}")
+    return path
+
+
+@pytest.fixture
+def fake_solc(monkeypatch):
+    # solc 바이너리 없이 호출 횟수만 기록하는 가짜 컴파일러
+    calls = {"compile": 0, "install": 0}
+
+    def fake_compile_source(source, **kwargs):
+        calls["compile"] += 1
+        return {"<stdin>:Sample": {"abi": [{"type": "constructor"}], "bin": "6080", "bin-runtime": "6081"}}
+
+    def fake_install_solc(version):
+        calls["install"] += 1
+
+    monkeypatch.setattr(compile_cache, "compile_source", fake_compile_source)
+    monkeypatch.setattr(compile_cache, "install_solc", fake_install_solc)
+    monkeypatch.setattr(compile_cache, "set_solc_version", lambda version: None)
+    monkeypatch.setattr(compile_cache, "get_installed_solc_versions", lambda: [])
+    return calls
+
+
+def test_cache_hit_skips_solc(contract_file, fake_solc, tmp_path):
+    cache_dir = tmp_path / "cache"
+    first = compile_cache.compile_contract_cached(contract_file, cache_dir=cache_dir)
+    second = compile_cache.compile_contract_cached(contract_file, cache_dir=cache_dir)
+    assert first == second == ([{"type": "constructor"}], "6080")
+    assert fake_solc["compile"] == 1
+    assert fake_solc["install"] == 1
+    # 캐시 파일에는 ABI와 바이트코드, 런타임 바이트코드가 함께 저장되고 키는 컴파일 없이 계산 가능
+    (artifact_path,) = cache_dir.glob("*.json")
+    artifact = json.loads(artifact_path.read_text())
+    assert (artifact["bin"], artifact["bin_runtime"]) == ("6080", "6081")
+    assert artifact["key"] == compile_cache.source_artifact_key(contract_file)
+
+
+def test_cache_key_tracks_source_and_settings(contract_file, fake_solc, tmp_path):
+    cache_dir = tmp_path / "cache"
+    compile_cache.compile_contract_cached(contract_file, cache_dir=cache_dir)
+    compile_cache.compile_contract_cached(
+        contract_file, cache_dir=cache_dir, optimize_runs=1000
+    )
+    contract_file.write_text("pragma solidity ^0.8.17; contract Sample { uint x; }")
+    compile_cache.compile_contract_cached(contract_file, cache_dir=cache_dir)
+    assert fake_solc["compile"] == 3
+    assert len(list(cache_dir.glob("*.json"))) == 3
+
+
+def test_ensure_solc_skips_installed_binary(monkeypatch, fake_solc):
+    monkeypatch.setattr(
+        compile_cache, "get_installed_solc_versions", lambda: ["0.8.17"]
+    )
+    compile_cache.ensure_solc("0.8.17")
+    assert fake_solc["install"] == 0
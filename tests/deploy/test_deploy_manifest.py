@@ -0,0 +1,46 @@
+import json
+from common.deploy_manifest import format_summary, load_manifest, record_deployments
+
+
+def _result(endpoint, chain_id, status="ok", error=None):
+    ok = status == "ok"
+    return {
+        "endpoint": endpoint,
+        "chain_id": chain_id,
+        "status": status,
+        "registry_address": "0x" + "11" * 20 if ok else None,
+        "update_address": "0x" + "22" * 20 if ok else None,
+        "seconds": 0.5,
+        "error": error,
+    }
+
+
+def test_manifest_is_keyed_by_chain_id_and_merged(tmp_path):
+    path = str(tmp_path / "deployments.json")
+    abis = {"AddressRegistry": [], "SoftwareUpdateContract": []}
+    record_deployments(path, [_result("http://rig-a:8545", 1001)], abis)
+    record_deployments(
+        path,
+        [
+            _result("http://rig-b:8545", 1002),
+            # 같은 chain id의 다른 노드는 별도 키로 기록
+            _result("http://rig-c:8545", 1002),
+            _result("http://rig-d:8545", None, status="failed", error="timeout"),
+        ],
+        abis,
+    )
+    with open(path) as f:
+        networks = json.load(f)["networks"]
+    assert sorted(networks) == ["1001", "1002", "1002@http://rig-c:8545"]
+    assert networks["1002"]["endpoint"] == "http://rig-b:8545"
+    assert networks["1001"]["SoftwareUpdateContract"] == "0x" + "22" * 20
+    assert load_manifest(str(tmp_path / "missing.json"))["networks"] == {}
+
+
+def test_summary_table_lists_every_target():
+    table = format_summary(
+        [_result("http://rig-a:8545", 1001), _result("http://rig-b:8545", None, "failed", "x" * 100)]
+    ).splitlines()
+    assert table[0].split()[:3] == ["chain", "id", "endpoint"]
+    assert len(table) == 4
+    assert "ok" in table[2] and "failed: " + "x" * 57 + "..." in table[3]
@@ -0,0 +1,32 @@
+from common.deploy_state import reusable_deployment, runtime_code_hash, save_deployment
+
+# 32바이트 값 1을 반환하는 런타임 코드와, 그 코드를 그대로 배포하는 생성 코드
+RUNTIME = "600160005260206000f3"
+INIT = "69" + RUNTIME + "600052600a6016f3"
+
+
+def _deploy_raw(chain):
+    tx_hash = chain.web3.eth.send_transaction({"from": chain.deployer, "data": "0x" + INIT})
+    return chain.web3.eth.wait_for_transaction_receipt(tx_hash).contractAddress
+
+
+def test_reuses_deployment_only_when_source_and_code_match(chain, tmp_path):
+    web3 = chain.web3
+    path = str(tmp_path / "contract_address.json")
+    address = _deploy_raw(chain)
+    artifact = {"key": "source-v1", "bin_runtime": RUNTIME}
+    saved = save_deployment(path, address, [], artifact)
+    assert saved["code_hash"] == runtime_code_hash(RUNTIME)
+
+    assert reusable_deployment(web3, path, "source-v1")["address"] == address
+    # 소스나 설정이 바뀌면 코드를 조회하지 않고 재배포 대상
+    assert reusable_deployment(web3, path, "source-v2") is None
+    # 체인이 초기화되어 저장된 주소에 코드가 없거나 다른 코드가 있으면 재배포 대상
+    save_deployment(path, "0x" + "12" * 20, [], artifact)
+    assert reusable_deployment(web3, path, "source-v1") is None
+    save_deployment(path, address, [], {"key": "source-v1", "bin_runtime": "00"})
+    assert reusable_deployment(web3, path, "source-v1") is None
+    # 이전 형식(주소/ABI만 있는 파일)이나 없는 파일도 재배포 대상
+    save_deployment(path, address, [])
+    assert reusable_deployment(web3, path, "source-v1") is None
+    assert reusable_deployment(web3, str(tmp_path / "missing.json"), "source-v1") is None
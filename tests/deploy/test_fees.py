@@ -0,0 +1,144 @@
+import threading
+from web3 import Web3, EthereumTesterProvider
+from common.fees import FeeStrategy, GasEstimator, gas_cache_key, suggest_eip1559_fees
+from common.tx_pipeline import TransactionPipeline
+
+GWEI = 10**9
+TINY_BYTECODE = "0x600a600c600039600a6000f3602a60005260206000f3"
+
+
+class FeeEth:
+    def __init__(self, history=None):
+        self.history = history
+        self.fee_history_calls = 0
+        self.gas_price = 7 * GWEI
+
+    def fee_history(self, blocks, newest, percentiles):
+        self.fee_history_calls += 1
+        if self.history is None:
+            raise ValueError("RPC Endpoint has not been implemented: eth_feeHistory")
+        return self.history
+
+
+class FeeWeb3:
+    def __init__(self, history=None):
+        self.eth = FeeEth(history)
+
+
+# 가스 캐시 키 계산용 ABI (setAbiHash는 상태에 따라 일찍 반환하는 함수의 예)
+CALL_ABI = [
+    {"type": "function", "name": name, "inputs": inputs, "outputs": [], "stateMutability": "nonpayable"}
+    for name, inputs in (
+        ("store", [{"name": "data", "type": "bytes"}]),
+        ("other", [{"name": "data", "type": "bytes"}]),
+        ("setAbiHash", [{"name": "name", "type": "string"}, {"name": "digest", "type": "bytes32"}]),
+    )
+]
+
+
+def _call(function, gas, calls):
+    """estimate_gas만 흉내낸 실제 ContractFunction (calldata는 공개 API로 계산됨)"""
+
+    def estimate_gas(params):
+        calls.append(params)
+        return gas
+
+    function.estimate_gas = estimate_gas
+    return function
+
+
+def test_fee_strategy_uses_fee_history_caps_and_falls_back_to_legacy():
+    history = {"baseFeePerGas": [10 * GWEI, 12 * GWEI, 20 * GWEI], "reward": [[1 * GWEI], [3 * GWEI], [2 * GWEI]]}
+    assert suggest_eip1559_fees(history) == {"maxFeePerGas": 42 * GWEI, "maxPriorityFeePerGas": 2 * GWEI}
+    assert suggest_eip1559_fees({"baseFeePerGas": [None]}) is None
+
+    web3 = FeeWeb3(history)
+    fees = FeeStrategy(web3, max_fee=30 * GWEI)
+    assert fees.fee_params() == {"maxFeePerGas": 30 * GWEI, "maxPriorityFeePerGas": 2 * GWEI}
+    # 짧은 시간 안의 연속 전송은 eth_feeHistory를 다시 호출하지 않음
+    fees.fee_params()
+    assert web3.eth.fee_history_calls == 1
+    # 상한 때문에 10% 이상 올릴 수 없으면 교체하지 않음
+    assert fees.bump({"maxFeePerGas": 30 * GWEI, "maxPriorityFeePerGas": 2 * GWEI}) is None
+    assert FeeStrategy(web3).bump({"maxFeePerGas": 40 * GWEI, "maxPriorityFeePerGas": 2 * GWEI}) == {
+        "maxFeePerGas": 45 * GWEI,
+        "maxPriorityFeePerGas": 2250000000,
+    }
+
+    legacy_web3 = FeeWeb3()
+    legacy = FeeStrategy(legacy_web3)
+    assert legacy.fee_params() == {"gasPrice": 7 * GWEI}
+    legacy.cache_seconds = 0
+    legacy.fee_params()
+    # 지원하지 않는 노드에는 eth_feeHistory를 한 번만 시도
+    assert legacy_web3.eth.fee_history_calls == 1
+    assert FeeStrategy(legacy_web3, gas_price=50 * GWEI).fee_params() == {"gasPrice": 50 * GWEI}
+
+
+def test_gas_estimates_are_cached_by_selector_and_size_class():
+    calls = []
+    estimator = GasEstimator(margin=1.5)
+    functions = Web3().eth.contract(abi=CALL_ABI).functions
+    short = _call(functions.store(bytes(64)), 40000, calls)
+    similar = _call(functions.store(bytes(60)), 50000, calls)
+    long = _call(functions.store(bytes(640)), 90000, calls)
+    other = _call(functions.other(bytes(64)), 30000, calls)
+
+    assert gas_cache_key(short) == gas_cache_key(similar) != gas_cache_key(long)
+    assert gas_cache_key(short)[0] == Web3.keccak(text="store(bytes)")[:4].hex()
+    assert estimator.gas_limit(short, {"from": "0x01", "nonce": 3}) == 60000
+    assert estimator.gas_limit(similar, {"from": "0x01"}) == 60000
+    assert estimator.gas_limit(long, {"from": "0x01"}) == 135000
+    assert estimator.gas_limit(other, {"from": "0x01"}) == 45000
+    assert len(calls) == 3
+    # 추정에는 from/value만 전달
+    assert calls[0] == {"from": "0x01"}
+
+    # 배포는 생성 코드와 생성자 인자로 키를 만듦
+    factory = Web3().eth.contract(abi=[], bytecode=TINY_BYTECODE)
+    assert gas_cache_key(factory.constructor())[0].startswith("create:")
+
+
+def test_state_dependent_functions_are_estimated_every_time():
+    calls = []
+    functions = Web3().eth.contract(abi=CALL_ABI).functions
+    digest = bytes(31) + b"\x01"
+    # 같은 다이제스트는 저장 없이 반환하므로 싼 추정치가 먼저 나올 수 있음
+    unchanged = _call(functions.setAbiHash("SoftwareUpdateContract", digest), 25000, calls)
+    changed = _call(functions.setAbiHash("SoftwareUpdateContract", digest[::-1]), 52000, calls)
+    assert gas_cache_key(unchanged) == gas_cache_key(changed)
+
+    # 캐시하면 나중의 실제 쓰기가 싼 경로의 한도를 받음 (문서화한 한계)
+    cached = GasEstimator(margin=1.2, uncached=())
+    assert cached.gas_limit(unchanged, {"from": "0x01"}) == 30000
+    assert cached.gas_limit(changed, {"from": "0x01"}) == 30000 < 52000
+    # 기본 설정은 이런 함수를 매번 추정
+    estimator = GasEstimator(margin=1.2)
+    assert estimator.gas_limit(unchanged, {"from": "0x01"}) == 30000
+    assert estimator.gas_limit(changed, {"from": "0x01"}) == 62400
+    assert len(calls) == 3
+
+
+def test_pipeline_replaces_transaction_that_stays_pending():
+    w3 = Web3(EthereumTesterProvider())
+    tester = w3.provider.ethereum_tester
+    account = w3.eth.accounts[0]
+    factory = w3.eth.contract(abi=[], bytecode=TINY_BYTECODE)
+    pipeline = TransactionPipeline(
+        w3, account, fees=FeeStrategy(w3, gas_price=GWEI), replace_after=0.2, max_replacements=1
+    )
+    tester.disable_auto_mine_transactions()
+    pipeline.submit("deploy", factory.constructor())
+    original = pipeline._pending[0]["tx_hash"]
+    # 첫 교체 이후에 블록을 만들어 교체된 트랜잭션이 포함되게 함
+    miner = threading.Timer(0.6, tester.mine_blocks, args=(1,))
+    miner.start()
+    try:
+        (result,) = pipeline.wait_all(timeout=10, poll_latency=0.05)
+    finally:
+        miner.cancel()
+
+    assert result["status"] == 1
+    assert result["replacements"] == 1
+    assert result["tx_hash"] != original
+    assert w3.eth.get_transaction(result["tx_hash"])["gasPrice"] == 1125000000
@@ -0,0 +1,79 @@
+import json
+import pytest
+from web3 import Web3, EthereumTesterProvider
+from common.metrics import MetricsRegistry, instrument_web3, metrics
+from common.tx_pipeline import TransactionPipeline
+
+TINY_BYTECODE = "0x600a600c600039600a6000f3602a60005260206000f3"
+
+
+@pytest.fixture
+def enabled_metrics(tmp_path):
+    """공유 레지스트리를 테스트 동안만 Prometheus 형식으로 켬"""
+    metrics.configure("prometheus", str(tmp_path / "metrics.prom"))
+    yield metrics
+    metrics.configure(None)
+
+
+def test_disabled_registry_records_nothing():
+    registry = MetricsRegistry()
+    with registry.span("phase", phase="compile"):
+        registry.inc("rpc_calls_total", method="eth_call")
+    assert registry.span("phase") is registry.span("rpc")
+    assert registry.snapshot() == {"counters": {}, "timings": {}}
+    registry.flush()
+
+
+def test_prometheus_and_jsonl_export(tmp_path):
+    registry = MetricsRegistry("prometheus", str(tmp_path / "metrics.prom"))
+    registry.inc("rpc_calls_total", method="eth_call")
+    registry.inc("rpc_calls_total", 2, method="eth_call")
+    registry.observe("phase", 0.5, phase="compile")
+    registry.observe("phase", 1.5, phase="compile")
+    with pytest.raises(RuntimeError):
+        with registry.span("phase", phase="deploy"):
+            raise RuntimeError("boom")
+    registry.flush()
+    text = (tmp_path / "metrics.prom").read_text()
+    assert 'blocker_rpc_calls_total{method="eth_call"} 3' in text
+    assert 'blocker_phase_seconds_count{phase="compile"} 2' in text
+    assert 'blocker_phase_seconds_sum{phase="compile"} 2.000000' in text
+    assert 'blocker_phase_seconds_max{phase="compile"} 1.500000' in text
+    assert 'blocker_phase_seconds_count{phase="deploy",status="error"} 1' in text
+    # 최댓값은 summary가 아닌 별도 gauge로 선언
+    assert text.index("# TYPE blocker_phase_seconds summary") < text.index("blocker_phase_seconds_count")
+    assert text.index("blocker_phase_seconds_sum") < text.index("# TYPE blocker_phase_seconds_max gauge")
+    assert text.index("# TYPE blocker_phase_seconds_max gauge") < text.index("blocker_phase_seconds_max{")
+
+    # 라벨 값의 역슬래시, 큰따옴표, 줄바꿈은 텍스트 형식에 맞게 이스케이프
+    registry.inc("rpc_errors_total", method='a\\b"c\nd')
+    assert 'blocker_rpc_errors_total{method="a\\\\b\\"c\\nd"} 1' in registry.render_prometheus()
+
+    registry = MetricsRegistry("jsonl", str(tmp_path / "metrics.jsonl"))
+    registry.inc("retries_total", operation="connect")
+    registry.flush()
+    registry.observe("phase", 0.1, phase="sign")
+    registry.flush()
+    lines = [json.loads(line) for line in (tmp_path / "metrics.jsonl").read_text().splitlines()]
+    assert [(e["type"], e["name"]) for e in lines] == [("counter", "retries_total"), ("span", "phase")]
+    assert lines[1]["phase"] == "sign"
+
+
+def test_rpc_middleware_and_pipeline_counters(enabled_metrics):
+    w3 = instrument_web3(Web3(EthereumTesterProvider()))
+    instrument_web3(w3)  # 두 번 호출해도 미들웨어는 하나
+    backend = w3.provider.ethereum_tester.backend
+    pipeline = TransactionPipeline(w3, w3.eth.accounts[0], backend.account_keys[0].to_hex())
+    factory = w3.eth.contract(abi=[], bytecode=TINY_BYTECODE)
+    pipeline.submit("deploy tiny-1", factory.constructor(), gas=100000)
+    [result] = pipeline.wait_all()
+
+    snapshot = enabled_metrics.snapshot()
+    counters, timings = snapshot["counters"], snapshot["timings"]
+    assert counters['rpc_calls_total{method="eth_sendRawTransaction"}'] == 1
+    # 자유 형식 label 대신 함수 이름만 메트릭 라벨로 사용
+    assert counters['gas_used_total{label="constructor"}'] == result["receipt"].gasUsed
+    assert counters['tx_submitted_total{label="constructor"}'] == 1
+    assert result["label"] == "deploy tiny-1"
+    for phase in ("sign", "submit", "wait_receipt"):
+        assert timings[f'phase{{phase="{phase}"}}']["count"] == 1
@@ -0,0 +1,181 @@
+import json
+import time
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+import websockets
+from web3 import Web3, EthereumTesterProvider
+from web3.datastructures import AttributeDict
+from common.providers import SubscriptionClient, get_web3
+
+
+class _RpcHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        body = json.dumps({"jsonrpc": "2.0", "id": request["id"], "result": "0x539"}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class FakeNode:
+    """eth_subscribe만 처리하고 push_head()로 newHeads 알림을 보내는 WebSocket 서버"""
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.clients = set()
+        self.port = None
+        ready = threading.Event()
+        threading.Thread(target=self._run, args=(ready,), daemon=True).start()
+        ready.wait(5)
+
+    def _run(self, ready):
+        asyncio.set_event_loop(self.loop)
+
+        async def handler(ws, *args):
+            self.clients.add(ws)
+            try:
+                async for raw in ws:
+                    request = json.loads(raw)
+                    await ws.send(
+                        json.dumps({"jsonrpc": "2.0", "id": request["id"], "result": hex(request["id"])})
+                    )
+            finally:
+                self.clients.discard(ws)
+
+        async def start():
+            server = await websockets.serve(handler, "127.0.0.1", 0)
+            self.port = list(server.sockets)[0].getsockname()[1]
+            ready.set()
+
+        self.loop.run_until_complete(start())
+        self.loop.run_forever()
+
+    def push_head(self, number):
+        message = json.dumps(
+            {
+                "jsonrpc": "2.0",
+                "method": "eth_subscription",
+                "params": {"subscription": "0x1", "result": {"number": hex(number)}},
+            }
+        )
+
+        async def broadcast():
+            for ws in list(self.clients):
+                await ws.send(message)
+
+        asyncio.run_coroutine_threadsafe(broadcast(), self.loop).result(5)
+
+
+def test_get_web3_shares_one_pooled_instance():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _RpcHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        uri = f"http://127.0.0.1:{server.server_address[1]}"
+        web3 = get_web3(uri)
+        assert get_web3(uri) is web3
+        chain_ids = []
+        threads = [
+            threading.Thread(target=lambda: chain_ids.append(web3.eth.chain_id)) for _ in range(4)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert chain_ids == [1337] * 4
+    finally:
+        server.shutdown()
+
+
+@pytest.mark.parametrize("connected", [True, False])
+def test_wait_for_receipt_wakes_on_new_head(connected):
+    provider = EthereumTesterProvider()
+    tester = provider.ethereum_tester
+    web3 = Web3(provider)
+    tester.disable_auto_mine_transactions()
+    node = FakeNode()
+    # 연결된 경우 안전 폴링(30초)보다 훨씬 빨리 newHeads 알림으로 깨어나야 함
+    uri = f"ws://127.0.0.1:{node.port}" if connected else "ws://127.0.0.1:1"
+    client = SubscriptionClient(web3, uri, fallback_poll=0.05, safety_poll=30).start(connect_timeout=2)
+    try:
+        assert client.connected is connected
+        tx_hash = web3.eth.send_transaction(
+            {"from": web3.eth.accounts[0], "to": web3.eth.accounts[1], "value": 1}
+        )
+        result = {}
+
+        def wait():
+            result["receipt"] = client.wait_for_receipt(tx_hash, timeout=10)
+
+        waiter = threading.Thread(target=wait)
+        waiter.start()
+        time.sleep(0.2)
+        assert "receipt" not in result
+        started = time.perf_counter()
+        tester.mine_blocks(1)
+        if connected:
+            node.push_head(web3.eth.block_number)
+        waiter.join(10)
+        assert result["receipt"].transactionHash == tx_hash
+        assert time.perf_counter() - started < 2
+    finally:
+        client.stop()
+
+
+class _LogWeb3:
+    """FakeEth의 로그를 web3 get_logs처럼 AttributeDict로 돌려주는 래퍼"""
+
+    def __init__(self, fake_web3):
+        self.fake = fake_web3
+        self.eth = self
+
+    @property
+    def block_number(self):
+        return self.fake.eth.block_number
+
+    def get_logs(self, params):
+        return [AttributeDict(log) for log in self.fake.eth.get_logs(params)]
+
+
+def _subscription_message(log, removed=False):
+    """eth_subscription(logs)으로 받는 JSON 형식"""
+    return {
+        "address": log["address"],
+        "topics": [Web3.to_hex(topic) for topic in log["topics"]],
+        "data": Web3.to_hex(log["data"]),
+        "blockNumber": hex(log["blockNumber"]),
+        "blockHash": Web3.to_hex(log["blockHash"]),
+        "transactionHash": Web3.to_hex(log["transactionHash"]),
+        "transactionIndex": hex(log["transactionIndex"]),
+        "logIndex": hex(log["logIndex"]),
+        "removed": removed,
+    }
+
+
+def test_logs_are_dispatched_once_across_subscription_and_catch_up(fake_web3, event_contract):
+    received = []
+    client = SubscriptionClient(_LogWeb3(fake_web3), "ws://127.0.0.1:1")
+    client.subscribe_events(event_contract, lambda event: received.append(event["args"]["uid"]))
+    client.last_block = fake_web3.eth.block_number
+    fake_web3.eth.mine(("UpdateRegistered", ["u1", 1, "first"]))
+    first = _subscription_message(fake_web3.eth.logs[0])
+
+    # 블록 알림 전에 받은 로그가 새 소켓에서 다시 오거나 재연결 보충 조회에 다시 나와도 한 번만 전달
+    client._dispatch_log(first)
+    client._dispatch_log(first)
+    client._catch_up()
+    assert received == ["u1"]
+    fake_web3.eth.mine(("UpdateRegistered", ["u2", 1, "second"]))
+    client._catch_up()
+    assert received == ["u1", "u2"]
+
+    # 재구성으로 취소된 로그는 전달하지 않고, 같은 블록이 다시 채택되면 다시 전달
+    client._dispatch_log(dict(first, removed=True))
+    client._dispatch_log(first)
+    assert received == ["u1", "u2", "u1"]
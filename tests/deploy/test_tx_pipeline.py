@@ -0,0 +1,70 @@
+import pytest
+from web3 import Web3, EthereumTesterProvider
+from common.tx_pipeline import (
+    NonceManager,
+    TransactionPipeline,
+    predict_contract_address,
+)
+
+# 런타임 코드 0x602a60005260206000f3 (항상 42를 반환)을 배포하는 최소 생성 코드
+TINY_BYTECODE = "0x600a600c600039600a6000f3602a60005260206000f3"
+
+
+@pytest.fixture
+def w3():
+    return Web3(EthereumTesterProvider())
+
+
+def test_predict_contract_address_matches_receipt(w3):
+    account = w3.eth.accounts[0]
+    predicted = predict_contract_address(account, w3.eth.get_transaction_count(account))
+    tx_hash = w3.eth.contract(abi=[], bytecode=TINY_BYTECODE).constructor().transact(
+        {"from": account}
+    )
+    receipt = w3.eth.wait_for_transaction_receipt(tx_hash)
+    assert receipt.contractAddress == predicted
+
+
+def test_nonce_manager_hands_out_sequential_nonces(w3):
+    manager = NonceManager(w3, w3.eth.accounts[0])
+    assert [manager.next_nonce() for _ in range(3)] == [0, 1, 2]
+    manager.reset()
+    assert manager.peek() == 0
+
+
+def test_pipeline_submits_back_to_back_and_reports_each_tx(w3):
+    backend = w3.provider.ethereum_tester.backend
+    account = w3.eth.accounts[0]
+    private_key = backend.account_keys[0].to_hex()
+    factory = w3.eth.contract(abi=[], bytecode=TINY_BYTECODE)
+
+    pipeline = TransactionPipeline(w3, account, private_key)
+    expected = []
+    for i in range(3):
+        expected.append(pipeline.predict_next_contract_address())
+        pipeline.submit(f"deploy-{i}", factory.constructor(), gas=100000)
+    results = pipeline.wait_all()
+
+    assert [r["label"] for r in results] == ["deploy-0", "deploy-1", "deploy-2"]
+    assert [r["nonce"] for r in results] == [0, 1, 2]
+    assert all(r["status"] == 1 for r in results)
+    assert [r["receipt"].contractAddress for r in results] == expected
+
+
+def test_pipeline_uses_receipt_waiter_instead_of_polling(w3):
+    waited = []
+
+    class RecordingWaiter:
+        def wait_for_receipt(self, tx_hash, timeout=120):
+            waited.append(tx_hash)
+            return w3.eth.get_transaction_receipt(tx_hash)
+
+    account = w3.eth.accounts[0]
+    factory = w3.eth.contract(abi=[], bytecode=TINY_BYTECODE)
+    pipeline = TransactionPipeline(w3, account, receipt_waiter=RecordingWaiter())
+    pipeline.submit("deploy", factory.constructor(), gas=100000)
+    (result,) = pipeline.wait_all()
+
+    assert result["status"] == 1
+    assert waited == [result["tx_hash"]]
+    assert result["confirmed_at"] >= result["submitted_at"]
@@ -0,0 +1,112 @@
+import os
+import json
+import importlib.util
+import pytest
+from common.catalogue_cache import CatalogueCache
+from common.device_sync import DeviceSyncClient
+
+OWNER = "0x70997970C51812dc3A010C7d01b50e0d17dc79C8"
+OTHER = "0x3C44CdDdB6a900fa2b585dd299e03d12FA4293BC"
+TESTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _synced_cache(web3, contract, record_fetcher, max_owner_views=2):
+    cache = CatalogueCache(max_owner_views)
+    client = DeviceSyncClient(web3, contract, cache, record_fetcher=record_fetcher)
+    return cache, client
+
+
+def _load_gateway():
+    """저장소(../gateway-service)와 테스트 컨테이너(/gateway-service) 양쪽에서 게이트웨이 앱 로드"""
+    pytest.importorskip("flask")
+    for root in (os.path.dirname(TESTS_DIR), "/"):
+        path = os.path.join(root, "gateway-service", "gateway", "app.py")
+        if os.path.exists(path):
+            spec = importlib.util.spec_from_file_location("gateway_app", path)
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            return module
+    pytest.skip("게이트웨이 소스를 찾을 수 없습니다: gateway-service/gateway/app.py")
+
+
+def test_cache_follows_events_and_invalidates_only_changed_views(fake_web3, event_contract, record_fetcher):
+    web3 = fake_web3
+    web3.eth.mine(("UpdateRegistered", ["u1", 1, "first"]), ("UpdateRegistered", ["u2", 1, "second"]))
+    web3.eth.mine(("UpdateDelivered", [OWNER, "u1"]), ("UpdateInstalled", [OWNER, "u1", "device-1"]))
+    cache, client = _synced_cache(web3, event_contract, record_fetcher)
+    client.sync_once()
+
+    catalogue = cache.catalogue_view()
+    assert [u["uid"] for u in json.loads(catalogue.body)["updates"]] == ["u1", "u2"]
+    assert "encrypted_key" not in json.loads(catalogue.body)["updates"][0]
+    assert json.loads(cache.update_view("u1").body)["encrypted_key"] == b"key".hex()
+    assert cache.update_view("missing") is None
+    owner_view = cache.owner_view(OWNER)
+    assert [u["uid"] for u in json.loads(owner_view.body)["updates"]] == ["u2"]
+
+    # 새 블록이 없으면 같은 객체(같은 ETag)를 그대로 반환하고 노드에 정보를 다시 묻지 않음
+    client.sync_once()
+    assert cache.catalogue_view() is catalogue
+    assert cache.owner_view(OWNER) is owner_view
+    assert record_fetcher.fetched == ["u1", "u2"]
+
+    # 취소는 카탈로그와 해당 업데이트 보기만 바꾸고, 환불은 그 owner의 보기만 바꿈
+    u2_view = cache.update_view("u2")
+    web3.eth.mine(("UpdateCancelled", ["u1"]))
+    client.sync_once()
+    assert cache.catalogue_view().etag != catalogue.etag
+    assert json.loads(cache.update_view("u1").body)["is_valid"] is False
+    assert cache.update_view("u2") is u2_view
+    web3.eth.mine(("UpdateRefunded", [OTHER, "u2", 1000]))
+    client.sync_once()
+    assert json.loads(cache.owner_view(OTHER).body)["updates"][0]["uid"] == "u1"
+
+    # LRU는 최근에 쓴 max_owner_views개만 유지
+    cache.owner_view(OWNER)
+    cache.owner_view("0x" + "33" * 20)
+    assert len(cache.owner_views) == 2
+    assert cache.owner_views.get(OTHER, cache._version) is None
+
+    # 재구성되면 되돌린 블록의 취소/환불이 사라짐
+    web3.eth.fork(2)
+    web3.eth.mine()
+    web3.eth.mine()
+    client.sync_once()
+    assert json.loads(cache.update_view("u1").body)["is_valid"] is True
+    assert [u["uid"] for u in json.loads(cache.owner_view(OTHER).body)["updates"]] == ["u1", "u2"]
+
+
+def test_gateway_answers_conditional_requests_with_304(fake_web3, event_contract, record_fetcher):
+    gateway = _load_gateway()
+    web3 = fake_web3
+    web3.eth.mine(("UpdateRegistered", ["fw/1.0", 1, "first"]))
+    cache, client = _synced_cache(web3, event_contract, record_fetcher)
+    app = gateway.create_app(cache)
+    http = app.test_client()
+
+    assert http.get("/healthz").status_code == 503
+    client.sync_once()
+
+    first = http.get("/updates")
+    assert first.status_code == 200
+    assert first.headers["Cache-Control"] == "no-cache"
+    etag = first.headers["ETag"]
+    assert [u["uid"] for u in first.get_json()["updates"]] == ["fw/1.0"]
+    revalidated = http.get("/updates", headers={"If-None-Match": etag})
+    assert revalidated.status_code == 304
+    assert revalidated.data == b""
+
+    assert http.get("/updates/fw/1.0").get_json()["description"] == "first"
+    assert http.get("/updates/nope").status_code == 404
+    assert http.get("/owners/not-an-address/available").status_code == 400
+    owner = http.get(f"/owners/{OWNER.lower()}/available")
+    assert owner.get_json()["owner"] == OWNER
+
+    # 카탈로그가 바뀌면 이전 ETag로는 304가 아니라 새 본문을 받음
+    web3.eth.mine(("UpdateRegistered", ["fw/1.1", 2, "second"]))
+    client.sync_once()
+    changed = http.get("/updates", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert len(changed.get_json()["updates"]) == 2
+    stale_owner = http.get(f"/owners/{OWNER}/available", headers={"If-None-Match": owner.headers["ETag"]})
+    assert stale_owner.status_code == 200
@@ -0,0 +1,78 @@
+from common.lifecycle_index import LifecycleIndexer, LifecycleStore
+
+ALICE = "0x70997970C51812dc3A010C7d01b50e0d17dc79C8"
+BOB = "0x3C44CdDdB6a900fa2b585dd299e03d12FA4293BC"
+CAROL = "0x90F79bf6EB2c4f870365E785982E1f989Bde2b6E"
+
+
+def test_aggregates_purchase_install_refund_and_escrow(fake_web3, event_contract, record_fetcher):
+    web3 = fake_web3
+    web3.eth.mine(("UpdateRegistered", ["u1", 1, "d"]), ("UpdateRegistered", ["u2", 1, "d"]))
+    web3.eth.mine(
+        ("UpdateDelivered", [ALICE, "u1"]),
+        ("UpdateDelivered", [BOB, "u1"]),
+        ("UpdateDelivered", [CAROL, "u1"]),
+    )
+    web3.eth.mine()
+    # 같은 블록에서 구매와 설치가 함께 일어나도 구매별로 이어 붙임
+    web3.eth.mine(("UpdateInstalled", [ALICE, "u1", "dev-a"]), ("UpdateDelivered", [ALICE, "u2"]))
+    web3.eth.mine(("UpdateRefunded", [BOB, "u1", 1000]), ("UpdateInstalled", [ALICE, "u2", "dev-a"]))
+    web3.eth.mine(("UpdateCancelled", ["u2"]))
+
+    store = LifecycleStore(":memory:")
+    assert LifecycleIndexer(web3, event_contract, store, record_fetcher=record_fetcher).sync_once() == 10
+
+    u1, u2 = store.update_stats()
+    assert (u1["purchases"], u1["installs"], u1["refunds"]) == (3, 1, 1)
+    assert u1["install_rate"] == 1 / 3
+    # 구매(블록 2) → 설치(블록 4), FakeEth 블록 간격 12초
+    assert u1["avg_install_seconds"] == 24
+    assert u1["refunded_wei"] == 1000
+    assert u1["escrow_outstanding_wei"] == 1000  # CAROL의 미결 구매
+    assert u2["cancelled"] and u2["install_rate"] == 1.0 and u2["avg_install_seconds"] == 12
+    assert store.escrow_outstanding() == 1000
+    assert [(h["uid"], h["device_id"]) for h in store.owner_history(ALICE)] == [
+        ("u1", "dev-a"),
+        ("u2", "dev-a"),
+    ]
+
+
+def test_resumes_from_cursor_and_caches_block_times(tmp_path, fake_web3, event_contract, record_fetcher):
+    web3 = fake_web3
+    db_path = str(tmp_path / "index.db")
+    web3.eth.mine(("UpdateRegistered", ["u1", 1, "d"]))
+    web3.eth.mine(("UpdateDelivered", [ALICE, "u1"]))
+    store = LifecycleStore(db_path)
+    LifecycleIndexer(web3, event_contract, store, record_fetcher=record_fetcher).sync_once()
+    store.close()
+
+    web3.eth.mine(("UpdateInstalled", [ALICE, "u1", "dev-a"]))
+    web3.eth.get_logs_calls.clear()
+    web3.eth.get_block_calls.clear()
+    store = LifecycleStore(db_path)
+    assert LifecycleIndexer(web3, event_contract, store, record_fetcher=record_fetcher).sync_once() == 1
+    assert web3.eth.get_logs_calls == [(3, 3)]
+    # 새 이벤트 블록 시각 1회 + 구간 끝 해시 1회, 이미 본 uid는 다시 조회하지 않음
+    assert web3.eth.get_block_calls.count(3) == 2
+    assert record_fetcher.fetched == ["u1"]
+    assert store.update_stats("u1")[0]["installs"] == 1
+
+
+def test_reorg_reopens_purchases(fake_web3, event_contract, record_fetcher):
+    web3 = fake_web3
+    store = LifecycleStore(":memory:")
+    indexer = LifecycleIndexer(web3, event_contract, store, record_fetcher=record_fetcher, reorg_depth=1)
+    web3.eth.mine(("UpdateRegistered", ["u1", 1, "d"]))
+    web3.eth.mine(("UpdateDelivered", [ALICE, "u1"]), ("UpdateDelivered", [BOB, "u1"]))
+    web3.eth.mine(("UpdateInstalled", [ALICE, "u1", "dev-a"]))
+    web3.eth.mine(("UpdateRefunded", [BOB, "u1", 1000]))
+    indexer.sync_once()
+    assert store.escrow_outstanding() == 0
+
+    # 설치/환불 블록이 재구성으로 사라짐
+    web3.eth.fork(2)
+    web3.eth.mine()
+    indexer.sync_once()
+    stats = store.update_stats("u1")[0]
+    assert (stats["installs"], stats["refunds"], stats["refunded_wei"]) == (0, 0, 0)
+    assert stats["escrow_outstanding_wei"] == 2000
@@ -0,0 +1,29 @@
+import pytest
+from common.abi_store import AbiStore, abi_digest
+
+ABI = [{"type": "function", "name": "ping", "inputs": [], "outputs": []}]
+
+
+def test_put_and_get_by_digest(tmp_path):
+    store = AbiStore(str(tmp_path))
+    digest = store.put(ABI)
+    assert digest == abi_digest(ABI)
+    # 메모리 캐시가 없는 새 인스턴스도 디스크에서 검증 후 로드
+    assert AbiStore(str(tmp_path)).get(digest) == ABI
+
+
+def test_digest_ignores_key_order():
+    reordered = [{"outputs": [], "inputs": [], "name": "ping", "type": "function"}]
+    assert abi_digest(reordered) == abi_digest(ABI)
+
+
+def test_tampered_body_is_rejected(tmp_path):
+    digest = AbiStore(str(tmp_path)).put(ABI)
+    (tmp_path / f"{digest.hex()}.json").write_text("[]")
+    with pytest.raises(ValueError):
+        AbiStore(str(tmp_path)).get(digest)
+
+
+def test_unknown_digest_raises_key_error(tmp_path):
+    with pytest.raises(KeyError):
+        AbiStore(str(tmp_path)).get(b"\x00" * 32)
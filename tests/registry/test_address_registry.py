@@ -1,22 +1,10 @@
-import pytest
 from web3 import Web3
-import json
-import os
-
-
-@pytest.fixture(scope="module")
-def w3():
-    return Web3(Web3.HTTPProvider("http://ganache:8545"))
+import pytest
 
 
-@pytest.fixture(scope="module")
-def contract(w3):
-    # AddressRegistry.sol 파일을 읽지 않고, ABI/주소만 json에서 로드
-    with open("/registry-service/registry_address.json") as f:
-        data = json.load(f)
-    abi = data["abi"]
-    address = data["address"]
-    return w3.eth.contract(address=address, abi=abi)
+@pytest.fixture
+def contract(registry_contract):
+    return registry_contract
 
 
 def test_admin_is_deployer(contract, w3):
@@ -48,3 +36,24 @@ def test_set_and_get_contract_address(contract, w3):
         assert False, "없는 이름 조회시 revert되어야 함"
     except Exception:
         pass
+
+
+def test_set_abi_hash_bumps_version(contract, w3):
+    admin = w3.eth.accounts[0]
+    digest_v1 = Web3.keccak(text="abi-v1")
+    digest_v2 = Web3.keccak(text="abi-v2")
+    for digest in (digest_v1, digest_v1, digest_v2):
+        tx_hash = contract.functions.setAbiHash("AbiContract", digest).transact(
+            {"from": admin}
+        )
+        w3.eth.wait_for_transaction_receipt(tx_hash)
+    # 같은 다이제스트를 다시 등록하면 버전이 바뀌지 않음
+    digest, version = contract.functions.getAbiHash("AbiContract").call()
+    assert digest == digest_v2
+    assert version == 2
+    # 등록되지 않은 이름 조회시 revert
+    try:
+        contract.functions.getAbiHash("NoAbi").call()
+        assert False, "없는 ABI 조회시 revert되어야 함"
+    except Exception:
+        pass
@@ -0,0 +1,83 @@
+import pytest
+from common.abi_store import AbiStore
+from common.registry_client import RegistryClient
+
+
+@pytest.fixture
+def client(w3, registry_contract, tmp_path):
+    return RegistryClient(
+        w3,
+        registry_contract.address,
+        registry_contract.abi,
+        cache_path=str(tmp_path / "registry_cache.json"),
+    )
+
+
+def _set_address(client, w3, name, addr):
+    tx_hash = client.registry.functions.setContractAddress(name, addr).transact(
+        {"from": w3.eth.accounts[0]}
+    )
+    w3.eth.wait_for_transaction_receipt(tx_hash)
+
+
+def test_cached_address_invalidated_only_by_event(client, w3):
+    _set_address(client, w3, "CachedContract", w3.eth.accounts[1])
+    client.poll_events()
+    assert client.get_address("CachedContract") == w3.eth.accounts[1]
+
+    _set_address(client, w3, "CachedContract", w3.eth.accounts[2])
+    # 이벤트를 확인하기 전에는 캐시된 값을 그대로 반환
+    assert client.get_address("CachedContract") == w3.eth.accounts[1]
+    assert "CachedContract" in client.poll_events()
+    assert client.get_address("CachedContract") == w3.eth.accounts[2]
+
+
+def test_disk_cache_survives_restart(client, w3):
+    _set_address(client, w3, "DiskCachedContract", w3.eth.accounts[3])
+    client.poll_events()
+    client.get_address("DiskCachedContract")
+
+    restarted = RegistryClient(
+        w3, client.registry.address, client.registry.abi, cache_path=client.cache_path
+    )
+    assert restarted._addresses["DiskCachedContract"] == w3.eth.accounts[3]
+    # 재시작 동안 발생한 갱신도 저장된 블록 이후의 이벤트로 반영
+    _set_address(client, w3, "DiskCachedContract", w3.eth.accounts[4])
+    restarted.poll_events()
+    assert restarted.get_address("DiskCachedContract") == w3.eth.accounts[4]
+
+
+def _set_abi_hash(client, w3, name, digest):
+    tx_hash = client.registry.functions.setAbiHash(name, digest).transact(
+        {"from": w3.eth.accounts[0]}
+    )
+    w3.eth.wait_for_transaction_receipt(tx_hash)
+
+
+def test_abi_resolved_from_store_and_invalidated_by_event(client, w3, tmp_path):
+    client.abi_store = AbiStore(str(tmp_path / "abi"))
+    abi_v1 = [{"type": "function", "name": "v1", "inputs": [], "outputs": []}]
+    abi_v2 = [{"type": "function", "name": "v2", "inputs": [], "outputs": []}]
+
+    _set_abi_hash(client, w3, "AbiCached", client.abi_store.put(abi_v1))
+    client.poll_events()
+    assert client.get_abi("AbiCached") == abi_v1
+
+    _set_abi_hash(client, w3, "AbiCached", client.abi_store.put(abi_v2))
+    # AbiUpdated 이벤트를 확인한 뒤에만 새 다이제스트를 읽음
+    assert client.get_abi("AbiCached") == abi_v1
+    assert "AbiCached" in client.poll_events()
+    assert client.get_abi("AbiCached") == abi_v2
+
+
+def test_poll_events_reads_long_gaps_in_bounded_ranges(client, w3):
+    for i in range(3):
+        _set_address(client, w3, f"Gap{i}", w3.eth.accounts[i + 1])
+    # 재시작 후 밀린 블록도 range_size 블록씩 나누어 조회
+    client.ranges.range_size = client.ranges.max_range_size = 1
+    calls = []
+    get_logs = client.ranges.get_logs
+    client.ranges.get_logs = lambda start, end: calls.append((start, end)) or get_logs(start, end)
+    assert sorted(client.poll_events()) == ["Gap0", "Gap1", "Gap2"]
+    assert all(start == end for start, end in calls) and len(calls) == 3
+    assert client._last_block == w3.eth.block_number
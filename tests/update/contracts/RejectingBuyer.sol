@@ -0,0 +1,34 @@
+// SPDX-License-Identifier: MIT
+pragma solidity ^0.8.0;
+
+interface ISoftwareUpdate {
+    function purchaseUpdate(string memory uid) external payable;
+    function refundOnCancel(string memory uid) external;
+}
+
+/**
+ * @title RejectingBuyer
+ * @dev processRefunds의 송금 실패 처리를 검사하기 위한 테스트용 구매자 컨트랙트.
+ * 배포한 계정이 시작한 트랜잭션에서만 이더를 받으므로, 다른 계정이 호출한
+ * processRefunds의 send는 실패하고 소유자가 직접 호출한 refundOnCancel은 성공한다.
+ * (send/transfer는 2300 가스만 주므로 storage 대신 immutable 값으로 판단)
+ */
+contract RejectingBuyer {
+    address private immutable owner;
+
+    constructor() {
+        owner = msg.sender;
+    }
+
+    function purchase(address target, string memory uid) external payable {
+        ISoftwareUpdate(target).purchaseUpdate{value: msg.value}(uid);
+    }
+
+    function refund(address target, string memory uid) external {
+        ISoftwareUpdate(target).refundOnCancel(uid);
+    }
+
+    receive() external payable {
+        require(tx.origin == owner, "Payment rejected");
+    }
+}
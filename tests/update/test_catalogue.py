@@ -0,0 +1,130 @@
+from types import SimpleNamespace
+from common.catalogue import (
+    UpdateSummary,
+    fetch_descriptions,
+    fetch_updates,
+    fetch_updates_range,
+    get_update,
+    iter_available_updates,
+)
+from common.update_codec import decode_ipfs_hash
+
+
+class FakePagedFunction:
+    """getAvailableUpdatesForOwnerPage의 커서 규칙(마지막 페이지면 0)을 흉내내는 가짜 함수"""
+
+    def __init__(self, items):
+        self.items = items
+        self.calls = []
+
+    def __call__(self, start, limit):
+        def call(tx):
+            self.calls.append((start, limit, tx["from"]))
+            end = min(start + limit, len(self.items))
+            return self.items[start:end], (end if end < len(self.items) else 0)
+
+        return SimpleNamespace(call=call)
+
+
+def _item(i):
+    return (f"uid-{i}", bytes([i + 1]) * 32, bytes([i + 1]) * 32, 100 + i, (1 << 32) | 2, True)
+
+
+def test_iterator_streams_pages_lazily():
+    fake = FakePagedFunction([_item(i) for i in range(7)])
+    contract = SimpleNamespace(
+        functions=SimpleNamespace(getAvailableUpdatesForOwnerPage=fake)
+    )
+    it = iter_available_updates(contract, "0xowner", page_size=3)
+    first = next(it)
+    # 압축된 필드는 CID / 16진수 해시 / "major.minor.patch"로 복원됨
+    assert first == UpdateSummary(
+        "uid-0", decode_ipfs_hash(bytes([1]) * 32), "01" * 32, 100, "1.0.2", True
+    )
+    # 첫 항목을 꺼낼 때는 첫 페이지만 조회
+    assert fake.calls == [(0, 3, "0xowner")]
+    rest = list(it)
+    assert [u.uid for u in rest] == [f"uid-{i}" for i in range(1, 7)]
+    assert [c[0] for c in fake.calls] == [0, 3, 6]
+
+
+def test_iterator_handles_empty_catalogue():
+    fake = FakePagedFunction([])
+    contract = SimpleNamespace(
+        functions=SimpleNamespace(getAvailableUpdatesForOwnerPage=fake)
+    )
+    assert list(iter_available_updates(contract, "0xowner")) == []
+
+
+class FakeRangeFunction:
+    """getUpdatesRange(start, limit) -> (records, total)를 흉내내는 가짜 함수"""
+
+    def __init__(self, items):
+        self.items = items
+        self.calls = []
+
+    def __call__(self, start, limit):
+        def call():
+            self.calls.append((start, limit))
+            return self.items[start : start + limit], len(self.items)
+
+        return SimpleNamespace(call=call)
+
+
+def _record(i):
+    return (f"uid-{i}", bytes(32), b"key", bytes(32), i, 1 << 32, True, True)
+
+
+def test_fetch_updates_range_batches_calls():
+    fake = FakeRangeFunction([_record(i) for i in range(450)])
+    contract = SimpleNamespace(functions=SimpleNamespace(getUpdatesRange=fake))
+    records = fetch_updates_range(contract, batch_size=200)
+    assert [r.uid for r in records] == [f"uid-{i}" for i in range(450)]
+    assert fake.calls == [(0, 200), (200, 200), (400, 50)]
+
+
+def test_fetch_updates_range_respects_start_and_limit():
+    fake = FakeRangeFunction([_record(i) for i in range(10)])
+    contract = SimpleNamespace(functions=SimpleNamespace(getUpdatesRange=fake))
+    records = fetch_updates_range(contract, start=3, limit=4, batch_size=3)
+    assert [r.price for r in records] == [3, 4, 5, 6]
+    assert fake.calls == [(3, 3), (6, 1)]
+
+
+def test_fetch_updates_chunks_uid_list():
+    calls = []
+
+    def get_batch(uids):
+        calls.append(list(uids))
+        return SimpleNamespace(call=lambda: [_record(int(u.split("-")[1])) for u in uids])
+
+    contract = SimpleNamespace(functions=SimpleNamespace(getUpdateInfoBatch=get_batch))
+    records = fetch_updates(contract, [f"uid-{i}" for i in range(5)], batch_size=2)
+    assert [r.uid for r in records] == [f"uid-{i}" for i in range(5)]
+    assert [len(c) for c in calls] == [2, 2, 1]
+
+
+def test_missing_uids_decode_to_none():
+    missing = ("", bytes(32), b"", bytes(32), 0, 0, False, False)
+
+    def get_batch(uids):
+        return SimpleNamespace(call=lambda: [_record(1) if u == "uid-1" else missing for u in uids])
+
+    contract = SimpleNamespace(functions=SimpleNamespace(getUpdateInfoBatch=get_batch))
+    # 없는 업데이트(exists == false)는 만들어낸 CID 대신 None, 다이제스트가 0이어도 등록된 업데이트는 그대로
+    records = fetch_updates(contract, ["uid-1", "nope"])
+    assert records[0].uid == "uid-1" and records[0].ipfs_hash == decode_ipfs_hash(bytes(32))
+    assert records[1] is None
+    assert get_update(contract, "nope") is None
+
+
+def test_fetch_descriptions_reads_only_the_given_range_in_pages(fake_web3, event_contract):
+    web3 = fake_web3
+    web3.eth.mine(("UpdateRegistered", ["old", 1, "already synced"]))
+    for i in range(6):
+        web3.eth.mine(("UpdateRegistered", [f"fw/{i}", 1, f"release {i}"]))
+    # 구간 제한이 있는 노드에서도 나누어 조회
+    web3.eth.max_range = 2
+    descriptions = fetch_descriptions(web3, event_contract, 2, web3.eth.block_number)
+    assert descriptions == {f"fw/{i}": f"release {i}" for i in range(6)}
+    assert min(start for start, _ in web3.eth.get_logs_calls) == 2
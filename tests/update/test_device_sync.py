@@ -0,0 +1,111 @@
+from common.catalogue import UpdateRecord
+from common.device_sync import DeviceSyncClient, SyncStore
+from common.update_codec import decode_ipfs_hash
+
+OWNER = "0x70997970C51812dc3A010C7d01b50e0d17dc79C8"
+OTHER = "0x3C44CdDdB6a900fa2b585dd299e03d12FA4293BC"
+
+
+def test_sync_resumes_from_checkpoint_and_fetches_only_new_uids(tmp_path, fake_web3, event_contract, record_fetcher):
+    web3 = fake_web3
+    db_path = str(tmp_path / "sync.db")
+    web3.eth.mine(("UpdateRegistered", ["u1", 1, "first"]), ("UpdateRegistered", ["u2", 1, "second"]))
+    web3.eth.mine(("UpdateDelivered", [OWNER, "u1"]), ("UpdateDelivered", [OTHER, "u2"]))
+    web3.eth.mine(("UpdateInstalled", [OWNER, "u1", "device-1"]))
+
+    store = SyncStore(db_path)
+    client = DeviceSyncClient(web3, event_contract, store, record_fetcher=record_fetcher, owner=OWNER)
+    # 다른 계정의 구매 이벤트는 저장하지 않음
+    assert client.sync_once() == 4
+    assert record_fetcher.fetched == ["u1", "u2"]
+    assert [u["uid"] for u in store.available_updates(OWNER)] == ["u2"]
+    assert store.available_updates(OWNER)[0]["description"] == "second"
+    store.close()
+
+    # 재시작 후에는 체크포인트 이후의 블록만 조회
+    web3.eth.mine(("UpdateRegistered", ["u3", 2, "third"]))
+    web3.eth.get_logs_calls.clear()
+    store = SyncStore(db_path)
+    client = DeviceSyncClient(web3, event_contract, store, record_fetcher=record_fetcher, owner=OWNER)
+    assert client.sync_once() == 1
+    assert web3.eth.get_logs_calls == [(4, 4)]
+    assert record_fetcher.fetched == ["u1", "u2", "u3"]
+    assert client.sync_once() == 0
+
+
+def test_lowercase_owner_is_matched_against_checksummed_event_addresses(fake_web3, event_contract, record_fetcher):
+    web3 = fake_web3
+    store = SyncStore(":memory:")
+    # ACCOUNT_ADDRESS가 소문자여도 이벤트의 체크섬 주소와 비교해 구매/설치를 버리지 않음
+    client = DeviceSyncClient(web3, event_contract, store, record_fetcher=record_fetcher, owner=OWNER.lower())
+    web3.eth.mine(*[("UpdateRegistered", [uid, 1, "d"]) for uid in ("u1", "u2")])
+    web3.eth.mine(("UpdateDelivered", [OWNER, "u1"]), ("UpdateInstalled", [OWNER, "u1", "device-1"]))
+    client.sync_once()
+    assert client.owner == OWNER
+    assert [e["event"] for e in store.owner_events(OWNER)] == ["UpdateDelivered", "UpdateInstalled"]
+    assert [u["uid"] for u in store.available_updates(client.owner)] == ["u2"]
+
+
+def test_range_shrinks_on_error_and_grows_when_sparse(fake_web3, event_contract, record_fetcher):
+    web3 = fake_web3
+    for i in range(20):
+        web3.eth.mine(("UpdateRegistered", [f"u{i}", 1, "d"]))
+    web3.eth.max_range = 4
+    client = DeviceSyncClient(
+        web3, event_contract, SyncStore(":memory:"), record_fetcher=record_fetcher, range_size=16, max_range_size=64
+    )
+
+    assert client.sync_once() == 20
+    # 16 → 8 → 4로 줄인 뒤 성공, 로그가 적으면 다음 구간을 두 배로 늘림
+    assert web3.eth.get_logs_calls[:3] == [(0, 15), (0, 7), (0, 3)]
+    assert client.range_size > 4
+
+
+def test_reorg_rolls_back_and_resyncs_recent_blocks(fake_web3, event_contract, record_fetcher):
+    web3 = fake_web3
+    store = SyncStore(":memory:")
+    client = DeviceSyncClient(
+        web3, event_contract, store, record_fetcher=record_fetcher, owner=OWNER, reorg_depth=2
+    )
+    web3.eth.mine(("UpdateRegistered", ["u1", 1, "d"]))
+    web3.eth.mine(("UpdateDelivered", [OWNER, "u1"]))
+    web3.eth.mine(("UpdateInstalled", [OWNER, "u1", "device-1"]))
+    client.sync_once()
+    assert store.available_updates(OWNER) == []
+
+    # 설치 이벤트가 담긴 블록이 재구성으로 사라지고 다른 블록으로 대체됨
+    web3.eth.fork(2)
+    web3.eth.mine(("UpdateRegistered", ["u2", 1, "d"]))
+    client.sync_once()
+    assert [u["uid"] for u in store.available_updates(OWNER)] == ["u1", "u2"]
+    assert [e["event"] for e in store.owner_events(OWNER)] == ["UpdateDelivered"]
+
+
+def test_refunded_and_cancelled_updates_are_not_available(fake_web3, event_contract, record_fetcher):
+    web3 = fake_web3
+    store = SyncStore(":memory:")
+    client = DeviceSyncClient(web3, event_contract, store, record_fetcher=record_fetcher, owner=OWNER)
+    web3.eth.mine(*[("UpdateRegistered", [uid, 1, "d"]) for uid in ("u1", "u2", "u3")])
+    web3.eth.mine(("UpdateDelivered", [OWNER, "u1"]), ("UpdateDelivered", [OTHER, "u2"]))
+    web3.eth.mine(("UpdateRefunded", [OWNER, "u1", 1000]), ("UpdateRefunded", [OTHER, "u2", 1000]))
+    web3.eth.mine(("UpdateCancelled", ["u3"]))
+    client.sync_once()
+    # u1은 직접 환불, u3는 취소되었고 u2는 다른 계정의 환불이므로 그대로 설치 가능
+    assert [u["uid"] for u in store.available_updates(OWNER)] == ["u2"]
+
+
+def test_known_uids_queries_large_catalogues_in_chunks():
+    store = SyncStore(":memory:")
+    uids = [f"fw/{i}" for i in range(1200)]
+    stored = uids[::2]
+    records = [
+        UpdateRecord(uid, decode_ipfs_hash(bytes(32)), b"key", "ab" * 32, 1000, "1.0.0", True) for uid in stored
+    ]
+    store.apply_range(None, 1, None, [], records, {uid: ("", 1) for uid in stored})
+    statements = []
+    store._conn.set_trace_callback(statements.append)
+
+    # 변수 한도(999)를 넘는 첫 동기화도 SQLITE_IN_CHUNK개씩 나누어 조회
+    assert store.known_uids(uids) == set(stored)
+    assert len([s for s in statements if s.startswith("SELECT uid")]) == 3
+    assert store.known_uids([]) == set()
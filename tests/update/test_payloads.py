@@ -0,0 +1,81 @@
+import os
+import hashlib
+import threading
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from common.catalogue import UpdateRecord
+from common.payloads import HttpContentStore, LocalContentStore, PayloadVerifier, hash_payload
+
+
+def _record(uid, cid, hash_of_update):
+    return UpdateRecord(uid, cid, b"key", hash_of_update, 1000, "1.0.0", True)
+
+
+@pytest.fixture
+def store(tmp_path):
+    return LocalContentStore(str(tmp_path / "payloads"))
+
+
+def _put(store, tmp_path, data):
+    source = tmp_path / "source.bin"
+    source.write_bytes(data)
+    return store.put_file(str(source))
+
+
+def test_chunked_hash_matches_whole_file_hash(store, tmp_path):
+    data = os.urandom(10_000)
+    cid = _put(store, tmp_path, data)
+    # 조각 경계가 파일 크기와 맞지 않아도 같은 다이제스트
+    for chunk_size in (1, 4096, 10_000, 1 << 20):
+        assert hash_payload(store, cid, chunk_size) == (hashlib.sha256(data).hexdigest(), len(data))
+    empty = _put(store, tmp_path, b"")
+    assert hash_payload(store, empty) == (hashlib.sha256(b"").hexdigest(), 0)
+    with pytest.raises(ValueError):
+        store.path("../etc/passwd")
+
+
+def test_verifier_checks_each_payload_against_hash_of_update(store, tmp_path):
+    good = os.urandom(5000)
+    tampered = os.urandom(5000)
+    good_cid = _put(store, tmp_path, good)
+    tampered_cid = _put(store, tmp_path, tampered)
+    records = {
+        "good": _record("good", good_cid, hashlib.sha256(good).hexdigest()),
+        "tampered": _record("tampered", tampered_cid, hashlib.sha256(good).hexdigest()),
+        "missing": _record("missing", "QmMissing", "00" * 32),
+        "unregistered": None,
+    }
+    fetched = []
+
+    def fetch(contract, uids):
+        fetched.append(list(uids))
+        return [records[uid] for uid in uids]
+
+    verifier = PayloadVerifier(None, store, workers=3, chunk_size=1024, record_fetcher=fetch)
+    results = verifier.verify(["good", "unregistered", "tampered", "missing"])
+    # 업데이트 정보는 한 번에 조회하고 결과는 입력 순서대로 반환 (없는 업데이트는 실패)
+    assert fetched == [["good", "unregistered", "tampered", "missing"]]
+    assert [(r.uid, r.ok) for r in results] == [
+        ("good", True), ("unregistered", False), ("tampered", False), ("missing", False)
+    ]
+    assert results[0].size == 5000
+    assert results[1].error is not None and results[1].size == 0
+    assert results[2].actual == hashlib.sha256(tampered).hexdigest()
+    assert results[3].error is not None
+
+
+def test_http_store_streams_from_gateway(store, tmp_path):
+    data = os.urandom(200_000)
+    cid = _put(store, tmp_path, data)
+    os.symlink(store.root, str(tmp_path / "ipfs"))
+    server = ThreadingHTTPServer(
+        ("127.0.0.1", 0), partial(SimpleHTTPRequestHandler, directory=str(tmp_path))
+    )
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        http_store = HttpContentStore(f"http://127.0.0.1:{server.server_address[1]}")
+        assert hash_payload(http_store, cid, 4096) == (hashlib.sha256(data).hexdigest(), len(data))
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -1,22 +1,26 @@
-import pytest
-from web3 import Web3
-import json
 import os
+import pytest
+from common.refunds import process_refunds
+from common.update_codec import decode_ipfs_hash
+from common.update_signing import build_register_args, build_register_batch_args
 
+IPFS = "QmYwAPJzv5CZsnA625s3Xf2nemtYgPpHdWEz79ojWnPbdG"
+# 테스트 전용 컨트랙트 (송금을 거부하는 구매자 등)
+CONTRACTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "contracts")
 
-@pytest.fixture(scope="module")
-def w3():
-    return Web3(Web3.HTTPProvider("http://52.78.52.216:8545"))
 
+@pytest.fixture
+def contract(update_contract):
+    return update_contract
 
-@pytest.fixture(scope="module")
-def contract(w3):
-    # SoftwareUpdateContract.sol 파일을 읽지 않고, ABI/주소만 json에서 로드
-    with open("/update_service/contract_address.json") as f:
-        data = json.load(f)
-    abi = data["abi"]
-    address = data["address"]
-    return w3.eth.contract(address=address, abi=abi)
+
+def _register(contract, w3, manufacturer_key, uid, price=1000, version="1.0.0", ipfs=IPFS):
+    tx_hash = contract.functions.registerUpdate(
+        *build_register_args(
+            manufacturer_key, uid, ipfs, "encKey", "12" * 32, "테스트 업데이트", price, version
+        )
+    ).transact({"from": w3.eth.accounts[0]})
+    w3.eth.wait_for_transaction_receipt(tx_hash)
 
 
 def test_manufacturer_is_deployer(contract, w3):
@@ -24,74 +28,65 @@ def test_manufacturer_is_deployer(contract, w3):
     assert manufacturer == w3.eth.accounts[0]
 
 
-def test_register_update_and_query(contract, w3):
-    manufacturer = w3.eth.accounts[0]
+def test_register_update_and_query(contract, w3, manufacturer_key):
     user = w3.eth.accounts[1]
     uid = "update-001"
-    ipfs = "QmTestHash"
-    encrypted_key = "encKey"
-    hash_of_update = "hash123"
-    desc = "테스트 업데이트"
-    price = 1000
-    version = "1.0.0"
     # 제조사가 registerUpdate 호출
-    tx_hash = contract.functions.registerUpdate(
-        uid, ipfs, encrypted_key, hash_of_update, desc, price, version, b""
-    ).transact({"from": manufacturer})
-    w3.eth.wait_for_transaction_receipt(tx_hash)
+    _register(contract, w3, manufacturer_key, uid)
     # getUpdateCount, getUpdateIdByIndex로 확인
-    count = contract.functions.getUpdateCount().call()
-    assert count > 0
-    found_uid = contract.functions.getUpdateIdByIndex(0).call()
-    assert found_uid == uid
+    assert contract.functions.getUpdateCount().call() == 1
+    assert contract.functions.getUpdateIdByIndex(0).call() == uid
     # 비제조사가 registerUpdate 호출 시 revert
     try:
         contract.functions.registerUpdate(
-            "fail", ipfs, encrypted_key, hash_of_update, desc, price, version, b""
+            *build_register_args(
+                manufacturer_key, "fail", IPFS, "encKey", "12" * 32, "desc", 1000, "1.0.0"
+            )
         ).transact({"from": user})
         assert False, "비제조사 호출이 revert되어야 함"
     except Exception:
         pass
 
 
-def test_purchase_and_get_update_info(contract, w3):
-    manufacturer = w3.eth.accounts[0]
+def test_purchase_and_get_update_info(contract, w3, manufacturer_key):
     user = w3.eth.accounts[1]
     uid = "update-unique-001"
-    ipfs = "QmTestHash2"
-    encrypted_key = "encKey2"
-    hash_of_update = "hash456"
-    desc = "테스트 업데이트2"
     price = 2000
-    version = "2.0.0"
     # 새로운 업데이트 등록
-    tx_hash = contract.functions.registerUpdate(
-        uid, ipfs, encrypted_key, hash_of_update, desc, price, version, b""
-    ).transact({"from": manufacturer})
-    w3.eth.wait_for_transaction_receipt(tx_hash)
-    # 구매 전 권한 없음
+    _register(contract, w3, manufacturer_key, uid, price=price, version="2.0.0")
     info = contract.functions.getUpdateInfo(uid).call({"from": user})
-    assert info[-1] is False  # isAuthorized
+    assert info[3] == price
+    assert info[-1] is True  # isValid
+    # 구매 전에는 구매 목록에 없음
+    assert uid not in contract.functions.getOwnerUpdates().call({"from": user})
+    # 금액 부족시 revert
+    try:
+        contract.functions.purchaseUpdate(uid).transact({"from": user, "value": 1})
+        assert False, "금액 부족시 revert되어야 함"
+    except Exception:
+        pass
     # 구매
     tx_hash = contract.functions.purchaseUpdate(uid).transact(
         {"from": user, "value": price}
     )
     w3.eth.wait_for_transaction_receipt(tx_hash)
-    # 구매 후 권한 있음
-    info = contract.functions.getUpdateInfo(uid).call({"from": user})
-    assert info[-1] is True
-    # 금액 부족시 revert
+    assert uid in contract.functions.getOwnerUpdates().call({"from": user})
+    # 중복 구매시 revert
     try:
-        contract.functions.purchaseUpdate(uid).transact({"from": user, "value": 1})
-        assert False, "금액 부족시 revert되어야 함"
+        contract.functions.purchaseUpdate(uid).transact({"from": user, "value": price})
+        assert False, "중복 구매시 revert되어야 함"
     except Exception:
         pass
 
 
-def test_confirm_installation_and_owner_updates(contract, w3):
+def test_confirm_installation_and_owner_updates(contract, w3, manufacturer_key):
+    manufacturer = w3.eth.accounts[0]
     user = w3.eth.accounts[1]
     uid = "update-001"
     device_id = "device-abc"
+    _register(contract, w3, manufacturer_key, uid)
+    tx_hash = contract.functions.purchaseUpdate(uid).transact({"from": user, "value": 1000})
+    w3.eth.wait_for_transaction_receipt(tx_hash)
     # 권한 없는 계정이 confirmInstallation 호출 시 revert
     try:
         contract.functions.confirmInstallation(uid, device_id).transact(
@@ -100,11 +95,177 @@ def test_confirm_installation_and_owner_updates(contract, w3):
         assert False, "권한 없는 계정이 호출시 revert되어야 함"
     except Exception:
         pass
-    # 권한 있는 계정이 호출
+    # 권한 있는 계정이 호출하면 락업 금액이 제조사에게 전달됨
+    balance_before = w3.eth.get_balance(manufacturer)
     tx_hash = contract.functions.confirmInstallation(uid, device_id).transact(
         {"from": user}
     )
     w3.eth.wait_for_transaction_receipt(tx_hash)
+    assert w3.eth.get_balance(manufacturer) == balance_before + 1000
     # getOwnerUpdates로 구매한 업데이트 목록 확인
     updates = contract.functions.getOwnerUpdates().call({"from": user})
     assert uid in updates
+
+
+def test_register_updates_batch(contract, w3, manufacturer_key):
+    manufacturer = w3.eth.accounts[0]
+    updates = [
+        (f"batch-{i:03d}", IPFS, f"encKey{i}", f"{i + 1:02x}" * 32, f"배치 {i}", 1000 + i, "3.0.0")
+        for i in range(3)
+    ]
+    items, signature = build_register_batch_args(manufacturer_key, updates)
+    tx_hash = contract.functions.registerUpdatesBatch(items, signature).transact(
+        {"from": manufacturer}
+    )
+    receipt = w3.eth.wait_for_transaction_receipt(tx_hash)
+    assert receipt.status == 1
+    assert contract.functions.getUpdateCount().call() == len(updates)
+    info = contract.functions.getUpdateInfo("batch-002").call()
+    assert info[3] == 1002 and info[5] is True
+    # 서명 이후 항목이 바뀌면 revert
+    tampered = [items[0][:5] + (1,) + items[0][6:]] + items[1:]
+    try:
+        contract.functions.registerUpdatesBatch(tampered, signature).transact(
+            {"from": manufacturer}
+        )
+        assert False, "변조된 배치는 revert되어야 함"
+    except Exception:
+        pass
+
+
+def test_state_is_isolated_between_tests(contract):
+    # 앞선 테스트에서 등록한 업데이트는 스냅샷 복원으로 사라져야 함
+    assert contract.functions.getUpdateCount().call() == 0
+
+
+def test_refund_and_cancel_emit_events(contract, w3, manufacturer_key):
+    manufacturer, user = w3.eth.accounts[0], w3.eth.accounts[1]
+    uid = "update-cancel"
+    _register(contract, w3, manufacturer_key, uid)
+    w3.eth.wait_for_transaction_receipt(
+        contract.functions.purchaseUpdate(uid).transact({"from": user, "value": 1000})
+    )
+    receipt = w3.eth.wait_for_transaction_receipt(
+        contract.functions.cancelUpdate(uid).transact({"from": manufacturer})
+    )
+    assert contract.events.UpdateCancelled().process_receipt(receipt)[0]["args"]["uid"] == uid
+    receipt = w3.eth.wait_for_transaction_receipt(
+        contract.functions.refundOnCancel(uid).transact({"from": user})
+    )
+    args = contract.events.UpdateRefunded().process_receipt(receipt)[0]["args"]
+    assert (args["owner"], args["uid"], args["amount"]) == (user, uid, 1000)
+
+
+def _transact(w3, fn, sender, value=0):
+    return w3.eth.wait_for_transaction_receipt(fn.transact({"from": sender, "value": value}))
+
+
+def _cancelled_with_buyers(contract, w3, manufacturer_key, uid, buyers, price=1000, ipfs=IPFS):
+    _register(contract, w3, manufacturer_key, uid, price=price, ipfs=ipfs)
+    for buyer in buyers:
+        _transact(w3, contract.functions.purchaseUpdate(uid), buyer, price)
+
+
+def _progress(contract, uid):
+    return tuple(contract.functions.getRefundProgress(uid).call())
+
+
+def _refund_events(contract, receipt):
+    return [
+        (e["args"]["owner"], e["args"]["uid"], e["args"]["amount"])
+        for e in contract.events.UpdateRefunded().process_receipt(receipt)
+    ]
+
+
+def test_process_refunds_advances_cursor_and_skips_settled_buyers(contract, w3, manufacturer_key):
+    manufacturer, caller = w3.eth.accounts[0], w3.eth.accounts[6]
+    installed, refunded, *pending = buyers = w3.eth.accounts[1:6]
+    uid = "update-refund"
+    _cancelled_with_buyers(contract, w3, manufacturer_key, uid, buyers)
+    _transact(w3, contract.functions.confirmInstallation(uid, "device-1"), installed)
+    _transact(w3, contract.functions.refundOnNotMatch(uid), refunded)
+    _register(contract, w3, manufacturer_key, "update-valid")
+
+    # 취소 전이거나 유효한 업데이트, maxBuyers가 0이면 revert
+    with pytest.raises(Exception, match="Update is not cancelled"):
+        contract.functions.processRefunds(uid, 2).call({"from": caller})
+    with pytest.raises(Exception, match="Update is not cancelled"):
+        contract.functions.processRefunds("update-valid", 2).call({"from": caller})
+    _transact(w3, contract.functions.cancelUpdate(uid), manufacturer)
+    with pytest.raises(Exception, match="maxBuyers must be positive"):
+        contract.functions.processRefunds(uid, 0).call({"from": caller})
+
+    before = {buyer: w3.eth.get_balance(buyer) for buyer in buyers}
+    assert _progress(contract, uid) == (0, 5)
+    # 누구나 호출할 수 있고, 호출마다 최대 maxBuyers명씩 커서가 전진
+    # 인덱서가 환불을 이 이벤트로 집계하므로 실제로 환불한 구매자마다 UpdateRefunded 하나씩
+    rounds = (((2, 3), 2, []), ((2, 1), 4, pending[:2]), ((1, 0), 5, pending[2:]))
+    for returned, cursor, refunded_now in rounds:
+        assert tuple(contract.functions.processRefunds(uid, 2).call({"from": caller})) == returned
+        receipt = _transact(w3, contract.functions.processRefunds(uid, 2), caller)
+        assert _progress(contract, uid) == (cursor, 5)
+        assert _refund_events(contract, receipt) == [(buyer, uid, 1000) for buyer in refunded_now]
+    assert tuple(contract.functions.processRefunds(uid, 2).call({"from": caller})) == (0, 0)
+
+    # 설치를 마쳤거나 이미 환불받은 구매자는 건너뜀
+    assert w3.eth.get_balance(installed) == before[installed]
+    assert w3.eth.get_balance(refunded) == before[refunded]
+    for buyer in pending:
+        assert w3.eth.get_balance(buyer) == before[buyer] + 1000
+        with pytest.raises(Exception, match="No escrowed payment"):
+            contract.functions.refundOnCancel(uid).call({"from": buyer})
+
+
+def test_process_refunds_skips_buyer_that_rejects_payment(contract, w3, manufacturer_key, compile_contract):
+    manufacturer, device, owner = w3.eth.accounts[0], w3.eth.accounts[1], w3.eth.accounts[7]
+    uid = "update-rejected"
+    abi, bytecode = compile_contract(os.path.join(CONTRACTS_DIR, "RejectingBuyer.sol"))
+    receipt = _transact(w3, w3.eth.contract(abi=abi, bytecode=bytecode).constructor(), owner)
+    buyer = w3.eth.contract(address=receipt.contractAddress, abi=abi)
+    _cancelled_with_buyers(contract, w3, manufacturer_key, uid, [device])
+    _transact(w3, buyer.functions.purchase(contract.address, uid), owner, 1000)
+    _transact(w3, contract.functions.cancelUpdate(uid), manufacturer)
+
+    device_before = w3.eth.get_balance(device)
+    receipt = _transact(w3, contract.functions.processRefunds(uid, 10), manufacturer)
+    assert receipt.status == 1
+    # 송금을 거부한 구매자의 락업 금액은 되돌려 두고 커서는 그 뒤로 전진
+    assert _progress(contract, uid) == (2, 2)
+    assert w3.eth.get_balance(device) == device_before + 1000
+    assert w3.eth.get_balance(buyer.address) == 0
+    # 송금에 실패한 구매자의 UpdateRefunded는 내보내지 않음
+    assert _refund_events(contract, receipt) == [(device, uid, 1000)]
+    # 거부한 구매자는 refundOnCancel로 직접 환불받을 수 있음
+    receipt = _transact(w3, buyer.functions.refund(contract.address, uid), owner)
+    assert w3.eth.get_balance(buyer.address) == 1000
+    assert _refund_events(contract, receipt) == [(buyer.address, uid, 1000)]
+
+
+def test_process_refunds_driver_runs_to_completion(contract, w3, manufacturer_key):
+    manufacturer, operator = w3.eth.accounts[0], w3.eth.accounts[6]
+    buyers = w3.eth.accounts[1:6]
+    uid = "update-driver"
+    # 존재 여부는 다이제스트가 아니라 exists로 판단하므로 0 다이제스트로 등록한 업데이트도 처리
+    _cancelled_with_buyers(contract, w3, manufacturer_key, uid, buyers, ipfs=decode_ipfs_hash(bytes(32)))
+    _register(contract, w3, manufacturer_key, "update-valid")
+    assert contract.functions.updateExists(uid).call()
+    assert not contract.functions.updateExists("update-missing").call()
+
+    # 취소되지 않았거나 없는 업데이트는 트랜잭션을 보내기 전에 거부
+    nonce = w3.eth.get_transaction_count(operator)
+    for missing in ("update-valid", "update-missing"):
+        with pytest.raises(ValueError, match=missing):
+            process_refunds(w3, contract, missing, operator)
+    assert w3.eth.get_transaction_count(operator) == nonce
+
+    _transact(w3, contract.functions.cancelUpdate(uid), manufacturer)
+    before = {buyer: w3.eth.get_balance(buyer) for buyer in buyers}
+    progress = []
+    result = process_refunds(
+        w3, contract, uid, operator, max_buyers=2, max_in_flight=2, progress=lambda *p: progress.append(p)
+    )
+    # 첫 라운드에 2건(4명), 두 번째 라운드에 1건(1명)
+    assert result == (5, 5)
+    assert progress == [(4, 5), (5, 5)]
+    for buyer in buyers:
+        assert w3.eth.get_balance(buyer) == before[buyer] + 1000
@@ -0,0 +1,37 @@
+import hashlib
+import pytest
+from common.update_codec import (
+    decode_ipfs_hash,
+    decode_update_hash,
+    decode_version,
+    encode_ipfs_hash,
+    encode_update_hash,
+    encode_version,
+)
+
+CID = "QmYwAPJzv5CZsnA625s3Xf2nemtYgPpHdWEz79ojWnPbdG"
+
+
+def test_ipfs_hash_round_trip():
+    digest = encode_ipfs_hash(CID)
+    assert len(digest) == 32
+    assert decode_ipfs_hash(digest) == CID
+
+
+def test_ipfs_hash_rejects_non_sha256_cid():
+    with pytest.raises(ValueError):
+        encode_ipfs_hash("QmTestHash")
+
+
+def test_update_hash_round_trip():
+    hex_digest = hashlib.sha256(b"firmware").hexdigest()
+    assert encode_update_hash("0x" + hex_digest) == bytes.fromhex(hex_digest)
+    assert decode_update_hash(encode_update_hash(hex_digest)) == hex_digest
+
+
+def test_version_packing():
+    assert encode_version("1.2.3") == (1 << 32) | (2 << 16) | 3
+    assert decode_version(encode_version("10.0.65535")) == "10.0.65535"
+    assert decode_version(encode_version("2")) == "2.0.0"
+    with pytest.raises(ValueError):
+        encode_version("1.70000.0")
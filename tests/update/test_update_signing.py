@@ -0,0 +1,58 @@
+from eth_account import Account
+from web3 import Web3
+from common.update_codec import encode_update
+from common.update_signing import (
+    batch_message_hash,
+    build_register_args,
+    build_register_batch_args,
+    update_message_hash,
+)
+
+# ganache --deterministic 첫 번째 계정 (docker-compose 설정과 동일)
+MANUFACTURER_KEY = "0xac0974bec39a17e36ba4a6b4d238ff944bacb478cbed5efcae784d7bf4f2ff80"
+MANUFACTURER = "0xf39Fd6e51aad88F6F4ce6aB8827279cffFb92266"
+
+
+def test_signature_recovers_to_manufacturer():
+    fields = (
+        "update-001",
+        "QmYwAPJzv5CZsnA625s3Xf2nemtYgPpHdWEz79ojWnPbdG",
+        b"encKey",
+        "ab" * 32,
+        "desc",
+        1000,
+        "1.0.0",
+    )
+    args = build_register_args(MANUFACTURER_KEY, *fields)
+    encoded, signature = args[:-1], args[-1]
+    assert encoded == encode_update(*fields)
+    assert len(signature) == 65
+    # 컨트랙트의 recoverSigner와 같은 방식으로 접두어를 붙인 해시에서 서명자 복원
+    eth_signed = Web3.keccak(
+        b"\x19Ethereum Signed Message:\n32" + update_message_hash(*encoded)
+    )
+    assert Account._recover_hash(eth_signed, signature=signature) == MANUFACTURER
+
+
+def test_batch_signature_covers_every_item():
+    updates = [
+        (
+            f"update-{i:03d}",
+            "QmYwAPJzv5CZsnA625s3Xf2nemtYgPpHdWEz79ojWnPbdG",
+            b"encKey",
+            f"{i:02x}" * 32,
+            "desc",
+            1000 + i,
+            "1.0.0",
+        )
+        for i in range(3)
+    ]
+    encoded_updates, signature = build_register_batch_args(MANUFACTURER_KEY, updates)
+    assert encoded_updates == [encode_update(*u) for u in updates]
+    # 컨트랙트와 같이 항목 해시를 이어 붙인 값의 keccak256에 서명해야 함
+    expected = Web3.keccak(b"".join(update_message_hash(*e) for e in encoded_updates))
+    assert batch_message_hash(encoded_updates) == expected
+    eth_signed = Web3.keccak(b"\x19Ethereum Signed Message:\n32" + expected)
+    assert Account._recover_hash(eth_signed, signature=signature) == MANUFACTURER
+    # 항목 순서가 바뀌면 다른 해시가 되어 서명이 무효화됨
+    assert batch_message_hash(encoded_updates[::-1]) != expected
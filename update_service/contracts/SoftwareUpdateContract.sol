@@ -9,15 +9,15 @@ contract SoftwareUpdateContract {
     /// @dev 제조사(관리자) 주소
     address public manufacturer;
     
+    // uid는 매핑 키, description은 UpdateRegistered 이벤트로만 남기고 나머지는 고정 크기로 압축 저장
     struct UpdateInfo {
-        string uid;
-        string ipfsHash;
-        bytes encryptedKey;
-        string hashOfUpdate;
-        string description;
-        uint256 price;
-        string version;
+        bytes32 ipfsDigest;   // IPFS CIDv0(sha2-256 multihash)의 32바이트 다이제스트
+        bytes32 updateHash;   // 업데이트 파일의 SHA-256 해시
+        uint128 price;        // price, version, isValid, exists는 한 슬롯에 함께 저장됨
+        uint64 version;       // (major << 32) | (minor << 16) | patch
         bool isValid;
+        bool exists;
+        bytes encryptedKey;
     }
     
     struct UpdateGroup {
@@ -31,14 +31,17 @@ contract SoftwareUpdateContract {
     mapping(address => mapping(string => bool)) private isInstalled; // [구매자][업데이트ID] => 설치 완료 여부
     mapping(address => mapping(string => bool)) private isRefunded; // [구매자][업데이트ID] => 환불 여부
     mapping(string => address[]) private updateBuyers; // 업데이트별 구매자 목록
+    mapping(string => uint256) private refundCursor; // 업데이트별 환불 처리 완료 위치 (updateBuyers 인덱스)
     // --- 시각 정보 저장용 매핑 추가 ---
     mapping(address => mapping(string => uint256)) private purchaseTimestamps; // 구매 시각
     mapping(address => mapping(string => uint256)) private installTimestamps;  // 설치 완료 시각
     mapping(address => mapping(string => uint256)) private refundTimestamps;   // 환불 시각
     
-    event UpdateRegistered(string uid, string version, string description);
+    event UpdateRegistered(string uid, uint64 version, string description);
     event UpdateDelivered(address owner, string uid);
     event UpdateInstalled(address owner, string uid, string deviceId);
+    event UpdateRefunded(address owner, string uid, uint256 amount);
+    event UpdateCancelled(string uid);
     
     constructor() {
         manufacturer = msg.sender;
@@ -53,30 +56,74 @@ contract SoftwareUpdateContract {
     
     function registerUpdate(
         string memory uid,
-        string memory ipfsHash,
+        bytes32 ipfsDigest,
         bytes memory encryptedKey,
-        string memory hashOfUpdate,
+        bytes32 updateHash,
         string memory description,
-        uint256 price,
-        string memory version,
+        uint128 price,
+        uint64 version,
         bytes memory signature
     ) public {
-        bytes32 messageHash = keccak256(abi.encodePacked(uid, ipfsHash, encryptedKey, hashOfUpdate, description, price, version));
-        bytes32 ethSignedMessageHash = keccak256(abi.encodePacked("\x19Ethereum Signed Message:\n32", messageHash));
-        address signer = recoverSigner(ethSignedMessageHash, signature);
-        require(signer == manufacturer, "Signature verification failed");
+        {
+            bytes32 messageHash = keccak256(abi.encodePacked(uid, ipfsDigest, encryptedKey, updateHash, description, price, version));
+            bytes32 ethSignedMessageHash = keccak256(abi.encodePacked("\x19Ethereum Signed Message:\n32", messageHash));
+            address signer = recoverSigner(ethSignedMessageHash, signature);
+            require(signer == manufacturer, "Signature verification failed");
+        }
         require(msg.sender == manufacturer, "Only manufacturer can call this function");
-        UpdateInfo memory newUpdate = UpdateInfo({
-            uid: uid,
-            ipfsHash: ipfsHash,
-            encryptedKey: encryptedKey,
-            hashOfUpdate: hashOfUpdate,
-            description: description,
+        _storeUpdate(uid, ipfsDigest, encryptedKey, updateHash, description, price, version);
+    }
+
+    // registerUpdatesBatch 입력 항목 (필드 순서는 registerUpdate 인자와 동일)
+    struct UpdateInput {
+        string uid;
+        bytes32 ipfsDigest;
+        bytes encryptedKey;
+        bytes32 updateHash;
+        string description;
+        uint128 price;
+        uint64 version;
+    }
+
+    /**
+     * @dev 여러 업데이트를 제조사 서명 한 번으로 등록합니다
+     * @param updates 등록할 업데이트 목록
+     * @param signature keccak256(항목별 registerUpdate 메시지 해시를 순서대로 이어 붙인 값)에 대한 제조사 서명
+     */
+    function registerUpdatesBatch(UpdateInput[] calldata updates, bytes memory signature) public onlyManufacturer {
+        require(updates.length > 0, "Empty batch");
+        bytes32[] memory itemHashes = new bytes32[](updates.length);
+        for (uint256 i = 0; i < updates.length; i++) {
+            UpdateInput calldata u = updates[i];
+            itemHashes[i] = keccak256(abi.encodePacked(u.uid, u.ipfsDigest, u.encryptedKey, u.updateHash, u.description, u.price, u.version));
+        }
+        bytes32 batchHash = keccak256(abi.encodePacked(itemHashes));
+        bytes32 ethSignedMessageHash = keccak256(abi.encodePacked("\x19Ethereum Signed Message:\n32", batchHash));
+        require(recoverSigner(ethSignedMessageHash, signature) == manufacturer, "Signature verification failed");
+        for (uint256 i = 0; i < updates.length; i++) {
+            UpdateInput calldata u = updates[i];
+            _storeUpdate(u.uid, u.ipfsDigest, u.encryptedKey, u.updateHash, u.description, u.price, u.version);
+        }
+    }
+
+    function _storeUpdate(
+        string memory uid,
+        bytes32 ipfsDigest,
+        bytes memory encryptedKey,
+        bytes32 updateHash,
+        string memory description,
+        uint128 price,
+        uint64 version
+    ) internal {
+        updateGroups[uid].updateInfo = UpdateInfo({
+            ipfsDigest: ipfsDigest,
+            updateHash: updateHash,
             price: price,
             version: version,
-            isValid: true
+            isValid: true,
+            exists: true,
+            encryptedKey: encryptedKey
         });
-        updateGroups[uid].updateInfo = newUpdate;
         updateIds.push(uid);
         emit UpdateRegistered(uid, version, description);
     }
@@ -109,26 +156,31 @@ contract SoftwareUpdateContract {
     }
     
     function getUpdateInfo(string memory uid) public view returns (
-        string memory ipfsHash,
+        bytes32 ipfsDigest,
         bytes memory encryptedKey,
-        string memory hashOfUpdate,
-        string memory description,
-        uint256 price,
-        string memory version,
+        bytes32 updateHash,
+        uint128 price,
+        uint64 version,
         bool isValid
     ) {
         UpdateInfo storage update = updateGroups[uid].updateInfo;
         return (
-            update.ipfsHash,
+            update.ipfsDigest,
             update.encryptedKey,
-            update.hashOfUpdate,
-            update.description,
+            update.updateHash,
             update.price,
             update.version,
             update.isValid
         );
     }
     
+    /**
+     * @dev uid가 등록된 업데이트인지 확인합니다 (getUpdateInfo는 없는 ID에도 빈 값을 반환)
+     */
+    function updateExists(string memory uid) public view returns (bool) {
+        return updateGroups[uid].updateInfo.exists;
+    }
+
     function confirmInstallation(string memory uid, string memory deviceId) public {
         require(escrowedPayments[msg.sender][uid] > 0, "No escrowed payment");
         require(!isInstalled[msg.sender][uid], "Already installed");
@@ -153,22 +205,114 @@ contract SoftwareUpdateContract {
         return updateIds[index];
     }
 
+    struct UpdateRecord {
+        string uid;
+        bytes32 ipfsDigest;
+        bytes encryptedKey;
+        bytes32 updateHash;
+        uint128 price;
+        uint64 version;
+        bool isValid;
+        bool exists;
+    }
+
+    function _recordOf(string memory uid) internal view returns (UpdateRecord memory record) {
+        UpdateInfo storage update = updateGroups[uid].updateInfo;
+        record.uid = uid;
+        record.ipfsDigest = update.ipfsDigest;
+        record.encryptedKey = update.encryptedKey;
+        record.updateHash = update.updateHash;
+        record.price = update.price;
+        record.version = update.version;
+        record.isValid = update.isValid;
+        record.exists = update.exists;
+    }
+
+    /**
+     * @dev 여러 업데이트의 정보를 한 번의 호출로 조회합니다
+     * @param uids 조회할 업데이트 ID 목록
+     * @return records 요청 순서대로 정렬된 업데이트 정보 (없는 ID는 exists=false인 빈 항목)
+     */
+    function getUpdateInfoBatch(string[] memory uids) public view returns (UpdateRecord[] memory records) {
+        records = new UpdateRecord[](uids.length);
+        for (uint256 i = 0; i < uids.length; i++) {
+            records[i] = _recordOf(uids[i]);
+        }
+    }
+
+    /**
+     * @dev updateIds의 [start, start + limit) 구간에 해당하는 업데이트 ID와 정보를 한 번에 조회합니다
+     * @param start 시작 인덱스
+     * @param limit 최대 조회 개수
+     * @return records 구간의 업데이트 정보
+     * @return total 전체 업데이트 수
+     */
+    function getUpdatesRange(uint256 start, uint256 limit) public view returns (
+        UpdateRecord[] memory records,
+        uint256 total
+    ) {
+        total = updateIds.length;
+        uint256 end = start >= total ? total : (limit > total - start ? total : start + limit);
+        records = new UpdateRecord[](end > start ? end - start : 0);
+        for (uint256 i = start; i < end; i++) {
+            records[i - start] = _recordOf(updateIds[i]);
+        }
+    }
+
     function cancelUpdate(string memory uid) public onlyManufacturer {
         UpdateInfo storage update = updateGroups[uid].updateInfo;
-        require(bytes(update.uid).length != 0, "Update does not exist");
+        require(update.exists, "Update does not exist");
         require(update.isValid, "Update is already invalid");
         update.isValid = false;
-        // 구매자 환불 처리
-        address[] memory buyers = updateBuyers[uid];
-        for (uint256 j = 0; j < buyers.length; j++) {
+        emit UpdateCancelled(uid);
+        // 구매자 환불은 블록 가스 한도를 넘지 않도록 processRefunds로 나누어 처리
+    }
+
+    /**
+     * @dev 취소된 업데이트의 구매자 환불을 최대 maxBuyers명씩 처리합니다 (누구나 호출 가능)
+     * @param uid 취소된 업데이트 ID
+     * @param maxBuyers 이번 호출에서 처리할 최대 구매자 수
+     * @return processed 이번 호출에서 처리한 구매자 수
+     * @return remaining 아직 처리하지 않은 구매자 수
+     */
+    function processRefunds(string memory uid, uint256 maxBuyers) public returns (uint256 processed, uint256 remaining) {
+        UpdateInfo storage update = updateGroups[uid].updateInfo;
+        require(update.exists, "Update does not exist");
+        require(!update.isValid, "Update is not cancelled");
+        require(maxBuyers > 0, "maxBuyers must be positive");
+        address[] storage buyers = updateBuyers[uid];
+        uint256 start = refundCursor[uid];
+        uint256 end = maxBuyers > buyers.length - start ? buyers.length : start + maxBuyers;
+        for (uint256 j = start; j < end; j++) {
             address buyer = buyers[j];
             if (escrowedPayments[buyer][uid] > 0 && !isRefunded[buyer][uid] && !isInstalled[buyer][uid]) {
                 uint256 refundAmount = escrowedPayments[buyer][uid];
                 escrowedPayments[buyer][uid] = 0;
                 isRefunded[buyer][uid] = true;
-                payable(buyer).transfer(refundAmount);
+                refundTimestamps[buyer][uid] = block.timestamp; // 환불 시각 기록
+                // 수신을 거부하는 구매자 한 명 때문에 전체 환불이 멈추지 않도록,
+                // 송금 실패 시 상태를 되돌려 refundOnCancel로 직접 찾아가게 함
+                if (payable(buyer).send(refundAmount)) {
+                    emit UpdateRefunded(buyer, uid, refundAmount);
+                } else {
+                    escrowedPayments[buyer][uid] = refundAmount;
+                    isRefunded[buyer][uid] = false;
+                    refundTimestamps[buyer][uid] = 0;
+                }
             }
         }
+        refundCursor[uid] = end;
+        return (end - start, buyers.length - end);
+    }
+
+    /**
+     * @dev 취소된 업데이트의 환불 진행 상황을 조회합니다
+     * @param uid 업데이트 ID
+     * @return processed 처리된 구매자 수
+     * @return total 전체 구매자 수
+     */
+    function getRefundProgress(string memory uid) public view returns (uint256 processed, uint256 total) {
+        return (refundCursor[uid], updateBuyers[uid].length);
     }
 
     // 구매자가 직접 환불을 요청할 수 있는 함수(업데이트가 취소된 경우만)
@@ -183,6 +327,7 @@ contract SoftwareUpdateContract {
         isRefunded[msg.sender][uid] = true;
         refundTimestamps[msg.sender][uid] = block.timestamp; // 환불 시각 기록
         payable(msg.sender).transfer(refundAmount);
+        emit UpdateRefunded(msg.sender, uid, refundAmount);
     }
 
     // 구매자가 CP-ABE 속성 미일치 등으로 설치 불가 시 환불 요청 함수
@@ -197,6 +342,7 @@ contract SoftwareUpdateContract {
         isRefunded[msg.sender][uid] = true;
         refundTimestamps[msg.sender][uid] = block.timestamp; // 환불 시각 기록
         payable(msg.sender).transfer(refundAmount);
+        emit UpdateRefunded(msg.sender, uid, refundAmount);
     }
 
     // 모든 구매자 주소를 반환(업데이트별)
@@ -206,12 +352,11 @@ contract SoftwareUpdateContract {
     // 사용자가 설치했거나 환불받은 기록이 있는 업데이트를 제외한 전체 업데이트 목록 반환
     function getAvailableUpdatesForOwner() public view returns (
         string[] memory uids,
-        string[] memory ipfsHashes,
+        bytes32[] memory ipfsDigests,
         bytes[] memory encryptedKeys,
-        string[] memory hashOfUpdates,
-        string[] memory descriptions,
-        uint256[] memory prices,
-        string[] memory versions,
+        bytes32[] memory updateHashes,
+        uint128[] memory prices,
+        uint64[] memory versions,
         bool[] memory isValids
     ) {
         uint256 count = 0;
@@ -222,23 +367,21 @@ contract SoftwareUpdateContract {
             }
         }
         uids = new string[](count);
-        ipfsHashes = new string[](count);
+        ipfsDigests = new bytes32[](count);
         encryptedKeys = new bytes[](count);
-        hashOfUpdates = new string[](count);
-        descriptions = new string[](count);
-        prices = new uint256[](count);
-        versions = new string[](count);
+        updateHashes = new bytes32[](count);
+        prices = new uint128[](count);
+        versions = new uint64[](count);
         isValids = new bool[](count);
         uint256 idx = 0;
         for (uint256 i = 0; i < updateIds.length; i++) {
             string memory uid = updateIds[i];
             if (!isInstalled[msg.sender][uid] && !isRefunded[msg.sender][uid]) {
                 UpdateInfo storage update = updateGroups[uid].updateInfo;
-                uids[idx] = update.uid;
-                ipfsHashes[idx] = update.ipfsHash;
+                uids[idx] = uid;
+                ipfsDigests[idx] = update.ipfsDigest;
                 encryptedKeys[idx] = update.encryptedKey;
-                hashOfUpdates[idx] = update.hashOfUpdate;
-                descriptions[idx] = update.description;
+                updateHashes[idx] = update.updateHash;
                 prices[idx] = update.price;
                 versions[idx] = update.version;
                 isValids[idx] = update.isValid;
@@ -247,14 +390,66 @@ contract SoftwareUpdateContract {
         }
     }
 
+    struct UpdateSummary {
+        string uid;
+        bytes32 ipfsDigest;
+        bytes32 updateHash;
+        uint128 price;
+        uint64 version;
+        bool isValid;
+    }
+
+    function _summaryOf(string memory uid) internal view returns (UpdateSummary memory summary) {
+        UpdateInfo storage update = updateGroups[uid].updateInfo;
+        summary.uid = uid;
+        summary.ipfsDigest = update.ipfsDigest;
+        summary.updateHash = update.updateHash;
+        summary.price = update.price;
+        summary.version = update.version;
+        summary.isValid = update.isValid;
+    }
+
+    function _pageEnd(uint256 start, uint256 limit, uint256 total) internal pure returns (uint256) {
+        require(limit > 0, "Limit must be positive");
+        if (start >= total) return total;
+        return limit > total - start ? total : start + limit;
+    }
+
+    /**
+     * @dev getAvailableUpdatesForOwner의 커서 기반 페이지 조회 (encryptedKey는 getUpdateInfo로 개별 조회)
+     * @param start 검사를 시작할 updateIds 인덱스
+     * @param limit 이번 호출에서 검사할 최대 업데이트 수
+     * @return page 검사 구간에서 설치/환불되지 않은 업데이트 목록
+     * @return nextCursor 다음 호출의 start 값 (0이면 마지막 페이지)
+     */
+    function getAvailableUpdatesForOwnerPage(uint256 start, uint256 limit) public view returns (
+        UpdateSummary[] memory page,
+        uint256 nextCursor
+    ) {
+        uint256 end = _pageEnd(start, limit, updateIds.length);
+        page = new UpdateSummary[](end > start ? end - start : 0);
+        uint256 count = 0;
+        for (uint256 i = start; i < end; i++) {
+            string memory uid = updateIds[i];
+            if (!isInstalled[msg.sender][uid] && !isRefunded[msg.sender][uid]) {
+                page[count] = _summaryOf(uid);
+                count++;
+            }
+        }
+        // 한 번만 순회하기 위해 미리 잡은 배열 길이를 실제 개수로 줄임
+        assembly {
+            mstore(page, count)
+        }
+        nextCursor = end < updateIds.length ? end : 0;
+    }
+
     struct UpdateHistory {
         string uid;
-        string ipfsHash;
+        bytes32 ipfsDigest;
         bytes encryptedKey;
-        string hashOfUpdate;
-        string description;
-        uint256 price;
-        string version;
+        bytes32 updateHash;
+        uint128 price;
+        uint64 version;
         bool isValid;
         bool isPurchased;
         bool isInstalled;
@@ -270,25 +465,45 @@ contract SoftwareUpdateContract {
         uint256 count = allUpdates.length;
         UpdateHistory[] memory histories = new UpdateHistory[](count);
         for (uint256 i = 0; i < count; i++) {
-            string memory uid = allUpdates[i];
-            UpdateInfo storage update = updateGroups[uid].updateInfo;
-            histories[i] = UpdateHistory({
-                uid: update.uid,
-                ipfsHash: update.ipfsHash,
-                encryptedKey: update.encryptedKey,
-                hashOfUpdate: update.hashOfUpdate,
-                description: update.description,
-                price: update.price,
-                version: update.version,
-                isValid: update.isValid,
-                isPurchased: escrowedPayments[msg.sender][uid] > 0,
-                isInstalled: isInstalled[msg.sender][uid],
-                isRefunded: isRefunded[msg.sender][uid],
-                purchaseTime: purchaseTimestamps[msg.sender][uid],
-                installTime: installTimestamps[msg.sender][uid],
-                refundTime: refundTimestamps[msg.sender][uid]
-            });
+            histories[i] = _historyOf(allUpdates[i]);
         }
         return histories;
     }
+
+    /**
+     * @dev getOwnerUpdateHistory의 커서 기반 페이지 조회
+     * @param start 조회를 시작할 구매 목록 인덱스
+     * @param limit 이번 호출에서 반환할 최대 기록 수
+     * @return page 구매 기록 목록
+     * @return nextCursor 다음 호출의 start 값 (0이면 마지막 페이지)
+     */
+    function getOwnerUpdateHistoryPage(uint256 start, uint256 limit) public view returns (
+        UpdateHistory[] memory page,
+        uint256 nextCursor
+    ) {
+        string[] storage allUpdates = ownerUpdates[msg.sender];
+        uint256 end = _pageEnd(start, limit, allUpdates.length);
+        page = new UpdateHistory[](end > start ? end - start : 0);
+        for (uint256 i = start; i < end; i++) {
+            page[i - start] = _historyOf(allUpdates[i]);
+        }
+        nextCursor = end < allUpdates.length ? end : 0;
+    }
+
+    function _historyOf(string memory uid) internal view returns (UpdateHistory memory history) {
+        UpdateInfo storage update = updateGroups[uid].updateInfo;
+        history.uid = uid;
+        history.ipfsDigest = update.ipfsDigest;
+        history.encryptedKey = update.encryptedKey;
+        history.updateHash = update.updateHash;
+        history.price = update.price;
+        history.version = update.version;
+        history.isValid = update.isValid;
+        history.isPurchased = escrowedPayments[msg.sender][uid] > 0;
+        history.isInstalled = isInstalled[msg.sender][uid];
+        history.isRefunded = isRefunded[msg.sender][uid];
+        history.purchaseTime = purchaseTimestamps[msg.sender][uid];
+        history.installTime = installTimestamps[msg.sender][uid];
+        history.refundTime = refundTimestamps[msg.sender][uid];
+    }
 }
\ No newline at end of file
@@ -1,10 +1,27 @@
 import os
+import sys
 import json
 import logging
-from web3 import Web3
-from solcx import compile_source, install_solc, set_solc_version
 from dotenv import load_dotenv
 
+# 공용 모듈 경로 추가 (컨테이너: /app/common, 저장소: ../common)
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for _root in (BASE_DIR, os.path.dirname(BASE_DIR)):
+    if os.path.isdir(os.path.join(_root, "common")) and _root not in sys.path:
+        sys.path.insert(0, _root)
+
+from common.abi_store import AbiStore  # noqa: E402
+from common.compile_cache import compile_artifact, source_artifact_key  # noqa: E402
+from common.deploy_state import (  # noqa: E402
+    deployed_code_matches,
+    reusable_deployment,
+    runtime_code_hash,
+    save_deployment,
+)
+from common.metrics import metrics  # noqa: E402
+from common.providers import get_web3, receipt_waiter_from_env  # noqa: E402
+from common.tx_pipeline import TransactionPipeline, log_results  # noqa: E402
+
 # 로깅 설정
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -12,6 +29,9 @@ logger = logging.getLogger(__name__)
 # .env 파일 로드
 load_dotenv()
 
+CONTRACT_NAME = "SoftwareUpdateContract"
+COMPILE_SETTINGS = {"solc_version": "0.8.17", "optimize": True, "optimize_runs": 200}
+
 
 def deploy_contract():
     """스마트 컨트랙트 컴파일 및 배포"""
@@ -21,45 +41,50 @@ def deploy_contract():
         private_key = os.getenv("PRIVATE_KEY", "")
         account_address = os.getenv("ACCOUNT_ADDRESS", "your-account-address-here")
 
-        web3 = Web3(Web3.HTTPProvider(web3_provider))
+        web3 = get_web3(web3_provider)
 
         # Web3.py 6.0.0 호환성: isConnected() → is_connected()
-        if not web3.is_connected():
+        with metrics.span("phase", phase="connect"):
+            connected = web3.is_connected()
+        if not connected:
             raise ConnectionError(f"Web3 제공자에 연결할 수 없습니다: {web3_provider}")
 
         logger.info(f"Web3 연결 성공: {web3_provider}")
         logger.info(f"사용할 계정 주소: {account_address}")
 
-        # solc 설치 및 버전 설정
-        install_solc("0.8.17")
-        set_solc_version("0.8.17")
-
-        # 컨트랙트 소스 파일 읽기
+        # 컨트랙트 소스 파일 경로
         contract_path = os.path.join(
             os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
             "contracts",
             "SoftwareUpdateContract.sol",
         )
-
-        with open(contract_path, "r") as file:
-            contract_source = file.read()
-
-        # 컨트랙트 컴파일 - 오류 발생한 via_ir 매개변수 제거하고 최적화 설정만 사용
-        compiled_sol = compile_source(
-            contract_source,
-            output_values=["abi", "bin"],
-            solc_version="0.8.17",
-            optimize=True,  # 옵티마이저 활성화
-            optimize_runs=200,  # 최적화 실행 횟수
+        contract_info_path = os.path.join(
+            os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+            "contract_address.json",
         )
+        registry_contract = load_registry_contract(web3)
 
-        # 컴파일된 컨트랙트 정보 추출
-        contract_id = list(compiled_sol.keys())[0]  # 수정됨: 튜플 인덱싱 방식 변경
-        contract_interface = compiled_sol[contract_id]
-
-        # 수정: contract_interface에서 올바르게 값을 추출
-        contract_abi = contract_interface["abi"]
-        contract_bytecode = contract_interface["bin"]
+        # ganache_data 볼륨으로 체인이 유지된 재시작이면 컴파일/배포/등록을 모두 건너뜀
+        with metrics.span("phase", phase="reuse_check"):
+            existing = find_existing_contract(
+                web3, contract_path, contract_info_path, registry_contract
+            )
+        if existing is not None:
+            metrics.inc("deploy_reused_total", contract=CONTRACT_NAME)
+            logger.info(f"배포된 컨트랙트를 재사용합니다. 주소: {existing['address']}")
+            if registry_contract is not None and not is_registered(
+                registry_contract, existing["address"]
+            ):
+                update_registry(
+                    web3, account_address, private_key, existing["address"], existing["abi"]
+                )
+            return existing["address"], existing["abi"]
+
+        # 컨트랙트 컴파일 - 캐시 적중 시 solc 설치/실행을 모두 건너뜀
+        # (옵티마이저 활성화, 최적화 실행 횟수 200)
+        with metrics.span("phase", phase="compile"):
+            artifact = compile_artifact(contract_path, **COMPILE_SETTINGS)
+        contract_abi, contract_bytecode = artifact["abi"], artifact["bin"]
 
         # 컨트랙트 객체 생성
         SoftwareUpdateContract = web3.eth.contract(
@@ -69,58 +94,42 @@ def deploy_contract():
         # 계정 설정
         web3.eth.default_account = account_address
 
-        # 컨트랙트 배포 트랜잭션 생성
-        if private_key:
-            # 비밀키가 있으면 서명된 트랜잭션 사용
-            tx_params = {
-                "from": account_address,
-                "gas": 3000000,
-                # Web3.py 6.0.0 호환성: toWei() → to_wei()
-                "gasPrice": web3.to_wei("50", "gwei"),
-                # Web3.py 6.0.0 호환성: getTransactionCount() → get_transaction_count()
-                "nonce": web3.eth.get_transaction_count(account_address),
-            }
-
-            tx = SoftwareUpdateContract.constructor().build_transaction(tx_params)
-            signed_tx = web3.eth.account.sign_transaction(tx, private_key)
-            # Web3.py 6.0.0 호환성: sendRawTransaction() → send_raw_transaction()
-            tx_hash = web3.eth.send_raw_transaction(signed_tx.raw_transaction)
-        else:
-            # 비밀키가 없으면 일반 트랜잭션 사용
-            tx_hash = SoftwareUpdateContract.constructor().transact(
-                {
-                    "from": account_address,
-                    "gas": 3000000,
-                    # Web3.py 6.0.0 호환성: toWei() → to_wei()
-                    "gasPrice": web3.to_wei("50", "gwei"),
-                }
+        # 배포와 레지스트리 등록을 nonce 순서대로 연속 전송한 뒤 영수증을 한꺼번에 대기
+        # WEB3_WS_PROVIDER가 있으면 영수증을 폴링 대신 newHeads 구독으로 확인
+        receipt_waiter = receipt_waiter_from_env(web3)
+        pipeline = TransactionPipeline(
+            web3, account_address, private_key, receipt_waiter=receipt_waiter
+        )
+        contract_address = pipeline.predict_next_contract_address()
+        # 가스 한도는 eth_estimateGas + 여유분, 수수료는 eth_feeHistory 기반 (common/fees.py)
+        pipeline.submit("deploy", SoftwareUpdateContract.constructor())
+
+        if registry_contract is not None:
+            queue_registry_update(
+                pipeline, registry_contract, contract_address, contract_abi
             )
 
-        # 트랜잭션 영수증 대기
-        # Web3.py 6.0.0 호환성: waitForTransactionReceipt() → wait_for_transaction_receipt()
-        tx_receipt = web3.eth.wait_for_transaction_receipt(tx_hash)
-        contract_address = tx_receipt.contractAddress
+        with metrics.span("phase", phase="wait_all"):
+            results = pipeline.wait_all()
+        if receipt_waiter is not None:
+            receipt_waiter.stop()
+        all_ok = log_results(results)
+        deploy_result = results[0]
+        if deploy_result["status"] != 1:
+            raise RuntimeError(f"컨트랙트 배포 실패: {deploy_result['error'] or 'reverted'}")
+        if deploy_result["receipt"].contractAddress != contract_address:
+            raise RuntimeError(
+                f"예측한 주소와 배포된 주소가 다릅니다: {contract_address} != "
+                f"{deploy_result['receipt'].contractAddress}"
+            )
 
         logger.info(f"컨트랙트 배포 성공! 주소: {contract_address}")
 
-        # 컨트랙트 주소 저장
-        contract_data = {"address": contract_address, "abi": contract_abi}
-
-        # 파일에 저장 (확장자 .json으로 변경)
-        contract_info_path = os.path.join(
-            os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
-            "contract_address.json",
-        )
-
-        with open(contract_info_path, "w") as f:
-            f.write(json.dumps(contract_data))
+        # 컨트랙트 주소 저장 (다음 재시작 때 비교할 산출물 키와 런타임 코드 해시 포함)
+        save_deployment(contract_info_path, contract_address, contract_abi, artifact)
 
-        logger.info(f"컨트랙트 정보가 {contract_info_path}에 저장되었습니다.")
-
-        # 레지스트리에 컨트랙트 주소 및 ABI 등록
-        update_registry(
-            web3, account_address, private_key, contract_address, contract_abi
-        )
+        if registry_contract is not None and all_ok:
+            logger.info("레지스트리 주소 및 ABI 등록 완료")
 
         return contract_address, contract_abi
 
@@ -129,92 +138,82 @@ def deploy_contract():
         raise
 
 
-def update_registry(web3, account_address, private_key, contract_address, contract_abi):
-    """레지스트리 컨트랙트에 소프트웨어 업데이트 컨트랙트 주소 및 ABI 등록"""
-    try:
-        # 레지스트리 주소 및 ABI 로드
-        registry_path = "/app/registry-service/registry_address.json"
+def find_existing_contract(web3, contract_path, contract_info_path, registry_contract):
+    """재사용할 수 있는 배포 정보 반환 (없으면 None)
 
-        if not os.path.exists(registry_path):
-            logger.warning(
-                "레지스트리 컨트랙트 주소 파일이 없습니다. 레지스트리 컨트랙트를 먼저 배포하세요."
-            )
-            return False
+    contract_address.json이 같은 소스로 만들어졌고 그 주소의 코드가 그대로면 컴파일 없이
+    재사용한다. 파일이 없거나 오래되었으면 레지스트리에 등록된 주소의 코드를 (캐시된)
+    산출물의 런타임 바이트코드와 비교한다.
+    """
+    existing = reusable_deployment(
+        web3, contract_info_path, source_artifact_key(contract_path, **COMPILE_SETTINGS)
+    )
+    if existing is not None or registry_contract is None:
+        return existing
+    try:
+        address = registry_contract.functions.getContractAddress(CONTRACT_NAME).call()
+    except Exception:
+        # 아직 등록되지 않았으면 revert
+        return None
+    artifact = compile_artifact(contract_path, **COMPILE_SETTINGS)
+    if not deployed_code_matches(web3, address, runtime_code_hash(artifact["bin_runtime"])):
+        return None
+    logger.info(f"레지스트리에 등록된 컨트랙트의 코드가 일치합니다: {address}")
+    return save_deployment(contract_info_path, address, artifact["abi"], artifact)
+
+
+def is_registered(registry_contract, contract_address):
+    """레지스트리에 contract_address가 이미 등록되어 있는지 (레지스트리를 새로 배포했으면 False)"""
+    try:
+        registered = registry_contract.functions.getContractAddress(CONTRACT_NAME).call()
+    except Exception:
+        return False
+    return registered == contract_address
 
-        with open(registry_path, "r") as f:
-            registry_data = json.loads(f.read())
 
-        registry_address = registry_data["address"]
-        registry_abi = registry_data["abi"]
+def load_registry_contract(web3):
+    """레지스트리 주소 및 ABI를 로드하여 컨트랙트 인스턴스 생성"""
+    registry_path = "/app/registry-service/registry_address.json"
 
-        # 레지스트리 컨트랙트 인스턴스 생성
-        registry_contract = web3.eth.contract(
-            address=registry_address, abi=registry_abi
+    if not os.path.exists(registry_path):
+        logger.warning(
+            "레지스트리 컨트랙트 주소 파일이 없습니다. 레지스트리 컨트랙트를 먼저 배포하세요."
         )
+        return None
 
-        # 주소 등록
-        if private_key:
-            tx_params = {
-                "from": account_address,
-                "gas": 100000,
-                "gasPrice": web3.to_wei("50", "gwei"),
-                "nonce": web3.eth.get_transaction_count(account_address),
-            }
-            tx = registry_contract.functions.setContractAddress(
-                "SoftwareUpdateContract", contract_address
-            ).build_transaction(tx_params)
-            signed_tx = web3.eth.account.sign_transaction(tx, private_key)
-            tx_hash = web3.eth.send_raw_transaction(signed_tx.raw_transaction)
-        else:
-            tx_hash = registry_contract.functions.setContractAddress(
-                "SoftwareUpdateContract", contract_address
-            ).transact(
-                {
-                    "from": account_address,
-                    "gas": 100000,
-                    "gasPrice": web3.to_wei("50", "gwei"),
-                }
-            )
-        tx_receipt = web3.eth.wait_for_transaction_receipt(tx_hash)
-        if tx_receipt.status == 1:
-            logger.info(
-                f"레지스트리 주소 업데이트 성공! 트랜잭션 해시: {tx_hash.hex()}"
-            )
-        else:
-            logger.error("레지스트리 주소 업데이트 실패")
-            return False
+    with open(registry_path, "r") as f:
+        registry_data = json.loads(f.read())
 
-        # ABI 등록 (json 문자열로 변환)
-        abi_json = json.dumps(contract_abi)
-        if private_key:
-            tx_params = {
-                "from": account_address,
-                "gas": 10000000,
-                "gasPrice": web3.to_wei("50", "gwei"),
-                "nonce": web3.eth.get_transaction_count(account_address),
-            }
-            tx = registry_contract.functions.setAbi(
-                "SoftwareUpdateContract", abi_json
-            ).build_transaction(tx_params)
-            signed_tx = web3.eth.account.sign_transaction(tx, private_key)
-            tx_hash = web3.eth.send_raw_transaction(signed_tx.raw_transaction)
-        else:
-            tx_hash = registry_contract.functions.setAbi(
-                "SoftwareUpdateContract", abi_json
-            ).transact(
-                {
-                    "from": account_address,
-                    "gas": 10000000,
-                    "gasPrice": web3.to_wei("50", "gwei"),
-                }
-            )
-        tx_receipt = web3.eth.wait_for_transaction_receipt(tx_hash)
-        if tx_receipt.status == 1:
-            logger.info(f"레지스트리 ABI 업데이트 성공! 트랜잭션 해시: {tx_hash.hex()}")
-            return True
-        else:
-            logger.error("레지스트리 ABI 업데이트 실패")
+    return web3.eth.contract(address=registry_data["address"], abi=registry_data["abi"])
+
+
+def queue_registry_update(pipeline, registry_contract, contract_address, contract_abi):
+    """레지스트리 주소/ABI 다이제스트 등록 트랜잭션을 파이프라인에 추가 (영수증은 기다리지 않음)"""
+    # ABI 본문은 로컬 저장소에 두고 체인에는 다이제스트만 기록
+    abi_digest = AbiStore().put(contract_abi)
+    pipeline.submit(
+        "setAbiHash",
+        registry_contract.functions.setAbiHash(CONTRACT_NAME, abi_digest),
+    )
+    pipeline.submit(
+        "setContractAddress",
+        registry_contract.functions.setContractAddress(
+            CONTRACT_NAME, contract_address
+        ),
+    )
+
+
+def update_registry(web3, account_address, private_key, contract_address, contract_abi):
+    """레지스트리 컨트랙트에 소프트웨어 업데이트 컨트랙트 주소 및 ABI 등록"""
+    try:
+        registry_contract = load_registry_contract(web3)
+        if registry_contract is None:
             return False
+        pipeline = TransactionPipeline(web3, account_address, private_key)
+        queue_registry_update(
+            pipeline, registry_contract, contract_address, contract_abi
+        )
+        return log_results(pipeline.wait_all())
     except Exception as e:
         logger.error(f"레지스트리 업데이트 중 오류 발생: {str(e)}")
         return False
@@ -1,20 +1,28 @@
-from web3 import Web3
-import json
 import os
+import sys
+
+# 공용 모듈 경로 추가 (컨테이너: /app/common, 저장소: ../common)
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for _root in (BASE_DIR, os.path.dirname(BASE_DIR)):
+    if os.path.isdir(os.path.join(_root, "common")) and _root not in sys.path:
+        sys.path.insert(0, _root)
+
+from common.providers import get_web3  # noqa: E402
+from common.registry_client import RegistryClient  # noqa: E402
 
 # Ganache 또는 실제 네트워크 주소로 변경
-w3 = Web3(Web3.HTTPProvider("http://blockchain-server_ganache_1:8545"))
+w3 = get_web3(os.getenv("WEB3_PROVIDER", "http://blockchain-server_ganache_1:8545"))
 
-# 레지스트리 컨트랙트 정보 로드
+# 레지스트리 컨트랙트 정보 로드 (REGISTRY_CACHE_PATH 지정 시 조회 결과를 디스크에도 보관)
 registry_path = "/app/registry-service/registry_address.json"
-with open(registry_path) as f:
-    reg = json.load(f)
-
-registry = w3.eth.contract(address=reg["address"], abi=reg["abi"])
+registry = RegistryClient.from_file(
+    w3, registry_path, cache_path=os.getenv("REGISTRY_CACHE_PATH")
+)
 
 # SoftwareUpdateContract 주소 조회
 try:
-    software_update_addr = registry.functions.getContractAddress("SoftwareUpdateContract").call()
+    registry.poll_events()
+    software_update_addr = registry.get_address("SoftwareUpdateContract")
     print("SoftwareUpdateContract address:", software_update_addr)
 except Exception as e:
     print("오류 발생:", e)
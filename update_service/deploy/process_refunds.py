@@ -0,0 +1,58 @@
+import os
+import sys
+import json
+import logging
+import argparse
+from dotenv import load_dotenv
+
+# 공용 모듈 경로 추가 (컨테이너: /app/common, 저장소: ../common)
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for _root in (BASE_DIR, os.path.dirname(BASE_DIR)):
+    if os.path.isdir(os.path.join(_root, "common")) and _root not in sys.path:
+        sys.path.insert(0, _root)
+
+from common.providers import get_web3  # noqa: E402
+from common.refunds import DEFAULT_MAX_BUYERS, process_refunds  # noqa: E402
+
+# 로깅 설정
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# .env 파일 로드
+load_dotenv()
+
+
+def main():
+    """취소된 업데이트의 구매자 환불을 끝까지 처리"""
+    parser = argparse.ArgumentParser(description="취소된 업데이트의 환불을 나누어 처리합니다.")
+    parser.add_argument("uid", help="취소된 업데이트 ID")
+    parser.add_argument("--max-buyers", type=int, default=DEFAULT_MAX_BUYERS)
+    args = parser.parse_args()
+
+    web3_provider = os.getenv("WEB3_PROVIDER", "http://ganache:8545")
+    private_key = os.getenv("PRIVATE_KEY", "")
+    account_address = os.getenv("ACCOUNT_ADDRESS", "your-account-address-here")
+
+    web3 = get_web3(web3_provider)
+    if not web3.is_connected():
+        raise ConnectionError(f"Web3 제공자에 연결할 수 없습니다: {web3_provider}")
+
+    with open(os.path.join(BASE_DIR, "contract_address.json")) as f:
+        contract_data = json.load(f)
+    contract = web3.eth.contract(
+        address=contract_data["address"], abi=contract_data["abi"]
+    )
+
+    processed, total = process_refunds(
+        web3,
+        contract,
+        args.uid,
+        account_address,
+        private_key,
+        max_buyers=args.max_buyers,
+    )
+    logger.info(f"환불 처리 완료: {args.uid} ({processed}/{total})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+import os
+import sys
+import json
+import logging
+import argparse
+from eth_account import Account
+from dotenv import load_dotenv
+
+# 공용 모듈 경로 추가 (컨테이너: /app/common, 저장소: ../common)
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for _root in (BASE_DIR, os.path.dirname(BASE_DIR)):
+    if os.path.isdir(os.path.join(_root, "common")) and _root not in sys.path:
+        sys.path.insert(0, _root)
+
+from common.providers import get_web3, receipt_waiter_from_env  # noqa: E402
+from common.tx_pipeline import TransactionPipeline, log_results  # noqa: E402
+from common.update_signing import build_register_batch_args  # noqa: E402
+
+# 로깅 설정
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# .env 파일 로드
+load_dotenv()
+
+DEFAULT_BATCH_SIZE = 20
+MANIFEST_FIELDS = (
+    "uid",
+    "ipfs_hash",
+    "encrypted_key",
+    "hash_of_update",
+    "description",
+    "price",
+    "version",
+)
+
+
+def load_manifest(path):
+    """릴리스 매니페스트(JSON 배열)를 build_register_batch_args 입력 형식으로 변환
+
+    encrypted_key는 0x로 시작하면 16진수 바이트, 아니면 UTF-8 문자열로 취급한다.
+    """
+    with open(path) as f:
+        entries = json.load(f)
+    updates = []
+    for entry in entries:
+        missing = [field for field in MANIFEST_FIELDS if field not in entry]
+        if missing:
+            raise ValueError(f"매니페스트 항목에 필드가 없습니다 ({entry.get('uid')}): {missing}")
+        encrypted_key = entry["encrypted_key"]
+        if encrypted_key.startswith("0x"):
+            encrypted_key = bytes.fromhex(encrypted_key[2:])
+        updates.append(
+            (
+                entry["uid"],
+                entry["ipfs_hash"],
+                encrypted_key,
+                entry["hash_of_update"],
+                entry["description"],
+                int(entry["price"]),
+                entry["version"],
+            )
+        )
+    return updates
+
+
+def chunked(items, size):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def register_batches(
+    web3, contract, account_address, private_key, updates, batch_size=DEFAULT_BATCH_SIZE, receipt_waiter=None
+):
+    """업데이트를 batch_size개씩 나누어 묶음마다 한 번 서명하고, 모든 묶음을 연속 전송한 뒤 영수증을 기다림"""
+    pipeline = TransactionPipeline(web3, account_address, private_key, receipt_waiter=receipt_waiter)
+    for batch in chunked(updates, batch_size):
+        items, signature = build_register_batch_args(private_key, batch)
+        tx_callable = contract.functions.registerUpdatesBatch(items, signature)
+        # 묶음마다 uid가 달라 서로 의존하지 않으므로 앞선 묶음이 채굴되기 전에 가스를 추정해도 됨
+        # (크기가 비슷한 묶음은 파이프라인의 추정치 캐시를 공유)
+        label = f"registerUpdatesBatch({batch[0][0]}..{batch[-1][0]}, {len(batch)}개)"
+        pipeline.submit(label, tx_callable)
+    return pipeline.wait_all()
+
+
+def main():
+    """릴리스 매니페스트의 업데이트를 묶음 단위로 서명/등록"""
+    parser = argparse.ArgumentParser(description="여러 업데이트를 제조사 서명 한 번으로 묶어 등록합니다.")
+    parser.add_argument("manifest", help="업데이트 목록 JSON 파일")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    web3_provider = os.getenv("WEB3_PROVIDER", "http://ganache:8545")
+    private_key = os.getenv("PRIVATE_KEY", "")
+    if not private_key:
+        raise ValueError("배치 서명에는 제조사 PRIVATE_KEY가 필요합니다.")
+    account_address = os.getenv("ACCOUNT_ADDRESS") or Account.from_key(private_key).address
+
+    web3 = get_web3(web3_provider)
+    if not web3.is_connected():
+        raise ConnectionError(f"Web3 제공자에 연결할 수 없습니다: {web3_provider}")
+
+    with open(os.path.join(BASE_DIR, "contract_address.json")) as f:
+        contract_data = json.load(f)
+    contract = web3.eth.contract(
+        address=contract_data["address"], abi=contract_data["abi"]
+    )
+
+    updates = load_manifest(args.manifest)
+    if not updates:
+        logger.info("등록할 업데이트가 없습니다.")
+        return
+    logger.info(f"업데이트 {len(updates)}개를 {args.batch_size}개씩 묶어 등록합니다.")
+    receipt_waiter = receipt_waiter_from_env(web3)
+    results = register_batches(
+        web3,
+        contract,
+        account_address,
+        private_key,
+        updates,
+        batch_size=args.batch_size,
+        receipt_waiter=receipt_waiter,
+    )
+    if receipt_waiter is not None:
+        receipt_waiter.stop()
+    if not log_results(results):
+        exit(1)
+    gas_used = sum(r["receipt"].gasUsed for r in results)
+    logger.info(f"배치 등록 완료: 업데이트 {len(updates)}개, 업데이트당 가스 {gas_used // len(updates):,}")
+
+
+if __name__ == "__main__":
+    main()
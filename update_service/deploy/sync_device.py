@@ -0,0 +1,68 @@
+import os
+import sys
+import json
+import logging
+import argparse
+from dotenv import load_dotenv
+
+# 공용 모듈 경로 추가 (컨테이너: /app/common, 저장소: ../common)
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for _root in (BASE_DIR, os.path.dirname(BASE_DIR)):
+    if os.path.isdir(os.path.join(_root, "common")) and _root not in sys.path:
+        sys.path.insert(0, _root)
+
+from common.device_sync import DeviceSyncClient, SyncStore  # noqa: E402
+from common.providers import get_web3  # noqa: E402
+
+# 로깅 설정
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# .env 파일 로드
+load_dotenv()
+
+
+def main():
+    """기기 계정 기준으로 업데이트 이벤트를 로컬 SQLite에 동기화하고 설치 가능한 업데이트 출력"""
+    parser = argparse.ArgumentParser(description="체크포인트 기반 기기 업데이트 동기화")
+    parser.add_argument("--db", default=os.getenv("DEVICE_SYNC_DB"), help="SQLite 파일 경로")
+    parser.add_argument("--once", action="store_true", help="한 번만 동기화하고 종료")
+    parser.add_argument("--interval", type=float, default=2.0, help="동기화 주기(초)")
+    parser.add_argument("--confirmations", type=int, default=0, help="확정으로 보는 블록 수")
+    parser.add_argument("--start-block", type=int, default=0, help="처음 동기화할 블록")
+    args = parser.parse_args()
+
+    web3_provider = os.getenv("WEB3_PROVIDER", "http://ganache:8545")
+    owner = os.getenv("ACCOUNT_ADDRESS", "your-account-address-here")
+    web3 = get_web3(web3_provider)
+    if not web3.is_connected():
+        raise ConnectionError(f"Web3 제공자에 연결할 수 없습니다: {web3_provider}")
+
+    with open(os.path.join(BASE_DIR, "contract_address.json")) as f:
+        contract_data = json.load(f)
+    contract = web3.eth.contract(
+        address=contract_data["address"], abi=contract_data["abi"]
+    )
+
+    store = SyncStore(args.db)
+    client = DeviceSyncClient(
+        web3,
+        contract,
+        store,
+        owner=owner,
+        start_block=args.start_block,
+        confirmations=args.confirmations,
+    )
+    if not args.once:
+        try:
+            client.run(poll_interval=args.interval)
+        except KeyboardInterrupt:
+            pass
+        return
+    client.sync_once()
+    for update in store.available_updates(client.owner):
+        print(f"{update['uid']:<32} v{update['version']:<10} {update['price']:>12} wei  {update['description']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+import os
+import sys
+import json
+import logging
+import argparse
+from dotenv import load_dotenv
+
+# 공용 모듈 경로 추가 (컨테이너: /app/common, 저장소: ../common)
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for _root in (BASE_DIR, os.path.dirname(BASE_DIR)):
+    if os.path.isdir(os.path.join(_root, "common")) and _root not in sys.path:
+        sys.path.insert(0, _root)
+
+from common.catalogue import fetch_updates_range  # noqa: E402
+from common.payloads import (  # noqa: E402
+    DEFAULT_CHUNK_SIZE,
+    DEFAULT_WORKERS,
+    HttpContentStore,
+    LocalContentStore,
+    PayloadVerifier,
+    content_store_from_env,
+)
+from common.providers import get_web3  # noqa: E402
+
+# 로깅 설정
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# .env 파일 로드
+load_dotenv()
+
+
+def main():
+    """업데이트 페이로드를 콘텐츠 저장소에서 읽어 온체인 hashOfUpdate와 비교"""
+    parser = argparse.ArgumentParser(description="업데이트 페이로드 해시 검증")
+    parser.add_argument("uids", nargs="*", help="검증할 업데이트 ID (없으면 전체)")
+    parser.add_argument("--store", help="페이로드 디렉터리 또는 게이트웨이 URL (기본값 PAYLOAD_STORE)")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="동시에 검증할 페이로드 수")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="해시 조각 크기(바이트)")
+    args = parser.parse_args()
+
+    web3_provider = os.getenv("WEB3_PROVIDER", "http://ganache:8545")
+    web3 = get_web3(web3_provider)
+    if not web3.is_connected():
+        raise ConnectionError(f"Web3 제공자에 연결할 수 없습니다: {web3_provider}")
+
+    with open(os.path.join(BASE_DIR, "contract_address.json")) as f:
+        contract_data = json.load(f)
+    contract = web3.eth.contract(
+        address=contract_data["address"], abi=contract_data["abi"]
+    )
+
+    if args.store:
+        is_url = args.store.startswith(("http://", "https://"))
+        store = HttpContentStore(args.store) if is_url else LocalContentStore(args.store)
+    else:
+        store = content_store_from_env()
+    verifier = PayloadVerifier(contract, store, workers=args.workers, chunk_size=args.chunk_size)
+    if args.uids:
+        results = verifier.verify(args.uids)
+    else:
+        results = verifier.verify_records(fetch_updates_range(contract))
+
+    for r in results:
+        status = "OK" if r.ok else f"실패: {r.error or '해시 불일치'}"
+        print(f"{r.uid:<32} {r.size:>14} bytes  {r.seconds:>7.2f}s  {status}")
+    failed = [r.uid for r in results if not r.ok]
+    logger.info(f"페이로드 {len(results)}개 검증, 실패 {len(failed)}개")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+import os
+import sys
+import json
+import time
+import logging
+from dotenv import load_dotenv
+
+# 공용 모듈 경로 추가 (컨테이너: /app/common, 저장소: ../common)
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for _root in (BASE_DIR, os.path.dirname(BASE_DIR)):
+    if os.path.isdir(os.path.join(_root, "common")) and _root not in sys.path:
+        sys.path.insert(0, _root)
+
+from common.providers import SubscriptionClient, get_web3, ws_endpoint_for  # noqa: E402
+
+# 로깅 설정
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# .env 파일 로드
+load_dotenv()
+
+
+def log_event(event):
+    args = dict(event["args"])
+    logger.info(f"{event['event']} (블록 {event['blockNumber']}): {args}")
+
+
+def main():
+    """SoftwareUpdateContract의 등록/구매/설치/환불/취소 이벤트를 WebSocket 구독으로 실시간 출력"""
+    web3_provider = os.getenv("WEB3_PROVIDER", "http://ganache:8545")
+    web3 = get_web3(web3_provider)
+    if not web3.is_connected():
+        raise ConnectionError(f"Web3 제공자에 연결할 수 없습니다: {web3_provider}")
+
+    with open(os.path.join(BASE_DIR, "contract_address.json")) as f:
+        contract_data = json.load(f)
+    contract = web3.eth.contract(
+        address=contract_data["address"], abi=contract_data["abi"]
+    )
+
+    client = SubscriptionClient(web3, ws_endpoint_for(web3_provider))
+    client.subscribe_events(contract, log_event)
+    client.on_new_head(lambda number: logger.debug(f"새 블록: {number}"))
+    client.start()
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        client.stop()
+
+
+if __name__ == "__main__":
+    main()